@@ -0,0 +1,78 @@
+import hashlib
+import os
+import threading
+
+# --- Cache Aset Gambar yang Sudah Diproses ---
+ASET_CACHE_DIR = os.path.join(".cache", "aset") # Folder varian gambar hasil olahan
+ASET_CACHE_MAKS = 20 # Jumlah varian maksimum yang disimpan; yang paling lama tidak dipakai dihapus
+
+
+class AssetCache:
+    """Menyimpan varian gambar yang sudah diproses (blur, resize) sebagai file PPM.
+
+    Kunci varian = hash isi file sumber + ukuran target + filter, sehingga gambar sumber yang
+    diganti otomatis menghasilkan varian baru. PPM bisa dibaca langsung oleh tk.PhotoImage,
+    jadi start berikutnya tidak perlu PIL sama sekali.
+    """
+
+    def __init__(self, cache_dir=ASET_CACHE_DIR, maks_varian=ASET_CACHE_MAKS):
+        self.cache_dir = cache_dir
+        self.maks_varian = maks_varian
+        self._hash_memo = {} # (path, mtime_ns, size) -> sha256, agar resize berulang tidak membaca ulang sumber
+        self._lock = threading.Lock()
+
+    def _hash_sumber(self, sumber):
+        st = os.stat(sumber)
+        kunci = (os.path.abspath(sumber), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if kunci in self._hash_memo:
+                return self._hash_memo[kunci]
+        digest = hashlib.sha256()
+        with open(sumber, "rb") as f:
+            for blok in iter(lambda: f.read(1 << 20), b""):
+                digest.update(blok)
+        with self._lock:
+            self._hash_memo[kunci] = digest.hexdigest()
+        return digest.hexdigest()
+
+    def path_varian(self, sumber, ukuran, blur=0):
+        """Path file cache untuk varian (sumber, ukuran (lebar, tinggi), radius blur)."""
+        lebar, tinggi = ukuran
+        nama = f"{self._hash_sumber(sumber)[:20]}_{lebar}x{tinggi}_blur{blur}.ppm"
+        return os.path.join(self.cache_dir, nama)
+
+    def siapkan(self, sumber, ukuran, blur=0):
+        """Mengembalikan path PPM varian; diproses dengan PIL hanya jika belum ada di cache.
+
+        Aman dipanggil dari thread worker (tidak menyentuh Tk).
+        """
+        path = self.path_varian(sumber, ukuran, blur)
+        if os.path.exists(path):
+            try:
+                os.utime(path) # Tandai baru dipakai untuk pembersihan LRU
+            except OSError:
+                pass
+            return path
+
+        from PIL import Image, ImageFilter # Impor lazy: hanya dibutuhkan saat cache miss
+        img = Image.open(sumber).convert("RGB")
+        if blur:
+            img = img.filter(ImageFilter.GaussianBlur(blur)) # Urutan sama seperti sebelumnya: blur lalu resize
+        img = img.resize(tuple(ukuran), Image.LANCZOS)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path_sementara = f"{path}.{threading.get_ident()}.tmp"
+        img.save(path_sementara, format="PPM")
+        os.replace(path_sementara, path) # Atomik: pembaca lain tidak pernah melihat file setengah jadi
+        self._bersihkan()
+        return path
+
+    def _bersihkan(self):
+        """Menghapus varian paling lama tidak dipakai jika melebihi maks_varian."""
+        try:
+            files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".ppm")]
+            files.sort(key=os.path.getmtime, reverse=True)
+            for path in files[self.maks_varian:]:
+                os.remove(path)
+        except OSError:
+            pass # Pembersihan cache tidak boleh menggagalkan pemuatan gambar
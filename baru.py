@@ -1,9 +1,40 @@
+import time
+_T_IMPOR_MULAI = time.perf_counter() # Untuk --profile-startup
 import mysql.connector
 import tkinter as tk
-from tkinter import ttk, messagebox
-from tkcalendar import Calendar
+from tkinter import ttk, messagebox, filedialog
+import argparse
+import csv
 import datetime
-from PIL import Image, ImageTk # Dihapus ImageFilter karena tidak digunakan
+import bisect
+import contextlib
+import functools
+import gzip
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from aset_cache import AssetCache
+# tkcalendar dimuat lewat impor_lazy saat form dibangun; PIL hanya diimpor aset_cache saat cache miss
+IMPORT_TIMINGS = {"modul_inti": time.perf_counter() - _T_IMPOR_MULAI} # Durasi impor (detik), untuk --profile-startup
+
+
+def impor_lazy(nama_modul):
+    """Mengimpor modul berat saat pertama kali dibutuhkan dan mencatat durasinya di IMPORT_TIMINGS."""
+    modul = sys.modules.get(nama_modul)
+    if modul is None:
+        t_impor = time.perf_counter()
+        modul = importlib.import_module(nama_modul)
+        IMPORT_TIMINGS[f"lazy.{nama_modul}"] = time.perf_counter() - t_impor
+    return modul
 
 # --- Warna & Gaya Global ---
 BG_COLOR = "#f0f8ff"
@@ -12,9 +43,47 @@ FONT_BOLD = ("Segoe UI", 10, "bold")
 BTN_COLOR = "#4a90e2"
 BTN_HOVER = "#357ABD"
 
+# --- Pengaturan Grid Kegiatan ---
+GRID_PAGED_THRESHOLD = 5000 # Di atas jumlah ini grid memakai mode paged (lazy)
+GRID_PAGE_SIZE = 200 # Jumlah baris per halaman keyset
+GRID_MAX_PAGES = 5 # Jumlah halaman maksimum yang disimpan di Treeview sekaligus
+GRID_PREFETCH_FRACTION = 0.1 # Muat halaman baru saat scrollbar berada dalam 10% dari ujung
+GRID_SEARCH_DEBOUNCE_MS = 300 # Jeda setelah ketikan terakhir sebelum pencarian dikirim ke server
+
+# --- Pengaturan Heat-map Kalender ---
+# Warna (latar, teks) per tingkat kepadatan; tingkat = porsi jumlah kegiatan hari itu terhadap hari terpadat di bulan tampil
+KALENDER_WARNA_BEBAN = (("#dbeafe", "black"), ("#93c5fd", "black"), ("#3b82f6", "white"), ("#1e3a8a", "white"))
+
+# --- Pengaturan Pemilih Penanggung Jawab ---
+PJ_PICKER_BATAS = 50 # Jumlah kecocokan teratas yang dimasukkan ke daftar pilihan
+PJ_INDEKS_LOKAL_MAKS = 20000 # Di atas jumlah pengguna ini pencarian memakai LIKE 'prefix%' di server
+PJ_CARI_DEBOUNCE_MS = 200 # Jeda ketikan sebelum pencarian server dikirim (mode lokal langsung)
+
+# --- Pengaturan Retensi Log ---
+LOG_RETENSI_BULAN = 12 # Log yang lebih tua dari ini dipindahkan ke tabel arsip
+LOG_ARSIP_DIR = "arsip_log" # Folder file ekspor terkompresi per bulan yang diarsipkan
+LOG_ARSIP_BATCH = 500 # Baris per transaksi saat memindahkan log (transaksi pendek, kunci singkat)
+
+# --- Pengaturan Cache Data Referensi (Role, Pengguna) ---
+REFERENSI_TTL_DETIK = 30 # Selama ini entri dipakai tanpa query; sesudahnya cukup cek versi di Versi_Referensi
+
+# --- Pengaturan Instrumentasi Query (aktif lewat --instrumentasi) ---
+INSTRUMENTASI_SLOW_MS = 200 # Query di atas ambang ini dicatat ke slow-query log
+INSTRUMENTASI_SLOW_LOG = "slow_query.log" # JSON Lines, satu baris per query lambat
+INSTRUMENTASI_DUMP_FILE = "instrumentasi.json" # Ringkasan histogram, ditulis ulang secara berkala
+INSTRUMENTASI_DUMP_DETIK = 60
+
+# --- Pengaturan Diagnostik UI ---
+UI_WATCHDOG_INTERVAL_MS = 100 # Jarak tick after() pengukur latensi event loop Tk
+UI_STALL_AMBANG_MS = 250 # Tick yang terlambat lebih dari ini dicatat sebagai stall
+UI_DIAGNOSTIK_MAKS_CATATAN = 500 # Jumlah stall dan aksi tombol terakhir yang disimpan
+
 # --- Kelas Entitas ---
 class Entitas:
     """Kelas dasar untuk semua entitas data (Pengguna, Kegiatan)."""
+    # __slots__ di seluruh hierarki: tanpa __dict__ per objek, penting saat grid memuat ratusan ribu kegiatan
+    __slots__ = ("_id_entitas",)
+
     def __init__(self, id_entitas):
         self._id_entitas = id_entitas # Enkapsulasi: _id_entitas bersifat protected
 
@@ -29,6 +98,8 @@ class Entitas:
 
 class Pengguna(Entitas):
     """Merepresentasikan entitas Pengguna."""
+    __slots__ = ("_nama", "_role_id", "_nim_nip", "_username", "_password")
+
     def __init__(self, id_pengguna, nama, role_id=None, nim_nip=None, username=None, password=None):
         super().__init__(id_pengguna) # Pewarisan: memanggil constructor kelas induk
         self._nama = nama
@@ -64,13 +135,26 @@ class Pengguna(Entitas):
 
 class Kegiatan(Entitas):
     """Merepresentasikan entitas Kegiatan."""
-    def __init__(self, id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab=None):
+    __slots__ = ("_nama_kegiatan", "_tanggal", "_tempat", "_jenis_kegiatan", "_id_penanggung_jawab", "_nama_pj")
+
+    def __init__(self, id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab=None,
+                 nama_pj=None):
         super().__init__(id_kegiatan) # Pewarisan
         self._nama_kegiatan = nama_kegiatan
-        self._tanggal = tanggal # Bisa berupa string atau objek date
+        self._tanggal = tanggal # Objek datetime.date (kolom DATE), None jika tidak ada tanggal
         self._tempat = tempat
         self._jenis_kegiatan = jenis_kegiatan
         self._id_penanggung_jawab = id_penanggung_jawab
+        self._nama_pj = nama_pj # Nama penanggung jawab dari View_Detail_Kegiatan (hanya untuk tampilan)
+
+    @classmethod
+    def dari_baris_view(cls, row):
+        """Membuat Kegiatan langsung dari tuple cursor View_Detail_Kegiatan.
+
+        Urutan kolom: ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan,
+        ID_Penanggung_Jawab, Nama_Penanggung_Jawab (sama dengan urutan parameter __init__).
+        """
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5], row[6])
 
     # Enkapsulasi melalui properties
     @property
@@ -85,6 +169,13 @@ class Kegiatan(Entitas):
     def tanggal(self, value):
         self._tanggal = value
 
+    @property
+    def tanggal_str(self):
+        """Tanggal dalam format tampilan dd-mm-yyyy."""
+        if isinstance(self._tanggal, datetime.date):
+            return self._tanggal.strftime("%d-%m-%Y")
+        return self._tanggal or ""
+
     @property
     def tempat(self):
         return self._tempat
@@ -97,42 +188,717 @@ class Kegiatan(Entitas):
     def id_penanggung_jawab(self):
         return self._id_penanggung_jawab
 
+    @property
+    def nama_pj(self):
+        return self._nama_pj
+
+    @nama_pj.setter
+    def nama_pj(self, value):
+        self._nama_pj = value
+
     # Polimorfisme: Override metode dari kelas Entitas
     def get_details_string(self):
         return (f"ID Kegiatan: {self.id_entitas}, Nama: {self._nama_kegiatan}, "
-                f"Tanggal: {self._tanggal}, Tempat: {self._tempat}, "
+                f"Tanggal: {self.tanggal_str}, Tempat: {self._tempat}, "
                 f"Jenis: {self._jenis_kegiatan}, PJ ID: {self._id_penanggung_jawab}")
 
-    def to_tuple_for_display(self, nama_pj="N/A"):
+    # Batas panjang kolom tabel Kegiatan (lihat DDL skema dasar)
+    PANJANG_MAKS = {"ID Kegiatan": 10, "Nama Kegiatan": 100, "Tempat": 100, "Jenis Kegiatan": 50}
+
+    @classmethod
+    def dari_input(cls, id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab):
+        """Memvalidasi input mentah (formulir maupun file impor) lalu membuat objek Kegiatan.
+
+        tanggal boleh berupa datetime.date atau string dd-mm-yyyy.
+        Melempar ValueError dengan pesan yang siap ditampilkan ke pengguna.
+        """
+        nilai = {
+            "ID Kegiatan": str(id_kegiatan or "").strip(),
+            "Nama Kegiatan": str(nama_kegiatan or "").strip(),
+            "Tempat": str(tempat or "").strip(),
+            "Jenis Kegiatan": str(jenis_kegiatan or "").strip(),
+        }
+        kosong = [nama for nama, isi in nilai.items() if not isi]
+        if not tanggal:
+            kosong.append("Tanggal")
+        if id_penanggung_jawab in (None, ""):
+            kosong.append("Penanggung Jawab")
+        if kosong:
+            raise ValueError(f"Kolom wajib belum diisi: {', '.join(kosong)}.")
+
+        for nama, isi in nilai.items():
+            if len(isi) > cls.PANJANG_MAKS[nama]:
+                raise ValueError(f"{nama} terlalu panjang ({len(isi)} karakter, maksimal {cls.PANJANG_MAKS[nama]}).")
+
+        if isinstance(tanggal, datetime.datetime):
+            tanggal = tanggal.date()
+        elif not isinstance(tanggal, datetime.date):
+            try:
+                tanggal = datetime.datetime.strptime(str(tanggal).strip(), "%d-%m-%Y").date()
+            except ValueError:
+                raise ValueError(f"Format tanggal '{tanggal}' tidak valid (gunakan dd-mm-yyyy).") from None
+
+        try:
+            id_penanggung_jawab = int(id_penanggung_jawab)
+        except (TypeError, ValueError):
+            raise ValueError(f"ID penanggung jawab '{id_penanggung_jawab}' tidak valid.") from None
+
+        return cls(nilai["ID Kegiatan"], nilai["Nama Kegiatan"], tanggal, nilai["Tempat"],
+                   nilai["Jenis Kegiatan"], id_penanggung_jawab)
+
+    def to_tuple_for_display(self):
         """Mengembalikan tuple data kegiatan untuk ditampilkan di Treeview."""
         return (
             self.id_entitas,
             self._nama_kegiatan,
-            self._tanggal, # Asumsikan sudah dalam format string yang benar
+            self.tanggal_str,
             self._tempat,
             self._jenis_kegiatan,
-            nama_pj,
+            self._nama_pj,
             self._id_penanggung_jawab
         )
 
+# --- Indeks Pencarian Pengguna ---
+class IndeksPrefixPengguna:
+    """Indeks prefix terurut atas nama (termasuk mulai dari setiap kata), NIM/NIP, dan username.
+
+    Kunci disimpan casefold dalam satu list terurut; pencarian prefix = bisect ke awal rentang lalu
+    membaca maju sampai kunci tidak lagi berawalan prefix, jadi biayanya O(log n + hasil).
+    """
+
+    def __init__(self, pengguna_list):
+        self._pengguna = {p.id_entitas: p for p in pengguna_list}
+        pasangan = sorted({(kunci, p.id_entitas) for p in pengguna_list for kunci in self._kunci_untuk(p)})
+        self._kunci = [kunci for kunci, _ in pasangan]
+        self._ids = [id_pengguna for _, id_pengguna in pasangan]
+        self._urut_nama = sorted(self._pengguna.values(), key=self._kunci_urut)
+
+    @staticmethod
+    def _kunci_untuk(pengguna):
+        kata = (pengguna.nama or "").casefold().split()
+        kunci = {" ".join(kata[i:]) for i in range(len(kata))} # "paul fajar" dan "fajar"
+        for nilai in (pengguna.nim_nip, pengguna.username):
+            if nilai:
+                kunci.add(str(nilai).casefold())
+        return kunci
+
+    @staticmethod
+    def _kunci_urut(pengguna):
+        return (pengguna.nama or "").casefold(), pengguna.id_entitas
+
+    def __len__(self):
+        return len(self._pengguna)
+
+    def semua(self):
+        return list(self._urut_nama)
+
+    def cari(self, teks, batas=PJ_PICKER_BATAS):
+        """Maksimal batas pengguna yang salah satu kuncinya berawalan teks, urut nama; teks kosong = batas pertama."""
+        prefix = " ".join(teks.casefold().split())
+        if not prefix:
+            return self._urut_nama[:batas]
+        hasil = {}
+        i = bisect.bisect_left(self._kunci, prefix)
+        while i < len(self._kunci) and len(hasil) < batas and self._kunci[i].startswith(prefix):
+            hasil.setdefault(self._ids[i], self._pengguna[self._ids[i]])
+            i += 1
+        return sorted(hasil.values(), key=self._kunci_urut)
+
+
+# --- Klasifikasi Query dan Registry Prepared Statement ---
+@functools.lru_cache(maxsize=256)
+def klasifikasi_sql(query):
+    """Mengembalikan (is_write, is_insert) untuk teks query; di-cache agar tidak strip().upper() setiap panggilan."""
+    kata_awal = query.lstrip()[:6].upper()
+    is_insert = kata_awal.startswith("INSERT")
+    return is_insert or kata_awal.startswith(("UPDATE", "DELETE")), is_insert
+
+
+class StatementRegistry:
+    """Query bernama yang di-prepare sekali per koneksi pool.
+
+    Klasifikasi (tulis/baca, mode fetch) dihitung saat pendaftaran. Cursor prepared disimpan per koneksi
+    dan ditutup lewat lupakan() saat pool menutup koneksi itu; eksekusi berikutnya hanya mengirim parameter,
+    bukan teks SQL.
+    """
+    MODE_FETCH = ("one", "all", "none")
+
+    def __init__(self):
+        self._statements = {} # nama -> (sql, fetch, is_write)
+        # koneksi -> {nama: cursor prepared}. Weak hanya sebagai cadangan: cursor prepared bisa menyimpan
+        # referensi kuat ke koneksinya, jadi entri dibersihkan eksplisit oleh lupakan()
+        self._per_conn = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def daftar(self, nama, sql, fetch="all"):
+        if fetch not in self.MODE_FETCH:
+            raise ValueError(f"Mode fetch '{fetch}' tidak dikenal untuk statement '{nama}'.")
+        self._statements[nama] = (sql, fetch, klasifikasi_sql(sql)[0])
+
+    def info(self, nama):
+        try:
+            return self._statements[nama]
+        except KeyError:
+            raise KeyError(f"Statement '{nama}' belum didaftarkan.") from None
+
+    def cursor_untuk(self, conn, nama):
+        """Cursor prepared untuk (koneksi, nama); dibuat (miss) hanya pada pemakaian pertama di koneksi itu."""
+        with self._lock:
+            cursors = self._per_conn.setdefault(conn, {})
+            cursor = cursors.get(nama)
+            if cursor is not None:
+                self._stats["hits"] += 1
+                return cursor
+            self._stats["misses"] += 1
+        cursor = conn.cursor(prepared=True) # Koneksi sedang dipinjam satu thread, aman dibuat di luar lock
+        with self._lock:
+            self._per_conn.setdefault(conn, {})[nama] = cursor
+        return cursor
+
+    def buang(self, conn, nama):
+        """Membuang cursor prepared yang gagal agar di-prepare ulang pada pemakaian berikutnya."""
+        with self._lock:
+            cursor = self._per_conn.get(conn, {}).pop(nama, None)
+            if cursor is not None:
+                self._stats["invalidations"] += 1
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def lupakan(self, conn):
+        """Menutup dan membuang semua cursor prepared milik koneksi yang akan ditutup pool."""
+        with self._lock:
+            cursors = self._per_conn.pop(conn, None)
+        for cursor in (cursors or {}).values():
+            try:
+                cursor.close()
+            except Exception:
+                pass # Koneksi yang sudah putus boleh gagal menutup cursor
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["connections"] = len(self._per_conn)
+            stats["prepared_total"] = sum(len(c) for c in self._per_conn.values())
+        stats["statements"] = len(self._statements)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+
+class ReferenceDataCache:
+    """Cache data referensi (Role, Pengguna) yang dipakai bersama seluruh aplikasi lewat DatabaseManager.
+
+    Entri dianggap segar selama ttl_detik. Setelah itu versi tabelnya dibaca (satu query kecil ke
+    Versi_Referensi, dinaikkan trigger setiap INSERT/UPDATE/DELETE): jika sama, entri dipakai lagi tanpa
+    memuat ulang tabel. invalidasi() memaksa muat ulang pada permintaan berikutnya.
+    """
+
+    def __init__(self, ttl_detik=REFERENSI_TTL_DETIK):
+        self.ttl_detik = ttl_detik
+        self._entri = {} # nama -> (versi, data, waktu_cek monotonic)
+        self._generasi = 0 # Naik setiap invalidasi; hasil muat yang dimulai sebelumnya tidak disimpan
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "revalidations": 0, "misses": 0, "invalidations": 0}
+
+    def ambil(self, nama, muat, baca_versi):
+        """Data untuk nama dari cache, atau hasil muat() jika belum ada atau versinya berubah.
+
+        baca_versi() mengembalikan versi terkini tabel; dipanggil hanya setelah TTL lewat atau saat miss.
+        """
+        with self._lock:
+            entri = self._entri.get(nama)
+            generasi = self._generasi
+            if entri is not None and time.monotonic() - entri[2] < self.ttl_detik:
+                self._stats["hits"] += 1
+                return entri[1]
+        versi = baca_versi()
+        if entri is not None and versi == entri[0]:
+            with self._lock:
+                self._stats["revalidations"] += 1
+                if self._entri.get(nama) is entri:
+                    self._entri[nama] = (versi, entri[1], time.monotonic())
+            return entri[1]
+        data = muat() # Versi dibaca lebih dulu: perubahan di antara keduanya terdeteksi pada cek berikutnya
+        with self._lock:
+            self._stats["misses"] += 1
+            if self._generasi == generasi:
+                self._entri[nama] = (versi, data, time.monotonic())
+        return data
+
+    def invalidasi(self, nama=None):
+        """Membuang satu entri (atau semua jika nama None)."""
+        with self._lock:
+            self._generasi += 1
+            self._stats["invalidations"] += 1
+            if nama is None:
+                self._entri.clear()
+            else:
+                self._entri.pop(nama, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = sorted(self._entri)
+        total = stats["hits"] + stats["revalidations"] + stats["misses"]
+        # Revalidasi tetap dihitung hit: tabel tidak dimuat ulang, hanya versinya yang dibaca
+        stats["hit_rate"] = (stats["hits"] + stats["revalidations"]) / total if total else 0.0
+        stats["ttl_detik"] = self.ttl_detik
+        return stats
+
+
+# --- Instrumentasi Query ---
+_KONTEKS_AKSI = threading.local() # Label aksi UI yang sedang dijalankan thread worker ini
+
+
+def aksi_saat_ini():
+    """Label aksi UI yang memicu query di thread ini (diisi TaskExecutor), atau None di luar tugas."""
+    return getattr(_KONTEKS_AKSI, "nama", None)
+
+
+@functools.lru_cache(maxsize=1024)
+def sidik_sql(query):
+    """Fingerprint SQL: spasi dirapikan, literal dan placeholder menjadi '?', daftar IN (...) sepanjang apa pun diringkas.
+
+    Query yang hanya berbeda nilai atau panjang daftar IN masuk ke satu entri statistik yang sama.
+    """
+    teks = " ".join(query.split())
+    teks = re.sub(r"'(?:[^'\\]|\\.)*'", "?", teks)
+    teks = re.sub(r"\b\d+(?:\.\d+)?\b", "?", teks)
+    teks = teks.replace("%s", "?")
+    return re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", teks)
+
+
+class QueryInstrumentation:
+    """Statistik per fingerprint SQL: histogram latensi, jumlah baris, dan waktu ambil koneksi.
+
+    DatabaseManager hanya memanggil ukur() jika objek ini dipasang; tanpa instrumentasi jalur query
+    cukup satu pengecekan atribut. Query yang melewati ambang slow_ms ditulis ke slow-query log
+    (JSON Lines) beserta fingerprint dan aksi UI pemanggilnya; parameter tidak pernah dicatat.
+    """
+    BATAS_HISTOGRAM_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000) # Bucket terakhir: > 5000 ms
+    PANJANG_SIDIK_MAKS = 500 # Blok DDL panjang cukup diwakili awalnya
+
+    def __init__(self, slow_ms=INSTRUMENTASI_SLOW_MS, slow_log_path=INSTRUMENTASI_SLOW_LOG):
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        self._lock = threading.Lock()
+        self._per_sidik = {} # fingerprint -> dict statistik
+        self._lokal = threading.local() # Waktu ambil koneksi milik panggilan yang sedang diukur di thread ini
+        self._jumlah_lambat = 0
+        self._mulai = time.time()
+        self._berhenti = threading.Event()
+        self._thread_dump = None
+
+    def catat_connect(self, durasi):
+        """Dipanggil DatabaseManager setelah meminjam koneksi dari pool (detik)."""
+        self._lokal.connect = getattr(self._lokal, "connect", 0.0) + durasi
+
+    def ukur(self, sql, fn, *args):
+        """Menjalankan fn(*args) dan mencatat durasinya di bawah fingerprint sql."""
+        self._lokal.connect = 0.0
+        hasil = None
+        gagal = True
+        mulai = time.perf_counter()
+        try:
+            hasil = fn(*args)
+            gagal = False
+            return hasil
+        finally:
+            durasi = time.perf_counter() - mulai
+            self._rekam(sql, durasi, self._lokal.connect, self._jumlah_baris(hasil), gagal)
+
+    @staticmethod
+    def _jumlah_baris(hasil):
+        """Baris yang dikembalikan: list (fetch all), tuple (fetch one), None (kosong); rowcount/lastrowid tidak dihitung."""
+        if isinstance(hasil, list):
+            return len(hasil)
+        if isinstance(hasil, tuple):
+            return 1
+        return 0
+
+    def _rekam(self, sql, durasi, durasi_connect, baris, gagal):
+        sidik = sidik_sql(sql)[:self.PANJANG_SIDIK_MAKS]
+        durasi_ms = durasi * 1000
+        bucket = bisect.bisect_left(self.BATAS_HISTOGRAM_MS, durasi_ms)
+        with self._lock:
+            stat = self._per_sidik.get(sidik)
+            if stat is None:
+                stat = self._per_sidik[sidik] = {"jumlah": 0, "gagal": 0, "total_ms": 0.0, "maks_ms": 0.0,
+                                                 "connect_ms": 0.0, "baris": 0,
+                                                 "histogram": [0] * (len(self.BATAS_HISTOGRAM_MS) + 1)}
+            stat["jumlah"] += 1
+            stat["gagal"] += gagal
+            stat["total_ms"] += durasi_ms
+            stat["maks_ms"] = max(stat["maks_ms"], durasi_ms)
+            stat["connect_ms"] += durasi_connect * 1000
+            stat["baris"] += baris
+            stat["histogram"][bucket] += 1
+            lambat = self.slow_ms is not None and durasi_ms >= self.slow_ms
+            if lambat:
+                self._jumlah_lambat += 1
+        if lambat and self.slow_log_path:
+            self._tulis_slow_log({
+                "waktu": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                "durasi_ms": round(durasi_ms, 3), "connect_ms": round(durasi_connect * 1000, 3),
+                "baris": baris, "gagal": gagal, "aksi": aksi_saat_ini(),
+                "thread": threading.current_thread().name, "sidik": sidik,
+            })
+
+    def _tulis_slow_log(self, entri):
+        baris = json.dumps(entri, ensure_ascii=False) + "\n"
+        try:
+            with self._lock, open(self.slow_log_path, "a", encoding="utf-8") as f:
+                f.write(baris)
+        except OSError as e:
+            print(f"Peringatan: slow-query log tidak dapat ditulis ({e}).")
+
+    def snapshot(self):
+        """Salinan statistik yang aman diserialisasi JSON, diurutkan dari total waktu terbesar."""
+        with self._lock:
+            per_sidik = {sidik: dict(stat, histogram=list(stat["histogram"])) for sidik, stat in self._per_sidik.items()}
+            jumlah_lambat = self._jumlah_lambat
+        statement = []
+        for sidik, stat in sorted(per_sidik.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            stat["rata_ms"] = stat["total_ms"] / stat["jumlah"]
+            for kunci in ("total_ms", "maks_ms", "connect_ms", "rata_ms"):
+                stat[kunci] = round(stat[kunci], 3)
+            statement.append({"sidik": sidik, **stat})
+        return {
+            "dibuat": datetime.datetime.now().isoformat(timespec="seconds"),
+            "sejak": datetime.datetime.fromtimestamp(self._mulai).isoformat(timespec="seconds"),
+            "batas_histogram_ms": list(self.BATAS_HISTOGRAM_MS),
+            "slow_ms": self.slow_ms,
+            "jumlah_query": sum(s["jumlah"] for s in statement),
+            "jumlah_lambat": jumlah_lambat,
+            "statement": statement,
+        }
+
+    def tulis_dump(self, path, ekstra=None):
+        """Menulis snapshot (plus ekstra, mis. statistik pool) secara atomik: file .part lalu os.replace."""
+        data = self.snapshot()
+        if ekstra:
+            data.update(ekstra() if callable(ekstra) else ekstra)
+        sementara = path + ".part"
+        with open(sementara, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, default=str)
+        os.replace(sementara, path)
+
+    def mulai_dump_berkala(self, path, interval_detik=INSTRUMENTASI_DUMP_DETIK, ekstra=None):
+        """Menulis dump setiap interval_detik di thread daemon sampai hentikan() dipanggil."""
+        def loop():
+            while not self._berhenti.wait(interval_detik):
+                try:
+                    self.tulis_dump(path, ekstra)
+                except OSError as e:
+                    print(f"Peringatan: dump instrumentasi gagal ditulis ({e}).")
+        self._berhenti.clear()
+        self._thread_dump = threading.Thread(target=loop, name="dump-instrumentasi", daemon=True)
+        self._thread_dump.start()
+
+    def hentikan(self):
+        self._berhenti.set()
+        if self._thread_dump is not None:
+            self._thread_dump.join(timeout=2)
+            self._thread_dump = None
+
+
+# --- Kelas untuk Pool Koneksi Database ---
+class ConnectionPool:
+    """Pool koneksi MySQL yang terbatas (bounded) dan aman dipakai lintas thread."""
+    def __init__(self, connection_factory, min_size=1, max_size=5, max_idle_seconds=300,
+                 checkout_timeout=10, on_close=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Ukuran pool tidak valid: butuh 0 <= min_size <= max_size dan max_size >= 1.")
+        self._connection_factory = connection_factory # Fungsi pembuat koneksi baru
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_idle_seconds = max_idle_seconds
+        self._checkout_timeout = checkout_timeout
+        self._on_close = on_close # Dipanggil dengan koneksi tepat sebelum pool menutupnya
+
+        self._lock = threading.Condition()
+        self._idle = deque() # Berisi tuple (koneksi, waktu_terakhir_dipakai)
+        self._total = 0 # Jumlah koneksi hidup (idle + sedang dipinjam)
+        self._closed = False
+        self._stats = {
+            "checkouts": 0, "creates": 0, "waits": 0, "wait_time_total": 0.0,
+            "health_check_failures": 0, "idle_evictions": 0, "checkout_time_total": 0.0
+        }
+
+    def _create(self):
+        """Membuat koneksi baru. Slot di self._total harus sudah dipesan oleh pemanggil."""
+        try:
+            conn = self._connection_factory()
+        except Exception:
+            with self._lock:
+                self._total -= 1 # Lepaskan slot yang gagal dipakai
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._stats["creates"] += 1
+        return conn
+
+    def _close(self, conn):
+        """Menutup koneksi fisik; sumber daya per koneksi (cursor prepared) dilepas lewat on_close lebih dulu."""
+        try:
+            if self._on_close is not None:
+                self._on_close(conn)
+            conn.close()
+        except Exception:
+            pass # Koneksi yang sudah putus boleh gagal ditutup
+
+    def _discard(self, conn):
+        """Menutup koneksi dan mengembalikan slotnya ke pool."""
+        self._close(conn)
+        with self._lock:
+            self._total -= 1
+            self._lock.notify()
+
+    def _is_healthy(self, conn):
+        """Health check saat checkout: ping tanpa reconnect, koneksi rusak dibuang."""
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle_locked(self, now):
+        """Mengeluarkan koneksi idle yang terlalu lama, menyisakan minimal min_size. Dipanggil saat lock dipegang."""
+        evicted = []
+        while self._idle and self._total > self._min_size:
+            conn, last_used = self._idle[0] # Elemen paling kiri adalah yang paling lama idle
+            if now - last_used < self._max_idle_seconds:
+                break
+            self._idle.popleft()
+            self._total -= 1
+            self._stats["idle_evictions"] += 1
+            evicted.append(conn)
+        return evicted
+
+    def checkout(self):
+        """Meminjam koneksi dari pool (menunggu jika pool penuh)."""
+        start = time.perf_counter()
+        deadline = start + self._checkout_timeout
+        waited = False
+        while True:
+            conn = None
+            create_new = False
+            with self._lock:
+                if self._closed:
+                    raise mysql.connector.Error("Pool koneksi sudah ditutup.")
+                evicted = self._evict_idle_locked(time.monotonic())
+                if self._idle:
+                    conn, _ = self._idle.pop() # LIFO: koneksi yang paling baru dipakai paling mungkin masih hidup
+                elif self._total < self._max_size:
+                    self._total += 1 # Pesan slot sebelum membuat koneksi di luar lock
+                    create_new = True
+                else:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise mysql.connector.Error(f"Timeout menunggu koneksi dari pool (maks {self._max_size} koneksi).")
+                    if not waited:
+                        self._stats["waits"] += 1
+                        waited = True
+                    wait_start = time.perf_counter()
+                    self._lock.wait(remaining)
+                    self._stats["wait_time_total"] += time.perf_counter() - wait_start
+            for old_conn in evicted:
+                self._close(old_conn)
+
+            if create_new:
+                conn = self._create()
+            elif conn is None:
+                continue # Bangun dari wait, coba lagi
+            elif not self._is_healthy(conn):
+                # Reconnect transparan: buang koneksi rusak lalu buat pengganti di slot yang sama
+                with self._lock:
+                    self._stats["health_check_failures"] += 1
+                self._close(conn)
+                conn = self._create()
+
+            with self._lock:
+                self._stats["checkouts"] += 1
+                self._stats["checkout_time_total"] += time.perf_counter() - start
+            return conn
+
+    def release(self, conn):
+        """Mengembalikan koneksi ke pool."""
+        if conn is None:
+            return
+        try:
+            if not conn.is_connected():
+                self._discard(conn)
+                return
+            if conn.in_transaction:
+                conn.rollback() # Jangan wariskan transaksi yang menggantung ke peminjam berikutnya
+        except Exception:
+            self._discard(conn)
+            return
+        with self._lock:
+            if self._closed:
+                close_now = True
+            else:
+                close_now = False
+                self._idle.append((conn, time.monotonic()))
+                self._lock.notify()
+        if close_now:
+            self._discard(conn)
+
+    def warm_up(self):
+        """Mengisi pool hingga min_size koneksi idle."""
+        conns = []
+        try:
+            while True:
+                with self._lock:
+                    if self._total >= self._min_size:
+                        break
+                conns.append(self.checkout())
+        finally:
+            for conn in conns:
+                self.release(conn)
+
+    def close_all(self):
+        """Menutup semua koneksi idle; koneksi yang sedang dipinjam ditutup saat dikembalikan."""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._lock.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def get_stats(self):
+        """Mengembalikan salinan metrik pool (waits, checkouts, creates, dll.)."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size_total"] = self._total
+            stats["size_idle"] = len(self._idle)
+            stats["min_size"] = self._min_size
+            stats["max_size"] = self._max_size
+        checkouts = stats["checkouts"]
+        stats["avg_checkout_ms"] = (stats["checkout_time_total"] / checkouts * 1000) if checkouts else 0.0
+        return stats
+
 # --- Kelas untuk Manajemen Database ---
-# --- Kelas untuk Manajemen Database ---
+def langkah_migrasi(versi):
+    """Menandai fungsi langkah migrasi dengan versi definisinya.
+
+    Isi fungsi tidak ikut checksum skema; naikkan versi ini setiap kali langkah (atau fungsi yang dipanggilnya)
+    diubah agar migrasi pemiliknya dipasang ulang.
+    """
+    def tandai(fn):
+        fn.STEP_VERSI = versi
+        return fn
+    return tandai
+
+
+class LangkahDDLBersyarat:
+    """Langkah migrasi berupa satu DDL yang hanya dijalankan jika kolom/indeks targetnya belum ada.
+
+    jenis: 'kolom' atau 'indeks' (lihat DatabaseManager._objek_skema_ada). Checksum hanya memakai teks DDL,
+    sama seperti langkah string biasa.
+    """
+    __slots__ = ("jenis", "tabel", "nama", "ddl")
+
+    def __init__(self, jenis, tabel, nama, ddl):
+        self.jenis = jenis
+        self.tabel = tabel
+        self.nama = nama
+        self.ddl = ddl
+
+
 class DatabaseManager:
-    def __init__(self, host, user, password, database_name):
+    # Query statis yang sering dipanggil, dijalankan lewat execute_named: nama -> (sql, mode fetch)
+    STATEMENT_BERNAMA = {
+        "verifikasi_kredensial": ("SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna "
+                                  "WHERE Username = %s AND Password = %s", "one"),
+        "daftar_role": ("SELECT Role_ID, Nama_Role FROM Role ORDER BY Nama_Role", "all"),
+        "semua_pengguna": ("SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna ORDER BY Nama", "all"),
+        "semua_kegiatan": ("SELECT ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan, "
+                           "ID_Penanggung_Jawab, Nama_Penanggung_Jawab FROM View_Detail_Kegiatan "
+                           "ORDER BY Tanggal DESC, ID_Kegiatan DESC", "all"),
+        "jumlah_kegiatan": ("SELECT COUNT(*) FROM Kegiatan", "one"),
+        "jumlah_pengguna": ("SELECT COUNT(*) FROM Pengguna", "one"),
+        # Rentang [awal, akhir) pada IDX_Kegiatan_Tanggal_Date: range scan indeks, GROUP BY mengikuti urutan indeks
+        "beban_harian": ("SELECT Tanggal_Date, COUNT(*) FROM Kegiatan WHERE Tanggal_Date >= %s AND Tanggal_Date < %s "
+                         "GROUP BY Tanggal_Date", "all"),
+        "batas_log": ("SELECT MIN(ID_Log), MAX(ID_Log) FROM Log_Perubahan_Kegiatan", "one"),
+        "detail_log": ("SELECT Detail_Lama, Detail_Baru FROM Log_Perubahan_Kegiatan WHERE ID_Log = %s", "one"),
+        "detail_log_arsip": ("SELECT Detail_Lama, Detail_Baru FROM Log_Perubahan_Kegiatan_Arsip WHERE ID_Log = %s", "one"),
+        "daftar_bulan_arsip": ("SELECT Bulan, Jumlah_Baris, File_Ekspor FROM Log_Arsip_Bulan ORDER BY Bulan DESC", "all"),
+        "versi_referensi": ("SELECT Nama, Versi FROM Versi_Referensi", "all"),
+    }
+
+    def __init__(self, host, user, password, database_name,
+                 pool_min_size=1, pool_max_size=5, pool_max_idle_seconds=300, pool_checkout_timeout=10,
+                 instrumentasi=None, referensi_ttl_detik=REFERENSI_TTL_DETIK):
         # Enkapsulasi: Atribut instance bersifat private-like
         self._host = host
         self._user = user
         self._password = password
         self._database_name = database_name
+        # Semua query memakai koneksi dari pool, bukan koneksi baru per query
+        self._statements = StatementRegistry()
+        self._pool = ConnectionPool(self._create_connection, min_size=pool_min_size, max_size=pool_max_size,
+                                    max_idle_seconds=pool_max_idle_seconds, checkout_timeout=pool_checkout_timeout,
+                                    on_close=self._statements.lupakan)
+        for nama, (sql, fetch) in self.STATEMENT_BERNAMA.items():
+            self._statements.daftar(nama, sql, fetch)
+        self._instrumentasi = instrumentasi # QueryInstrumentation opsional; None berarti tanpa pengukuran
+        self._referensi = ReferenceDataCache(referensi_ttl_detik) # Role dan Pengguna, dibagi semua jendela
+        self._aturan_fulltext = None # (panjang token minimum, stopword) dari server, dibaca saat pertama dipakai
+
+    @property
+    def instrumentasi(self):
+        return self._instrumentasi
 
     def _get_connection(self):
-        """Membuat dan mengembalikan koneksi database."""
+        """Meminjam koneksi dari pool. Kembalikan dengan _release_connection."""
+        if self._instrumentasi is None:
+            return self._pool.checkout()
+        mulai = time.perf_counter()
+        conn = self._pool.checkout()
+        self._instrumentasi.catat_connect(time.perf_counter() - mulai)
+        return conn
+
+    def _release_connection(self, conn):
+        """Mengembalikan koneksi ke pool (bukan menutupnya)."""
+        self._pool.release(conn)
+
+    def get_pool_stats(self):
+        """Metrik pool koneksi untuk memantau latensi per panggilan."""
+        return self._pool.get_stats()
+
+    def get_statement_stats(self):
+        """Metrik registry prepared statement (hits, misses, hit_rate, jumlah statement ter-prepare)."""
+        return self._statements.get_stats()
+
+    def get_referensi_stats(self):
+        """Metrik cache data referensi (hits, revalidations, misses, invalidations, hit_rate)."""
+        return self._referensi.get_stats()
+
+    def invalidasi_referensi(self, nama=None):
+        """Memaksa 'Role' atau 'Pengguna' (atau keduanya jika None) dimuat ulang pada permintaan berikutnya."""
+        self._referensi.invalidasi(nama)
+
+    def close(self):
+        """Menutup semua koneksi di pool."""
+        self._pool.close_all()
+
+    def _create_connection(self):
+        """Membuat koneksi database baru (dipakai oleh pool)."""
         try:
             return mysql.connector.connect(
                 host=self._host,
                 user=self._user,
                 password=self._password,
-                database=self._database_name
+                database=self._database_name,
+                consume_results=True # Koneksi dipakai ulang oleh pool, sisa hasil query harus dibersihkan
             )
         except mysql.connector.Error as err:
             if err.errno == mysql.connector.errorcode.ER_BAD_DB_ERROR:
@@ -144,7 +910,8 @@ class DatabaseManager:
                     temp_cursor.close()
                     temp_conn.close()
                     return mysql.connector.connect(
-                        host=self._host, user=self._user, password=self._password, database=self._database_name
+                        host=self._host, user=self._user, password=self._password, database=self._database_name,
+                        consume_results=True
                     )
                 except mysql.connector.Error as create_err:
                     raise mysql.connector.Error(f"Gagal membuat atau terhubung ke database '{self._database_name}': {create_err}") from create_err
@@ -153,6 +920,11 @@ class DatabaseManager:
 
     def execute_query(self, query, params=None, fetch_one=False, fetch_all=False, is_many=False, is_ddl=False): # Mengganti is_ddl_multi menjadi is_ddl
         """Mengeksekusi query SQL dan mengelola koneksi."""
+        if self._instrumentasi is None:
+            return self._execute_query(query, params, fetch_one, fetch_all, is_many, is_ddl)
+        return self._instrumentasi.ukur(query, self._execute_query, query, params, fetch_one, fetch_all, is_many, is_ddl)
+
+    def _execute_query(self, query, params, fetch_one, fetch_all, is_many, is_ddl):
         conn = None
         try:
             conn = self._get_connection()
@@ -184,7 +956,8 @@ class DatabaseManager:
                 cursor.execute(query, params)
 
             # Commit jika query adalah DML yang mengubah data atau DDL
-            if query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")) or is_ddl:
+            is_write, is_insert = klasifikasi_sql(query)
+            if is_write or is_ddl:
                 conn.commit()
 
             # Fetch results jika diperlukan (biasanya bukan untuk DDL)
@@ -198,7 +971,7 @@ class DatabaseManager:
                 return result
             
             # Return lastrowid untuk INSERT atau rowcount untuk operasi lain
-            if cursor.lastrowid and query.strip().upper().startswith("INSERT"):
+            if cursor.lastrowid and is_insert:
                 last_id = cursor.lastrowid
                 cursor.close()
                 return last_id
@@ -212,11 +985,57 @@ class DatabaseManager:
                 conn.rollback()
             raise err # Re-raise error untuk ditangani di level lebih tinggi
         finally:
-            if conn and conn.is_connected():
-                conn.close()
+            if conn:
+                self._release_connection(conn)
 
 
+    def execute_named(self, nama, params=()):
+        """Menjalankan statement terdaftar (STATEMENT_BERNAMA) dengan parameter terikat.
+
+        Statement di-prepare sekali per koneksi pool; mode fetch dan keputusan commit diambil dari
+        klasifikasi yang sudah di-cache. Mengembalikan satu baris ('one'), list baris ('all'),
+        atau rowcount ('none').
+        """
+        if self._instrumentasi is None:
+            return self._execute_named(nama, params)
+        return self._instrumentasi.ukur(self._statements.info(nama)[0], self._execute_named, nama, params)
+
+    def _execute_named(self, nama, params):
+        sql, fetch, is_write = self._statements.info(nama)
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = self._statements.cursor_untuk(conn, nama)
+            try:
+                cursor.execute(sql, tuple(params))
+                if fetch == "one":
+                    rows = cursor.fetchall() # Habiskan hasil agar cursor prepared siap dipakai lagi
+                    result = rows[0] if rows else None
+                elif fetch == "all":
+                    result = cursor.fetchall()
+                else:
+                    result = cursor.rowcount
+            except mysql.connector.Error:
+                self._statements.buang(conn, nama)
+                raise
+            if is_write:
+                conn.commit()
+            return result
+        except mysql.connector.Error as err:
+            if conn:
+                conn.rollback()
+            raise err
+        finally:
+            if conn:
+                self._release_connection(conn)
+
     def call_stored_procedure(self, proc_name, args=()):
+        if self._instrumentasi is None:
+            return self._call_stored_procedure(proc_name, args)
+        return self._instrumentasi.ukur(f"CALL {proc_name}({', '.join(['%s'] * len(args))})",
+                                        self._call_stored_procedure, proc_name, args)
+
+    def _call_stored_procedure(self, proc_name, args):
         conn = None
         cursor = None
         try:
@@ -241,38 +1060,207 @@ class DatabaseManager:
         finally:
             if cursor:
                 cursor.close()
-            if conn and conn.is_connected():
-                conn.close()
-
-    def _execute_ddl_block(self, ddl_string):
-        """Mengeksekusi satu blok DDL string."""
+            if conn:
+                self._release_connection(conn)
+
+    # Error "objek sudah ada" yang boleh dilewati saat DDL dijalankan ulang. Nomor mentah, bukan konstanta
+    # errorcode: tidak semua nama (misalnya ER_VIEW_EXISTS) ada di mysql.connector.errorcode.
+    DDL_ERRNO_SUDAH_ADA = frozenset({
+        1007, # ER_DB_CREATE_EXISTS
+        1050, # ER_TABLE_EXISTS_ERROR (juga view)
+        1060, # ER_DUP_FIELDNAME: kolom dari ALTER TABLE ADD COLUMN sudah ada
+        1061, # ER_DUP_KEYNAME: indeks dengan nama sama sudah ada
+        1304, # ER_SP_ALREADY_EXISTS
+        1359, # ER_TRG_ALREADY_EXISTS
+    })
+
+    def _execute_ddl_block(self, ddl_string, cursor=None):
+        """Mengeksekusi satu blok DDL string (di cursor yang diberikan, atau lewat execute_query)."""
         try:
             ddl_string = ddl_string.strip()
-            if ddl_string: # Pastikan string tidak kosong
+            if ddl_string and cursor is not None:
+                cursor.execute(ddl_string) # DDL di MySQL langsung ter-commit secara implisit
+            elif ddl_string: # Pastikan string tidak kosong
                  # Tandai sebagai DDL agar execute_query menanganinya dengan tepat
                 self.execute_query(ddl_string, is_ddl=True)
         except mysql.connector.Error as e:
-            # Daftar error number yang umum untuk objek yang sudah ada
-            existing_object_errors = [
-                mysql.connector.errorcode.ER_TABLE_EXISTS_ERROR,
-                mysql.connector.errorcode.ER_VIEW_EXISTS,
-                mysql.connector.errorcode.ER_SP_ALREADY_EXISTS, # Stored Procedure
-                mysql.connector.errorcode.ER_TRG_ALREADY_EXISTS, # Trigger
-                mysql.connector.errorcode.ER_DB_CREATE_EXISTS, # Database
-                mysql.connector.errorcode.ER_INDEX_EXISTS # Jika ada CREATE INDEX eksplisit
-                # Mungkin ada error lain terkait "already exists"
-            ]
-            if e.errno in existing_object_errors or "already exists" in e.msg.lower(): # Periksa juga pesan error
+            if e.errno in self.DDL_ERRNO_SUDAH_ADA or "already exists" in (e.msg or "").lower(): # Periksa juga pesan error
                 print(f"Info: Objek DDL sudah ada atau operasi serupa sudah dilakukan, dilewati. Detail: {str(e)[:150]}")
             else:
                 # Cetak query yang bermasalah untuk debugging
                 print(f"Error saat eksekusi DDL block: {e}\nQuery Bermasalah:\n{ddl_string[:500]}{'...' if len(ddl_string) > 500 else ''}")
                 raise # Re-raise error jika bukan karena objek sudah ada
 
-    # ... sisa kelas DatabaseManager (initialize_database, dll.) tetap sama ...
-    # Pastikan metode initialize_database memanggil _execute_ddl_block untuk setiap DDL
     def initialize_database(self):
-        """Membuat tabel, view, trigger, dan stored procedure."""
+        """Memastikan skema database terbaru terpasang.
+
+        Warm start hanya membaca satu baris Schema_Meta; jika versi dan checksum cocok, semua DDL dilewati.
+        Rincian waktu tersimpan di self.startup_timings.
+        """
+        self.startup_timings = {}
+        self.schema_warm_start = False
+        self.schema_migrasi_dijalankan = [] # Versi migrasi yang dijalankan pada pemanggilan ini
+        target_version, target_checksum = self.get_schema_target()
+
+        t_start = time.perf_counter()
+        conn = self._get_connection()
+        self.startup_timings["connect"] = time.perf_counter() - t_start
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            t_lookup = time.perf_counter()
+            meta = self._read_schema_meta(cursor)
+            self.startup_timings["schema_lookup"] = time.perf_counter() - t_lookup
+            if meta == (target_version, target_checksum):
+                self.schema_warm_start = True
+                return
+
+            t_migrate = time.perf_counter()
+            self._apply_schema_migrations(conn, cursor, target_version, target_checksum)
+            self.startup_timings["migrations"] = time.perf_counter() - t_migrate
+        finally:
+            if cursor: cursor.close()
+            self._release_connection(conn)
+
+        # Inisialisasi data awal (hanya di cold start / setelah migrasi)
+        t_seed = time.perf_counter()
+        self._initialize_data_if_empty()
+        self.startup_timings["seed_data"] = time.perf_counter() - t_seed
+
+    # --- Migrasi Skema Berversi ---
+    def _get_schema_migrations(self):
+        """Daftar migrasi (versi, deskripsi, langkah) berurutan.
+
+        Setiap langkah adalah string DDL, LangkahDDLBersyarat, atau fungsi yang menerima koneksi migrasi.
+        """
+        return [
+            (1, "Skema dasar", self._ddl_skema_dasar()),
+            (2, "Kolom DATE Kegiatan.Tanggal_Date beserta indeks", self._langkah_migrasi_v2_tanggal_date()),
+            (3, "Indeks log: Timestamp_Aksi dan ID_Kegiatan_Ref", self._langkah_migrasi_v3_indeks_log()),
+            (4, "Tabel arsip log dan daftar bulan yang diarsipkan", self._langkah_migrasi_v4_arsip_log()),
+            (5, "Indeks pencarian kegiatan: komposit dan FULLTEXT nama", self._langkah_migrasi_v5_indeks_pencarian()),
+            (6, "Sekuens ID dan SP_DaftarPengguna", self._langkah_migrasi_v6_daftar_pengguna()),
+            (7, "Versi data referensi Role dan Pengguna", self._langkah_migrasi_v7_versi_referensi()),
+            (8, "Indeks nama pengguna untuk pencarian prefix", self._langkah_migrasi_v8_indeks_nama_pengguna()),
+        ]
+
+    @staticmethod
+    def _checksum_migrasi(versi, deskripsi, langkah):
+        """Checksum sha256 definisi satu migrasi; disimpan per versi di Schema_Versi."""
+        digest = hashlib.sha256(f"{versi}|{deskripsi}\n".encode("utf-8"))
+        for step in langkah:
+            if isinstance(step, LangkahDDLBersyarat):
+                step_text = " ".join(step.ddl.split())
+            elif callable(step):
+                if not hasattr(step, "STEP_VERSI"):
+                    raise TypeError(f"Langkah migrasi v{versi} '{step.__name__}' belum ditandai @langkah_migrasi.")
+                step_text = f"{step.__name__}@{step.STEP_VERSI}"
+            else:
+                step_text = " ".join(step.split()) # Spasi/indentasi tidak mengubah checksum
+            digest.update(step_text.encode("utf-8") + b"\n")
+        return digest.hexdigest()
+
+    def get_schema_target(self):
+        """Mengembalikan (versi terbaru, checksum sha256 dari checksum setiap migrasi)."""
+        migrations = self._get_schema_migrations()
+        digest = hashlib.sha256()
+        for versi, deskripsi, langkah in migrations:
+            digest.update(self._checksum_migrasi(versi, deskripsi, langkah).encode("ascii"))
+        return migrations[-1][0], digest.hexdigest()
+
+    def _read_schema_meta(self, cursor):
+        """Membaca (versi, checksum) dari Schema_Meta; None jika tabel belum ada."""
+        try:
+            cursor.execute("SELECT Versi, Checksum FROM Schema_Meta WHERE ID = 1")
+            row = cursor.fetchone()
+            return (row[0], row[1]) if row else None
+        except mysql.connector.Error as e:
+            if e.errno == mysql.connector.errorcode.ER_NO_SUCH_TABLE:
+                return None
+            raise
+
+    def _objek_skema_ada(self, cursor, jenis, tabel, nama):
+        """Apakah kolom ('kolom') atau indeks ('indeks') sudah ada di database aktif, menurut information_schema.
+
+        ADD COLUMN dan CREATE INDEX tidak punya IF NOT EXISTS di MySQL; dicek dulu agar migrasi bisa dijalankan ulang.
+        """
+        if jenis == "kolom":
+            cursor.execute("SELECT 1 FROM information_schema.COLUMNS "
+                           "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s", (tabel, nama))
+        elif jenis == "indeks":
+            cursor.execute("SELECT 1 FROM information_schema.STATISTICS "
+                           "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s", (tabel, nama))
+        else:
+            raise ValueError(f"Jenis objek skema '{jenis}' tidak dikenal.")
+        return bool(cursor.fetchall()) # fetchall: cursor tidak di-buffer, hasil harus habis dibaca
+
+    def _apply_schema_migrations(self, conn, cursor, target_version, target_checksum):
+        """Menjalankan migrasi yang belum terpasang atau yang definisinya berubah, berurutan di satu koneksi.
+
+        Schema_Versi menyimpan checksum per versi, sehingga perubahan satu definisi hanya memasang ulang migrasi itu.
+        """
+        self._execute_ddl_block("""
+        CREATE TABLE IF NOT EXISTS Schema_Versi (
+            Versi INT PRIMARY KEY,
+            Deskripsi VARCHAR(200) NOT NULL,
+            Checksum CHAR(64) NULL,
+            Diterapkan_Pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""", cursor)
+        # Schema_Versi dari versi aplikasi sebelumnya belum punya kolom Checksum
+        if not self._objek_skema_ada(cursor, "kolom", "Schema_Versi", "Checksum"):
+            self._execute_ddl_block("""
+            ALTER TABLE Schema_Versi ADD COLUMN Checksum CHAR(64) NULL AFTER Deskripsi""", cursor)
+        self._execute_ddl_block("""
+        CREATE TABLE IF NOT EXISTS Schema_Meta (
+            ID TINYINT PRIMARY KEY,
+            Versi INT NOT NULL,
+            Checksum CHAR(64) NOT NULL,
+            Diperbarui_Pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""", cursor)
+
+        # Riwayat Schema_Versi adalah sumber kebenaran; Schema_Meta hanya jalur cepat warm start
+        cursor.execute("SELECT Versi, Checksum FROM Schema_Versi")
+        terpasang = dict(cursor.fetchall())
+
+        for versi, deskripsi, langkah in self._get_schema_migrations():
+            checksum = self._checksum_migrasi(versi, deskripsi, langkah)
+            if versi in terpasang:
+                checksum_lama = terpasang[versi]
+                if checksum_lama == checksum:
+                    continue
+                if checksum_lama is None:
+                    # Dipasang sebelum checksum per versi dicatat: anggap terpasang dengan definisi sekarang
+                    cursor.execute("UPDATE Schema_Versi SET Checksum = %s WHERE Versi = %s", (checksum, versi))
+                    conn.commit()
+                    continue
+                print(f"Info: Definisi migrasi v{versi} berubah, hanya migrasi ini yang dipasang ulang.")
+            print(f"Menjalankan migrasi skema v{versi}: {deskripsi}...")
+            for step in langkah:
+                if isinstance(step, LangkahDDLBersyarat):
+                    if not self._objek_skema_ada(cursor, step.jenis, step.tabel, step.nama):
+                        self._execute_ddl_block(step.ddl, cursor)
+                elif callable(step):
+                    step(conn)
+                else:
+                    self._execute_ddl_block(step, cursor)
+            cursor.execute("""
+                INSERT INTO Schema_Versi (Versi, Deskripsi, Checksum) VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE Deskripsi = VALUES(Deskripsi), Checksum = VALUES(Checksum),
+                    Diterapkan_Pada = CURRENT_TIMESTAMP""",
+                (versi, deskripsi, checksum))
+            conn.commit()
+            self.schema_migrasi_dijalankan.append(versi)
+            print(f"Migrasi skema v{versi} selesai.")
+
+        cursor.execute("""
+            INSERT INTO Schema_Meta (ID, Versi, Checksum) VALUES (1, %s, %s)
+            ON DUPLICATE KEY UPDATE Versi = VALUES(Versi), Checksum = VALUES(Checksum)""",
+            (target_version, target_checksum))
+        conn.commit()
+
+    def _ddl_skema_dasar(self):
+        """DDL skema versi 1: tabel, view, trigger, dan stored procedure awal."""
+        ddl_list = []
         # DDL untuk Tabel
         base_tables_ddl = [
             """CREATE TABLE IF NOT EXISTS Role (
@@ -298,8 +1286,7 @@ class DatabaseManager:
                 FOREIGN KEY (ID_Penanggung_Jawab) REFERENCES Pengguna(ID_Pengguna) ON DELETE SET NULL ON UPDATE CASCADE
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"""
         ]
-        for ddl in base_tables_ddl:
-            self._execute_ddl_block(ddl)
+        ddl_list.extend(base_tables_ddl)
 
         # DDL untuk Log Table
         log_table_ddl = """
@@ -311,20 +1298,10 @@ class DatabaseManager:
             Detail_Lama TEXT,
             Detail_Baru TEXT
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"""
-        self._execute_ddl_block(log_table_ddl)
+        ddl_list.append(log_table_ddl)
 
-        # DDL untuk View
-        view_ddl = """
-        CREATE OR REPLACE VIEW View_Detail_Kegiatan AS
-        SELECT
-            K.ID_Kegiatan, K.Nama_Kegiatan, K.Tanggal, K.Tempat, K.Jenis_Kegiatan,
-            P.Nama AS Nama_Penanggung_Jawab, R.Nama_Role AS Role_Penanggung_Jawab,
-            K.ID_Penanggung_Jawab
-        FROM Kegiatan K
-        LEFT JOIN Pengguna P ON K.ID_Penanggung_Jawab = P.ID_Pengguna
-        LEFT JOIN Role R ON P.Role_ID = R.Role_ID
-        """
-        self._execute_ddl_block(view_ddl)
+        # View_Detail_Kegiatan dibuat oleh migrasi v2 (CREATE OR REPLACE), bukan di sini: v1 dijalankan ulang
+        # jika definisinya berubah dan tidak boleh menimpa view versi kolom DATE
 
         # DDL untuk Triggers dan Stored Procedures
         # Setiap DDL ini akan dieksekusi sebagai satu blok/perintah
@@ -344,7 +1321,7 @@ class DatabaseManager:
                    );
         END
         """
-        self._execute_ddl_block(trigger_insert_ddl)
+        ddl_list.append(trigger_insert_ddl)
 
         trigger_update_ddl = """
         CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_After_Update
@@ -361,7 +1338,7 @@ class DatabaseManager:
             END IF;
         END
         """
-        self._execute_ddl_block(trigger_update_ddl)
+        ddl_list.append(trigger_update_ddl)
 
         trigger_delete_ddl = """
         CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_Before_Delete
@@ -379,7 +1356,7 @@ class DatabaseManager:
                    );
         END
         """
-        self._execute_ddl_block(trigger_delete_ddl)
+        ddl_list.append(trigger_delete_ddl)
 
         sp_tambah_ddl = """
         CREATE PROCEDURE IF NOT EXISTS SP_TambahKegiatan (
@@ -395,7 +1372,7 @@ class DatabaseManager:
             END IF;
         END
         """
-        self._execute_ddl_block(sp_tambah_ddl)
+        ddl_list.append(sp_tambah_ddl)
 
         sp_update_ddl = """
         CREATE PROCEDURE IF NOT EXISTS SP_UpdateKegiatan (
@@ -409,7 +1386,7 @@ class DatabaseManager:
             WHERE ID_Kegiatan = p_ID_Kegiatan_Target;
         END
         """
-        self._execute_ddl_block(sp_update_ddl)
+        ddl_list.append(sp_update_ddl)
 
         sp_hapus_ddl = """
         CREATE PROCEDURE IF NOT EXISTS SP_HapusKegiatan (
@@ -419,10 +1396,305 @@ class DatabaseManager:
             DELETE FROM Kegiatan WHERE ID_Kegiatan = p_ID_Kegiatan;
         END
         """
-        self._execute_ddl_block(sp_hapus_ddl)
-        
-        # Inisialisasi data awal
-        self._initialize_data_if_empty()
+        ddl_list.append(sp_hapus_ddl)
+        return ddl_list
+
+    def _langkah_migrasi_v2_tanggal_date(self):
+        """Langkah migrasi v2: kolom DATE untuk Kegiatan.Tanggal secara online, lalu SP, trigger, dan view memakai kolom itu."""
+        langkah = []
+        # 1. Tambah kolom tanpa mengunci tabel (ALGORITHM=INPLACE, LOCK=NONE)
+        langkah.append(LangkahDDLBersyarat("kolom", "Kegiatan", "Tanggal_Date", """
+        ALTER TABLE Kegiatan ADD COLUMN Tanggal_Date DATE NULL AFTER Tanggal, ALGORITHM=INPLACE, LOCK=NONE"""))
+
+        # 2. SP menulis kolom DATE (dan VARCHAR lama tetap diisi untuk kompatibilitas laporan lama)
+        #    sebelum backfill, sehingga baris baru selama backfill sudah memiliki Tanggal_Date.
+        langkah.append("DROP PROCEDURE IF EXISTS SP_TambahKegiatan")
+        langkah.append("""
+        CREATE PROCEDURE SP_TambahKegiatan (
+            IN p_ID_Kegiatan VARCHAR(10), IN p_Nama_Kegiatan VARCHAR(100), IN p_Tanggal DATE,
+            IN p_Tempat VARCHAR(100), IN p_Jenis_Kegiatan VARCHAR(50), IN p_ID_Penanggung_Jawab INT
+        )
+        BEGIN
+            IF EXISTS (SELECT 1 FROM Kegiatan WHERE ID_Kegiatan = p_ID_Kegiatan) THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Error: ID Kegiatan sudah ada.';
+            ELSE
+                INSERT INTO Kegiatan (ID_Kegiatan, Nama_Kegiatan, Tanggal, Tanggal_Date, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab)
+                VALUES (p_ID_Kegiatan, p_Nama_Kegiatan, DATE_FORMAT(p_Tanggal, '%d-%m-%Y'), p_Tanggal,
+                        p_Tempat, p_Jenis_Kegiatan, p_ID_Penanggung_Jawab);
+            END IF;
+        END
+        """)
+        langkah.append("DROP PROCEDURE IF EXISTS SP_UpdateKegiatan")
+        langkah.append("""
+        CREATE PROCEDURE SP_UpdateKegiatan (
+            IN p_ID_Kegiatan_Target VARCHAR(10), IN p_Nama_Kegiatan_Baru VARCHAR(100), IN p_Tanggal_Baru DATE,
+            IN p_Tempat_Baru VARCHAR(100), IN p_Jenis_Kegiatan_Baru VARCHAR(50), IN p_ID_Penanggung_Jawab_Baru INT
+        )
+        BEGIN
+            UPDATE Kegiatan
+            SET Nama_Kegiatan = p_Nama_Kegiatan_Baru, Tanggal = DATE_FORMAT(p_Tanggal_Baru, '%d-%m-%Y'),
+                Tanggal_Date = p_Tanggal_Baru, Tempat = p_Tempat_Baru,
+                Jenis_Kegiatan = p_Jenis_Kegiatan_Baru, ID_Penanggung_Jawab = p_ID_Penanggung_Jawab_Baru
+            WHERE ID_Kegiatan = p_ID_Kegiatan_Target;
+        END
+        """)
+
+        # 3. Backfill per chunk; baris yang tidak bisa di-parse dilaporkan
+        langkah.append(self._langkah_backfill_tanggal_date)
+
+        # 4. Indeks dibuat setelah backfill (lebih cepat daripada memelihara indeks selama UPDATE)
+        langkah.append(LangkahDDLBersyarat("indeks", "Kegiatan", "IDX_Kegiatan_Tanggal_Date", """
+        CREATE INDEX IDX_Kegiatan_Tanggal_Date ON Kegiatan (Tanggal_Date, ID_Kegiatan) ALGORITHM=INPLACE LOCK=NONE"""))
+
+        # 5. Trigger log dan view membaca kolom DATE
+        tanggal_fmt = "IFNULL(DATE_FORMAT({0}.Tanggal_Date, '%d-%m-%Y'), 'NULL')"
+        detail_fmt = ("CONCAT('ID: ', {0}.ID_Kegiatan, ', Nama: ', {0}.Nama_Kegiatan, ', Tanggal: ', " + tanggal_fmt +
+                      ", ', Tempat: ', {0}.Tempat, ', Jenis: ', {0}.Jenis_Kegiatan, "
+                      "', PJ_ID: ', IFNULL({0}.ID_Penanggung_Jawab, 'NULL'))")
+        langkah.append("DROP TRIGGER IF EXISTS TRG_Kegiatan_After_Insert")
+        langkah.append(f"""
+        CREATE TRIGGER TRG_Kegiatan_After_Insert
+        AFTER INSERT ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Baru)
+            VALUES (NEW.ID_Kegiatan, 'INSERT', {detail_fmt.format('NEW')});
+        END
+        """)
+        langkah.append("DROP TRIGGER IF EXISTS TRG_Kegiatan_After_Update")
+        langkah.append(f"""
+        CREATE TRIGGER TRG_Kegiatan_After_Update
+        AFTER UPDATE ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            DECLARE detail_lama_str TEXT;
+            DECLARE detail_baru_str TEXT;
+            SET detail_lama_str = {detail_fmt.format('OLD')};
+            SET detail_baru_str = {detail_fmt.format('NEW')};
+            IF detail_lama_str <> detail_baru_str THEN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama, Detail_Baru)
+                VALUES (NEW.ID_Kegiatan, 'UPDATE', detail_lama_str, detail_baru_str);
+            END IF;
+        END
+        """)
+        langkah.append("DROP TRIGGER IF EXISTS TRG_Kegiatan_Before_Delete")
+        langkah.append(f"""
+        CREATE TRIGGER TRG_Kegiatan_Before_Delete
+        BEFORE DELETE ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama)
+            VALUES (OLD.ID_Kegiatan, 'DELETE', {detail_fmt.format('OLD')});
+        END
+        """)
+        langkah.append("""
+        CREATE OR REPLACE VIEW View_Detail_Kegiatan AS
+        SELECT
+            K.ID_Kegiatan, K.Nama_Kegiatan, K.Tanggal_Date AS Tanggal, K.Tempat, K.Jenis_Kegiatan,
+            P.Nama AS Nama_Penanggung_Jawab, R.Nama_Role AS Role_Penanggung_Jawab,
+            K.ID_Penanggung_Jawab
+        FROM Kegiatan K
+        LEFT JOIN Pengguna P ON K.ID_Penanggung_Jawab = P.ID_Pengguna
+        LEFT JOIN Role R ON P.Role_ID = R.Role_ID
+        """)
+        return langkah
+
+    def _langkah_migrasi_v3_indeks_log(self):
+        """Langkah migrasi v3: indeks untuk penampil log (filter waktu dan filter per kegiatan)."""
+        return [
+            # Indeks sekunder InnoDB menyertakan ID_Log, sehingga rentang waktu -> rentang ID_Log cukup dibaca dari indeks
+            LangkahDDLBersyarat("indeks", "Log_Perubahan_Kegiatan", "IDX_Log_Timestamp", """
+            CREATE INDEX IDX_Log_Timestamp ON Log_Perubahan_Kegiatan (Timestamp_Aksi) ALGORITHM=INPLACE LOCK=NONE"""),
+            # (ID_Kegiatan_Ref, ID_Log) melayani filter kegiatan sekaligus keyset ID_Log DESC tanpa filesort
+            LangkahDDLBersyarat("indeks", "Log_Perubahan_Kegiatan", "IDX_Log_Kegiatan_Ref", """
+            CREATE INDEX IDX_Log_Kegiatan_Ref ON Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, ID_Log) ALGORITHM=INPLACE LOCK=NONE"""),
+        ]
+
+    def _langkah_migrasi_v4_arsip_log(self):
+        """Langkah migrasi v4: tabel arsip dengan kolom dan indeks yang sama seperti log aktif."""
+        return [
+            """
+            CREATE TABLE IF NOT EXISTS Log_Perubahan_Kegiatan_Arsip (
+                ID_Log INT PRIMARY KEY,
+                ID_Kegiatan_Ref VARCHAR(10),
+                Aksi VARCHAR(50) NOT NULL,
+                Timestamp_Aksi TIMESTAMP NULL,
+                Detail_Lama TEXT,
+                Detail_Baru TEXT,
+                Diarsipkan_Pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX IDX_Arsip_Timestamp (Timestamp_Aksi),
+                INDEX IDX_Arsip_Kegiatan_Ref (ID_Kegiatan_Ref, ID_Log)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+            """
+            CREATE TABLE IF NOT EXISTS Log_Arsip_Bulan (
+                Bulan CHAR(7) PRIMARY KEY,
+                Jumlah_Baris INT NOT NULL DEFAULT 0,
+                File_Ekspor VARCHAR(500),
+                Diarsipkan_Pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+        ]
+
+    def _langkah_migrasi_v5_indeks_pencarian(self):
+        """Langkah migrasi v5: indeks untuk filter pencarian grid.
+
+        Setiap indeks komposit = kolom filter kesamaan + urutan grid (Tanggal_Date, ID_Kegiatan),
+        sehingga filter + ORDER BY + LIMIT dilayani tanpa filesort.
+        """
+        return [
+            LangkahDDLBersyarat("indeks", "Kegiatan", "IDX_Kegiatan_Tempat_Tanggal", """
+            CREATE INDEX IDX_Kegiatan_Tempat_Tanggal ON Kegiatan (Tempat, Tanggal_Date, ID_Kegiatan) ALGORITHM=INPLACE LOCK=NONE"""),
+            LangkahDDLBersyarat("indeks", "Kegiatan", "IDX_Kegiatan_Jenis_Tanggal", """
+            CREATE INDEX IDX_Kegiatan_Jenis_Tanggal ON Kegiatan (Jenis_Kegiatan, Tanggal_Date, ID_Kegiatan) ALGORITHM=INPLACE LOCK=NONE"""),
+            LangkahDDLBersyarat("indeks", "Kegiatan", "IDX_Kegiatan_PJ_Tanggal", """
+            CREATE INDEX IDX_Kegiatan_PJ_Tanggal ON Kegiatan (ID_Penanggung_Jawab, Tanggal_Date, ID_Kegiatan) ALGORITHM=INPLACE LOCK=NONE"""),
+            # FULLTEXT pertama membangun ulang tabel (FTS_DOC_ID), jadi tanpa klausa LOCK=NONE
+            LangkahDDLBersyarat("indeks", "Kegiatan", "FT_Kegiatan_Nama", """
+            CREATE FULLTEXT INDEX FT_Kegiatan_Nama ON Kegiatan (Nama_Kegiatan)"""),
+        ]
+
+    def _langkah_migrasi_v6_daftar_pengguna(self):
+        """Langkah migrasi v6: pendaftaran pengguna atomik dalam satu CALL.
+
+        ID diambil dari baris Sekuens_ID (UPDATE ... LAST_INSERT_ID(), terkunci per baris sampai COMMIT),
+        sehingga pendaftaran bersamaan tidak pernah mendapat ID yang sama. Duplikat Username/NIM_NIP
+        dideteksi oleh constraint UNIQUE, bukan oleh SELECT terpisah sebelum INSERT.
+        """
+        return [
+            """
+            CREATE TABLE IF NOT EXISTS Sekuens_ID (
+                Nama VARCHAR(50) PRIMARY KEY,
+                Nilai INT NOT NULL
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+            """
+            INSERT INTO Sekuens_ID (Nama, Nilai)
+            SELECT 'Pengguna', IFNULL(MAX(ID_Pengguna), 0) FROM Pengguna
+            ON DUPLICATE KEY UPDATE Nilai = GREATEST(Nilai, VALUES(Nilai))""",
+            "DROP PROCEDURE IF EXISTS SP_DaftarPengguna",
+            """
+            CREATE PROCEDURE SP_DaftarPengguna (
+                IN p_Nama VARCHAR(100), IN p_NIM_NIP VARCHAR(50), IN p_Username VARCHAR(50),
+                IN p_Password VARCHAR(255), IN p_Role_ID INT
+            )
+            BEGIN
+                DECLARE v_id INT;
+                -- 1062: Username atau NIM_NIP melanggar UNIQUE; cari tahu yang mana setelah rollback
+                DECLARE EXIT HANDLER FOR 1062
+                BEGIN
+                    ROLLBACK;
+                    SELECT IF(EXISTS (SELECT 1 FROM Pengguna WHERE Username = p_Username),
+                              'username_ada', 'nimnip_ada') AS Status, NULL AS ID_Pengguna;
+                END;
+                -- 1452: Role_ID tidak ada di tabel Role
+                DECLARE EXIT HANDLER FOR 1452
+                BEGIN
+                    ROLLBACK;
+                    SELECT 'role_tidak_valid' AS Status, NULL AS ID_Pengguna;
+                END;
+
+                START TRANSACTION;
+                -- GREATEST dengan MAX(ID_Pengguna) (lookup indeks PK) menjaga sekuens tetap di depan
+                -- pengguna yang dimasukkan dengan ID eksplisit, misalnya data awal
+                UPDATE Sekuens_ID
+                SET Nilai = LAST_INSERT_ID(GREATEST(Nilai, (SELECT IFNULL(MAX(ID_Pengguna), 0) FROM Pengguna)) + 1)
+                WHERE Nama = 'Pengguna';
+                SET v_id = LAST_INSERT_ID();
+                INSERT INTO Pengguna (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password)
+                VALUES (v_id, p_Nama, p_Role_ID, p_NIM_NIP, p_Username, p_Password);
+                COMMIT;
+                SELECT 'ok' AS Status, v_id AS ID_Pengguna;
+            END
+            """,
+        ]
+
+    def _langkah_migrasi_v7_versi_referensi(self):
+        """Langkah migrasi v7: nomor versi per tabel referensi, dinaikkan trigger pada setiap perubahan.
+
+        Klien cukup membaca dua baris Versi_Referensi untuk tahu apakah cache Role/Pengguna masih berlaku.
+        Perubahan Role juga menaikkan versi Pengguna: aksi FK ON UPDATE CASCADE / ON DELETE SET NULL
+        mengubah Pengguna.Role_ID tanpa menjalankan trigger Pengguna.
+        """
+        langkah = [
+            """
+            CREATE TABLE IF NOT EXISTS Versi_Referensi (
+                Nama VARCHAR(50) PRIMARY KEY,
+                Versi BIGINT NOT NULL DEFAULT 0
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+            """
+            INSERT INTO Versi_Referensi (Nama, Versi) VALUES ('Role', 0), ('Pengguna', 0)
+            ON DUPLICATE KEY UPDATE Versi = Versi""",
+        ]
+        for tabel, nama_versi in (("Role", "'Role', 'Pengguna'"), ("Pengguna", "'Pengguna'")):
+            for kejadian in ("Insert", "Update", "Delete"):
+                trigger = f"TRG_{tabel}_After_{kejadian}_Versi"
+                langkah.append(f"DROP TRIGGER IF EXISTS {trigger}")
+                langkah.append(f"""
+            CREATE TRIGGER {trigger}
+            AFTER {kejadian.upper()} ON {tabel}
+            FOR EACH ROW
+            UPDATE Versi_Referensi SET Versi = Versi + 1 WHERE Nama IN ({nama_versi})""")
+        return langkah
+
+    def _langkah_migrasi_v8_indeks_nama_pengguna(self):
+        """Langkah migrasi v8: indeks Pengguna.Nama untuk LIKE 'prefix%' (Username dan NIM_NIP sudah UNIQUE)."""
+        return [
+            LangkahDDLBersyarat("indeks", "Pengguna", "IDX_Pengguna_Nama", """
+            CREATE INDEX IDX_Pengguna_Nama ON Pengguna (Nama) ALGORITHM=INPLACE LOCK=NONE"""),
+        ]
+
+    @langkah_migrasi(1) # Naikkan jika isi langkah ini atau backfill_tanggal_date diubah
+    def _langkah_backfill_tanggal_date(self, conn):
+        updated, unparsable = self.backfill_tanggal_date(conn=conn)
+        print(f"Backfill Tanggal_Date: {updated} baris diisi, {len(unparsable)} baris tidak bisa di-parse.")
+        for id_keg, tanggal_lama in unparsable:
+            print(f"  - Kegiatan {id_keg}: Tanggal '{tanggal_lama}' bukan format dd-mm-yyyy, Tanggal_Date dibiarkan NULL.")
+
+    def backfill_tanggal_date(self, chunk_size=500, conn=None):
+        """Mengisi Kegiatan.Tanggal_Date dari kolom VARCHAR lama per chunk (satu transaksi pendek per chunk).
+
+        Jika conn diberikan (misalnya koneksi migrasi), koneksi itu dipakai dan tidak dikembalikan ke pool.
+        Mengembalikan (jumlah baris terisi, list (ID_Kegiatan, Tanggal) yang tidak bisa di-parse).
+        """
+        own_conn = conn is None
+        cursor = None
+        updated = 0
+        unparsable = []
+        last_id = ""
+        try:
+            if own_conn:
+                conn = self._get_connection()
+            cursor = conn.cursor()
+            while True:
+                cursor.execute("""
+                    SELECT ID_Kegiatan, Tanggal FROM Kegiatan
+                    WHERE ID_Kegiatan > %s AND Tanggal_Date IS NULL
+                    ORDER BY ID_Kegiatan LIMIT %s""", (last_id, chunk_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                # Parse di Python: STR_TO_DATE pada mode SQL strict membatalkan seluruh UPDATE jika ada satu nilai rusak
+                parsed = []
+                for id_keg, tanggal_lama in rows:
+                    try:
+                        parsed.append((id_keg, datetime.datetime.strptime((tanggal_lama or "").strip(), "%d-%m-%Y").date()))
+                    except ValueError:
+                        unparsable.append((id_keg, tanggal_lama))
+                if parsed:
+                    case_sql = " ".join(["WHEN %s THEN %s"] * len(parsed))
+                    in_sql = ", ".join(["%s"] * len(parsed))
+                    params = [v for pair in parsed for v in pair] + [id_keg for id_keg, _ in parsed]
+                    cursor.execute(f"UPDATE Kegiatan SET Tanggal_Date = CASE ID_Kegiatan {case_sql} END "
+                                   f"WHERE ID_Kegiatan IN ({in_sql}) AND Tanggal_Date IS NULL", tuple(params))
+                    updated += cursor.rowcount
+                conn.commit() # Commit per chunk agar lock baris tidak ditahan lama
+            return updated, unparsable
+        except mysql.connector.Error:
+            if conn: conn.rollback()
+            raise
+        finally:
+            if cursor: cursor.close()
+            if own_conn and conn: self._release_connection(conn)
 
     def _initialize_data_if_empty(self):
         """Mengisi data awal jika tabel kosong."""
@@ -451,9 +1723,9 @@ class DatabaseManager:
             cursor.execute("SELECT COUNT(*) FROM Kegiatan")
             if cursor.fetchone()[0] == 0:
                 kegiatan_awal = [
-                    Kegiatan("K001", "Seminar AI", "10-05-2025", "Aula FT", "Seminar", 101),
-                    Kegiatan("K002", "Praktikum IoT", "15-05-2025", "Lab Jaringan Komputer", "Praktikum", 102),
-                    Kegiatan("K003", "Rapat Dosen Bulanan", "20-05-2025", "Ruang Dosen", "Rapat Dosen", 103),
+                    Kegiatan("K001", "Seminar AI", datetime.date(2025, 5, 10), "Aula FT", "Seminar", 101),
+                    Kegiatan("K002", "Praktikum IoT", datetime.date(2025, 5, 15), "Lab Jaringan Komputer", "Praktikum", 102),
+                    Kegiatan("K003", "Rapat Dosen Bulanan", datetime.date(2025, 5, 20), "Ruang Dosen", "Rapat Dosen", 103),
                 ]
                 for keg in kegiatan_awal:
                     # Memanggil Stored Procedure untuk menambah kegiatan, bukan INSERT langsung
@@ -469,7 +1741,7 @@ class DatabaseManager:
             if conn: conn.rollback()
         finally:
             if cursor: cursor.close()
-            if conn and conn.is_connected(): conn.close()
+            if conn: self._release_connection(conn)
 
     # ... (metode lain seperti tambah_kegiatan_obj_db, dll. tetap sama)
     # ... (pastikan semua pemanggilan ke execute_query dari metode lain sudah sesuai,
@@ -499,76 +1771,1441 @@ class DatabaseManager:
     def hapus_kegiatan_db(self, id_keg: str):
         return self.call_stored_procedure("SP_HapusKegiatan", (id_keg,))
 
-    def get_semua_kegiatan_obj_db(self):
-        query = """
-            SELECT ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan,
-                   ID_Penanggung_Jawab, Nama_Penanggung_Jawab 
-            FROM View_Detail_Kegiatan
-            ORDER BY STR_TO_DATE(Tanggal, '%d-%m-%Y') DESC, Nama_Kegiatan ASC
+    BULK_CHUNK = 500 # Jumlah ID per statement IN (...) pada operasi massal
+    # Kolom yang boleh diubah massal: kunci perubahan -> kolom tabel Kegiatan
+    KOLOM_UBAH_MASSAL = {"tempat": "Tempat", "jenis": "Jenis_Kegiatan", "id_pj": "ID_Penanggung_Jawab"}
+
+    def _jalankan_massal(self, template_query, id_list, params_awal=()):
+        """Menjalankan statement set-based per chunk ID dalam SATU transaksi; rollback seluruhnya jika ada yang gagal.
+
+        template_query memuat '{placeholder}' untuk daftar IN. ID diurutkan agar urutan lock baris konsisten
+        antar transaksi massal yang berjalan bersamaan (menghindari deadlock).
         """
-        rows = self.execute_query(query, fetch_all=True)
-        kegiatan_list = []
-        if rows:
-            for row in rows:
-                # Pastikan urutan indeks sesuai dengan kolom yang di-SELECT dari view
-                # ID_Kegiatan=row[0], Nama_Kegiatan=row[1], Tanggal=row[2], Tempat=row[3], Jenis_Kegiatan=row[4],
-                # ID_Penanggung_Jawab=row[5], Nama_Penanggung_Jawab=row[6]
-                keg = Kegiatan(id_kegiatan=row[0], nama_kegiatan=row[1], tanggal=row[2],
-                               tempat=row[3], jenis_kegiatan=row[4], id_penanggung_jawab=row[5])
-                kegiatan_list.append({'objek': keg, 'nama_pj': row[6]})
-        return kegiatan_list
+        ids = sorted(set(id_list))
+        if not ids:
+            return 0
+        if self._instrumentasi is not None:
+            return self._instrumentasi.ukur(template_query.format(placeholder="%s, %s"),
+                                            self._jalankan_massal_inti, template_query, ids, params_awal)
+        return self._jalankan_massal_inti(template_query, ids, params_awal)
+
+    def _jalankan_massal_inti(self, template_query, ids, params_awal):
+        conn = None
+        cursor = None
+        total = 0
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            for start in range(0, len(ids), self.BULK_CHUNK):
+                chunk = ids[start:start + self.BULK_CHUNK]
+                cursor.execute(template_query.format(placeholder=", ".join(["%s"] * len(chunk))),
+                               tuple(params_awal) + tuple(chunk))
+                total += cursor.rowcount
+            conn.commit()
+            return total
+        except mysql.connector.Error as err:
+            if conn:
+                conn.rollback()
+            raise err
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                self._release_connection(conn)
 
+    def hapus_kegiatan_massal_db(self, id_list):
+        """Menghapus banyak kegiatan dalam satu transaksi; trigger BEFORE DELETE tetap mencatat satu log per baris."""
+        return self._jalankan_massal("DELETE FROM Kegiatan WHERE ID_Kegiatan IN ({placeholder})", id_list)
 
-    def get_semua_pengguna_obj_db(self):
-        query = "SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna ORDER BY Nama"
-        rows = self.execute_query(query, fetch_all=True)
+    def update_kegiatan_massal_db(self, id_list, perubahan):
+        """Mengubah kolom yang sama untuk banyak kegiatan dalam satu transaksi.
+
+        perubahan: dict dengan kunci dari KOLOM_UBAH_MASSAL ('tempat', 'jenis', 'id_pj'); nilai None mengosongkan kolom.
+        Trigger AFTER UPDATE mencatat satu log per baris yang benar-benar berubah.
+        """
+        tidak_dikenal = set(perubahan) - set(self.KOLOM_UBAH_MASSAL)
+        if not perubahan or tidak_dikenal:
+            raise ValueError(f"Perubahan massal tidak valid: {sorted(tidak_dikenal) or 'kosong'}.")
+        kunci = sorted(perubahan)
+        set_clause = ", ".join(f"{self.KOLOM_UBAH_MASSAL[k]} = %s" for k in kunci)
+        return self._jalankan_massal(f"UPDATE Kegiatan SET {set_clause} WHERE ID_Kegiatan IN ({{placeholder}})",
+                                     id_list, [perubahan[k] for k in kunci])
+
+
+    # Bawaan InnoDB (innodb_ft_min_token_size dan INNODB_FT_DEFAULT_STOPWORD), dipakai jika server tidak bisa dibaca
+    FULLTEXT_MIN_TOKEN_BAWAAN = 3
+    FULLTEXT_STOPWORD_BAWAAN = frozenset(
+        "a about an are as at be by com de en for from how i in is it la of on or that the this to was what when "
+        "where who will with und www".split())
+
+    def _get_aturan_fulltext(self):
+        """(panjang token minimum, frozenset stopword) FULLTEXT InnoDB milik server; dibaca sekali lalu di-cache.
+
+        Stopword diambil dari innodb_ft_user_stopword_table atau innodb_ft_server_stopword_table jika diatur,
+        selain itu daftar bawaan InnoDB. Jika server tidak bisa dibaca, nilai bawaan InnoDB dipakai.
+        """
+        if self._aturan_fulltext is not None:
+            return self._aturan_fulltext
+        min_token, stopword = self.FULLTEXT_MIN_TOKEN_BAWAAN, self.FULLTEXT_STOPWORD_BAWAAN
+        try:
+            row = self.execute_query(
+                "SELECT @@innodb_ft_min_token_size, @@innodb_ft_enable_stopword, "
+                "@@innodb_ft_user_stopword_table, @@innodb_ft_server_stopword_table", fetch_one=True)
+            if row:
+                min_token = int(row[0])
+                tabel_stopword = row[2] or row[3] # Format 'database/tabel', kolom tunggal 'value'
+                if not row[1]:
+                    stopword = frozenset()
+                elif tabel_stopword:
+                    nama_db, nama_tabel = (f"`{bagian.replace('`', '``')}`" for bagian in tabel_stopword.split("/", 1))
+                    rows = self.execute_query(f"SELECT value FROM {nama_db}.{nama_tabel}", fetch_all=True)
+                    stopword = frozenset(str(r[0]).lower() for r in rows or ())
+        except (mysql.connector.Error, ValueError) as e:
+            print(f"Peringatan: Aturan FULLTEXT server tidak terbaca, dipakai bawaan InnoDB: {e}")
+        self._aturan_fulltext = (min_token, stopword)
+        return self._aturan_fulltext
+
+    def _kondisi_filter_kegiatan(self, filters, kolom_tanggal="Tanggal"):
+        """Menerjemahkan filter pencarian menjadi (list kondisi WHERE, list parameter).
+
+        filters (semua opsional): 'nama' (substring, atau kata-kata FULLTEXT jika 'fulltext' True),
+        'tanggal_dari'/'tanggal_sampai' (datetime.date, inklusif), 'tempat', 'jenis', 'id_pj'.
+        kolom_tanggal: 'Tanggal' untuk View_Detail_Kegiatan, 'Tanggal_Date' untuk tabel Kegiatan.
+        """
+        kondisi, params = [], []
+        if not filters:
+            return kondisi, params
+        nama = (filters.get("nama") or "").strip()
+        if nama:
+            # Dipecah di setiap karakter non-kata: '-' di tengah kata (e-learning) adalah operator BOOLEAN MODE
+            kata = re.findall(r"\w+", nama)
+            # Kata pendek dan stopword tidak diindeks; '+kata*' untuk kata itu membuat hasil selalu kosong
+            if filters.get("fulltext") and kata:
+                min_token, stopword = self._get_aturan_fulltext()
+                pakai_fulltext = all(len(k) >= min_token and k.lower() not in stopword for k in kata)
+            else:
+                pakai_fulltext = False
+            if pakai_fulltext:
+                # Semi-join ke tabel dasar agar FT_Kegiatan_Nama dipakai juga saat query membaca view
+                kondisi.append("ID_Kegiatan IN (SELECT ID_Kegiatan FROM Kegiatan "
+                               "WHERE MATCH(Nama_Kegiatan) AGAINST (%s IN BOOLEAN MODE))")
+                # Setiap kata wajib ada, dicocokkan sebagai awalan kata
+                params.append(" ".join(f"+{k}*" for k in kata))
+            else:
+                kondisi.append("Nama_Kegiatan LIKE %s")
+                params.append("%" + nama.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if filters.get("tanggal_dari"):
+            kondisi.append(f"{kolom_tanggal} >= %s")
+            params.append(filters["tanggal_dari"])
+        if filters.get("tanggal_sampai"):
+            kondisi.append(f"{kolom_tanggal} <= %s")
+            params.append(filters["tanggal_sampai"])
+        for kunci, kolom in (("tempat", "Tempat"), ("jenis", "Jenis_Kegiatan"), ("id_pj", "ID_Penanggung_Jawab")):
+            if filters.get(kunci) not in (None, ""):
+                kondisi.append(f"{kolom} = %s")
+                params.append(filters[kunci])
+        return kondisi, params
+
+    def get_semua_kegiatan_obj_db(self, filters=None):
+        # Tanggal adalah kolom DATE terindeks; urutan sama dengan mode paged (tanggal terbaru, lalu ID)
+        kondisi, params = self._kondisi_filter_kegiatan(filters)
+        if kondisi:
+            query = f"""
+                SELECT ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan,
+                       ID_Penanggung_Jawab, Nama_Penanggung_Jawab
+                FROM View_Detail_Kegiatan
+                WHERE {' AND '.join(kondisi)}
+                ORDER BY Tanggal DESC, ID_Kegiatan DESC
+            """
+            rows = self.execute_query(query, tuple(params), fetch_all=True)
+        else:
+            rows = self.execute_named("semua_kegiatan") # Tanpa filter: teks query tetap, cukup prepare sekali
+        # Satu objek Kegiatan (ber-__slots__) per baris, tanpa dict pembungkus
+        return [Kegiatan.dari_baris_view(row) for row in rows or ()]
+
+    def count_kegiatan_db(self, filters=None):
+        """Menghitung jumlah kegiatan (yang cocok dengan filter) langsung dari tabel dasar (tanpa join view)."""
+        kondisi, params = self._kondisi_filter_kegiatan(filters, kolom_tanggal="Tanggal_Date")
+        if kondisi:
+            result = self.execute_query(f"SELECT COUNT(*) FROM Kegiatan WHERE {' AND '.join(kondisi)}",
+                                        tuple(params), fetch_one=True)
+        else:
+            result = self.execute_named("jumlah_kegiatan")
+        return result[0] if result else 0
+
+    def get_kegiatan_page_db(self, after_key=None, limit=200, filters=None):
+        """Mengambil satu halaman kegiatan dengan keyset pagination (Tanggal DESC, ID DESC).
+
+        after_key adalah tuple (tanggal, id_kegiatan) dari baris terakhir halaman sebelumnya.
+        filters sama seperti _kondisi_filter_kegiatan dan ditambahkan ke kedua tahap.
+        Mengembalikan (list item, next_key); next_key None jika ini halaman terakhir.
+        Urutan dua kolom searah sehingga bisa dilayani IDX_Kegiatan_Tanggal_Date (scan mundur).
+        """
+        columns = """ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan,
+                   ID_Penanggung_Jawab, Nama_Penanggung_Jawab"""
+        filter_kondisi, filter_params = self._kondisi_filter_kegiatan(filters)
+        filter_sql = "".join(f" AND {k}" for k in filter_kondisi)
+        rows = []
+        # Tahap 1: baris bertanggal. Kegiatan tanpa tanggal (NULL) selalu berada di akhir urutan DESC.
+        if after_key is None or after_key[0] is not None:
+            if after_key is None:
+                where_clause, params = "Tanggal IS NOT NULL", []
+            else:
+                where_clause = "Tanggal IS NOT NULL AND (Tanggal < %s OR (Tanggal = %s AND ID_Kegiatan < %s))"
+                params = [after_key[0], after_key[0], after_key[1]]
+            rows = self.execute_query(f"""
+                SELECT {columns} FROM View_Detail_Kegiatan
+                WHERE {where_clause}{filter_sql}
+                ORDER BY Tanggal DESC, ID_Kegiatan DESC
+                LIMIT %s""", tuple(params + filter_params + [limit]), fetch_all=True) or []
+        # Tahap 2: lanjutkan ke baris tanpa tanggal jika halaman belum penuh
+        if len(rows) < limit:
+            params = []
+            where_clause = "Tanggal IS NULL"
+            if after_key is not None and after_key[0] is None:
+                where_clause += " AND ID_Kegiatan < %s"
+                params.append(after_key[1])
+            rows = list(rows) + (self.execute_query(f"""
+                SELECT {columns} FROM View_Detail_Kegiatan
+                WHERE {where_clause}{filter_sql}
+                ORDER BY ID_Kegiatan DESC
+                LIMIT %s""", tuple(params + filter_params + [limit - len(rows)]), fetch_all=True) or [])
+        items = [Kegiatan.dari_baris_view(row) for row in rows]
+        next_key = (rows[-1][2], rows[-1][0]) if len(rows) == limit else None
+        return items, next_key
+
+
+    def _versi_referensi(self, nama):
+        return dict(self.execute_named("versi_referensi") or []).get(nama)
+
+    def _muat_semua_pengguna(self):
+        rows = self.execute_named("semua_pengguna")
         if rows:
             # Pastikan kelas Pengguna sudah didefinisikan
             return [Pengguna(id_pengguna=row[0], nama=row[1], role_id=row[2], nim_nip=row[3], username=row[4]) for row in rows]
         return []
 
+    def get_semua_pengguna_obj_db(self):
+        """Semua pengguna (tanpa password) dari cache data referensi; list baru di setiap panggilan."""
+        return list(self._referensi.ambil("Pengguna", self._muat_semua_pengguna,
+                                          lambda: self._versi_referensi("Pengguna")))
+
     def verify_user_credentials(self, username, password):
-        query = "SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna WHERE Username = %s AND Password = %s"
-        user_data = self.execute_query(query, (username, password), fetch_one=True)
+        user_data = self.execute_named("verifikasi_kredensial", (username, password))
         if user_data:
             # Pastikan kelas Pengguna sudah didefinisikan
             return Pengguna(user_data[0], user_data[1], user_data[2], user_data[3], user_data[4])
         return None
 
 
-    def get_roles_db(self):
-        query = "SELECT Role_ID, Nama_Role FROM Role ORDER BY Nama_Role"
-        return self.execute_query(query, fetch_all=True)
+    def get_beban_bulan_db(self, tahun, bulan):
+        """Jumlah kegiatan per tanggal dalam satu bulan: dict datetime.date -> jumlah (hari tanpa kegiatan tidak ada)."""
+        awal = datetime.date(tahun, bulan, 1)
+        akhir = datetime.date(tahun + bulan // 12, bulan % 12 + 1, 1)
+        return {tanggal: jumlah for tanggal, jumlah in self.execute_named("beban_harian", (awal, akhir)) or []}
+
+    def jumlah_pengguna_db(self):
+        row = self.execute_named("jumlah_pengguna")
+        return row[0] if row else 0
+
+    def cari_pengguna_prefix_db(self, prefix, batas=PJ_PICKER_BATAS):
+        """Pencarian server untuk direktori besar: nama, NIM/NIP, atau username berawalan prefix, urut nama.
+
+        Setiap cabang UNION memakai indeksnya sendiri (IDX_Pengguna_Nama, UNIQUE NIM_NIP, UNIQUE Username)
+        sebagai range scan berbatas, bukan OR yang membaca seluruh tabel. Berbeda dengan indeks lokal, kata
+        di tengah nama tidak dicocokkan.
+        """
+        kolom = "ID_Pengguna, Nama, Role_ID, NIM_NIP, Username"
+        if not prefix:
+            rows = self.execute_query(f"SELECT {kolom} FROM Pengguna ORDER BY Nama LIMIT %s", (batas,), fetch_all=True)
+        else:
+            pola = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = self.execute_query(f"""
+                (SELECT {kolom} FROM Pengguna WHERE Nama LIKE %s ORDER BY Nama LIMIT %s)
+                UNION
+                (SELECT {kolom} FROM Pengguna WHERE NIM_NIP LIKE %s ORDER BY NIM_NIP LIMIT %s)
+                UNION
+                (SELECT {kolom} FROM Pengguna WHERE Username LIKE %s ORDER BY Username LIMIT %s)
+                ORDER BY Nama LIMIT %s""", (pola, batas) * 3 + (batas,), fetch_all=True)
+        return [Pengguna(row[0], row[1], row[2], row[3], row[4]) for row in rows or []]
+
+    def get_roles_db(self):
+        return list(self._referensi.ambil("Role", lambda: self.execute_named("daftar_role"),
+                                          lambda: self._versi_referensi("Role")))
+
+    def daftarkan_pengguna_db(self, nama, nim_nip, username, password, role_id):
+        """Mendaftarkan pengguna baru lewat SP_DaftarPengguna dalam satu round trip.
+
+        Mengembalikan (status, id_pengguna); status salah satu dari 'ok', 'username_ada', 'nimnip_ada',
+        'role_tidak_valid'. id_pengguna hanya terisi jika status 'ok'.
+        """
+        args = (nama, nim_nip, username, password, role_id)
+        if self._instrumentasi is None:
+            return self._daftarkan_pengguna(args)
+        return self._instrumentasi.ukur("CALL SP_DaftarPengguna(%s, %s, %s, %s, %s)", self._daftarkan_pengguna, args)
+
+    def _daftarkan_pengguna(self, args):
+        conn = None
+        cursor = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.callproc("SP_DaftarPengguna", args)
+            hasil = None
+            for result in cursor.stored_results():
+                row = result.fetchone()
+                if row is not None:
+                    hasil = row
+            conn.commit() # SP sudah COMMIT sendiri; ini hanya menutup transaksi sisi klien
+            if hasil is None:
+                raise mysql.connector.Error(msg="SP_DaftarPengguna tidak mengembalikan hasil.")
+            if hasil[0] == "ok":
+                self._referensi.invalidasi("Pengguna") # Tanpa menunggu TTL di klien yang mendaftarkan
+            return hasil[0], hasil[1]
+        except mysql.connector.Error as err:
+            if conn:
+                conn.rollback()
+            raise err
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                self._release_connection(conn)
+
+
+    @staticmethod
+    def _tabel_log(arsip=False):
+        return "Log_Perubahan_Kegiatan_Arsip" if arsip else "Log_Perubahan_Kegiatan"
+
+    def get_log_id_range_db(self, waktu_dari=None, waktu_sampai=None, arsip=False):
+        """Menerjemahkan rentang waktu [waktu_dari, waktu_sampai) menjadi (MIN, MAX) ID_Log.
+
+        Dibaca seluruhnya dari indeks Timestamp_Aksi (covering), sehingga halaman berikutnya
+        cukup memindai rentang primary key. Mengembalikan (None, None) jika rentang kosong.
+        """
+        kondisi, params = [], []
+        if waktu_dari:
+            kondisi.append("Timestamp_Aksi >= %s")
+            params.append(waktu_dari)
+        if waktu_sampai:
+            kondisi.append("Timestamp_Aksi < %s")
+            params.append(waktu_sampai)
+        where_clause = f"WHERE {' AND '.join(kondisi)}" if kondisi else ""
+        result = self.execute_query(f"SELECT MIN(ID_Log), MAX(ID_Log) FROM {self._tabel_log(arsip)} {where_clause}",
+                                    tuple(params), fetch_one=True)
+        return (result[0], result[1]) if result else (None, None)
+
+    def get_log_page_db(self, filters=None, before_id=None, limit=100):
+        """Satu halaman log (tanpa kolom TEXT) dengan keyset ID_Log DESC.
+
+        filters (semua opsional): 'aksi', 'id_kegiatan', 'waktu_dari', 'waktu_sampai',
+        'rentang_id' (hasil get_log_id_range_db untuk rentang waktu yang sama), dan
+        'arsip' (True untuk membaca Log_Perubahan_Kegiatan_Arsip).
+        Mengembalikan list (ID_Log, Timestamp_Aksi, Aksi, ID_Kegiatan_Ref).
+        """
+        filters = filters or {}
+        kondisi, params = [], []
+        if "rentang_id" in filters:
+            id_min, id_max = filters["rentang_id"]
+            if id_min is None:
+                return [] # Tidak ada log di rentang waktu ini
+            kondisi.append("ID_Log BETWEEN %s AND %s")
+            params.extend([id_min, id_max])
+        if before_id is not None:
+            kondisi.append("ID_Log < %s")
+            params.append(before_id)
+        if filters.get("aksi"):
+            kondisi.append("Aksi = %s")
+            params.append(filters["aksi"])
+        if filters.get("id_kegiatan"):
+            kondisi.append("ID_Kegiatan_Ref = %s")
+            params.append(filters["id_kegiatan"])
+        if filters.get("waktu_dari"):
+            kondisi.append("Timestamp_Aksi >= %s")
+            params.append(filters["waktu_dari"])
+        if filters.get("waktu_sampai"):
+            kondisi.append("Timestamp_Aksi < %s")
+            params.append(filters["waktu_sampai"])
+        where_clause = f"WHERE {' AND '.join(kondisi)}" if kondisi else ""
+        query = f"""
+            SELECT ID_Log, Timestamp_Aksi, Aksi, ID_Kegiatan_Ref
+            FROM {self._tabel_log(filters.get("arsip"))}
+            {where_clause}
+            ORDER BY ID_Log DESC
+            LIMIT %s
+        """
+        params.append(limit)
+        return self.execute_query(query, tuple(params), fetch_all=True) or []
+
+    def get_log_detail_db(self, id_log, arsip=False):
+        """Kolom TEXT (Detail_Lama, Detail_Baru) untuk satu baris log; dimuat hanya saat baris dipilih."""
+        result = self.execute_named("detail_log_arsip" if arsip else "detail_log", (id_log,))
+        return (result[0], result[1]) if result else (None, None)
+
+    def get_log_bulan_sebelum_db(self, batas_waktu):
+        """Bulan (YYYY-MM) yang masih memiliki log aktif sebelum batas_waktu, beserta jumlah barisnya."""
+        query = """
+            SELECT DATE_FORMAT(Timestamp_Aksi, '%Y-%m') AS Bulan, COUNT(*)
+            FROM Log_Perubahan_Kegiatan
+            WHERE Timestamp_Aksi < %s
+            GROUP BY Bulan
+            ORDER BY Bulan
+        """
+        return self.execute_query(query, (batas_waktu,), fetch_all=True) or []
+
+    def pindahkan_log_ke_arsip_db(self, id_min, id_max, waktu_dari, waktu_sampai, limit=500):
+        """Memindahkan maksimal limit baris log (rentang ID dan waktu) ke tabel arsip dalam satu transaksi pendek.
+
+        Baris dikunci lewat primary key, disalin ke arsip, lalu dihapus dari log aktif.
+        Mengembalikan jumlah baris yang dipindahkan (0 berarti rentang sudah habis).
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT ID_Log FROM Log_Perubahan_Kegiatan
+                WHERE ID_Log BETWEEN %s AND %s AND Timestamp_Aksi >= %s AND Timestamp_Aksi < %s
+                ORDER BY ID_Log
+                LIMIT %s
+                FOR UPDATE""", (id_min, id_max, waktu_dari, waktu_sampai, limit))
+            ids = [row[0] for row in cursor.fetchall()]
+            if ids:
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(f"""
+                    INSERT IGNORE INTO Log_Perubahan_Kegiatan_Arsip
+                        (ID_Log, ID_Kegiatan_Ref, Aksi, Timestamp_Aksi, Detail_Lama, Detail_Baru)
+                    SELECT ID_Log, ID_Kegiatan_Ref, Aksi, Timestamp_Aksi, Detail_Lama, Detail_Baru
+                    FROM Log_Perubahan_Kegiatan WHERE ID_Log IN ({placeholders})""", ids)
+                cursor.execute(f"DELETE FROM Log_Perubahan_Kegiatan WHERE ID_Log IN ({placeholders})", ids)
+            conn.commit()
+            return len(ids)
+        except mysql.connector.Error:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                self._release_connection(conn)
+
+    def catat_bulan_arsip_db(self, bulan, jumlah_baris, file_ekspor):
+        self.execute_query("""
+            INSERT INTO Log_Arsip_Bulan (Bulan, Jumlah_Baris, File_Ekspor) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE Jumlah_Baris = Jumlah_Baris + VALUES(Jumlah_Baris), File_Ekspor = VALUES(File_Ekspor)""",
+            (bulan, jumlah_baris, file_ekspor))
+
+    def get_bulan_arsip_db(self):
+        """Daftar (Bulan, Jumlah_Baris, File_Ekspor) yang sudah diarsipkan, terbaru dulu."""
+        return self.execute_named("daftar_bulan_arsip") or []
+
+    def get_log_bounds_db(self):
+        """Mengembalikan (MIN(ID_Log), MAX(ID_Log)); keduanya dibaca dari ujung indeks primary key."""
+        result = self.execute_named("batas_log")
+        return (result[0], result[1]) if result else (None, None)
+
+    def get_log_changes_since_db(self, last_id, limit=500, recheck_ids=()):
+        """Baris log dengan ID_Log > last_id (plus ID celah yang diperiksa ulang), urut naik, tanpa kolom detail."""
+        params = [last_id]
+        where_clause = "ID_Log > %s"
+        if recheck_ids:
+            where_clause += f" OR ID_Log IN ({', '.join(['%s'] * len(recheck_ids))})"
+            params.extend(recheck_ids)
+        query = f"""
+            SELECT ID_Log, Aksi, ID_Kegiatan_Ref
+            FROM Log_Perubahan_Kegiatan
+            WHERE {where_clause}
+            ORDER BY ID_Log ASC
+            LIMIT %s
+        """
+        params.append(limit)
+        return self.execute_query(query, tuple(params), fetch_all=True) or []
+
+    def get_kegiatan_by_ids_db(self, id_list):
+        """Mengambil kegiatan tertentu dari view; ID yang sudah dihapus tidak ada di hasil."""
+        if not id_list:
+            return []
+        query = f"""
+            SELECT ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan,
+                   ID_Penanggung_Jawab, Nama_Penanggung_Jawab
+            FROM View_Detail_Kegiatan
+            WHERE ID_Kegiatan IN ({', '.join(['%s'] * len(id_list))})
+        """
+        rows = self.execute_query(query, tuple(id_list), fetch_all=True) or []
+        return [Kegiatan.dari_baris_view(row) for row in rows]
+
+    def iter_query_chunks(self, query, params=None, chunk_size=1000):
+        """Generator yang membaca hasil SELECT lewat cursor unbuffered, chunk_size baris per fetchmany.
+
+        Baris di-stream dari server sehingga memori klien tetap rata berapa pun besar hasilnya.
+        Koneksi ditahan selama generator berjalan dan dikembalikan ke pool saat selesai atau ditutup.
+        """
+        conn = self._get_connection()
+        cursor = None
+        selesai = False
+        try:
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+            selesai = True
+        finally:
+            if not selesai:
+                # Berhenti di tengah stream: memutus koneksi lebih murah daripada membaca sisa hasil;
+                # pool membuang koneksi yang sudah tertutup saat dikembalikan.
+                try:
+                    conn.close()
+                except mysql.connector.Error:
+                    pass
+            elif cursor:
+                cursor.close()
+            self._release_connection(conn)
+
+    def get_existing_kegiatan_ids_db(self, id_list):
+        """Mengembalikan set ID_Kegiatan dari id_list yang sudah ada (satu lookup primary key per batch)."""
+        if not id_list:
+            return set()
+        query = f"SELECT ID_Kegiatan FROM Kegiatan WHERE ID_Kegiatan IN ({', '.join(['%s'] * len(id_list))})"
+        rows = self.execute_query(query, tuple(id_list), fetch_all=True) or []
+        return {row[0] for row in rows}
+
+    def insert_kegiatan_batch_db(self, kegiatan_list):
+        """Menyisipkan banyak kegiatan dalam satu transaksi dengan executemany (INSERT multi-baris).
+
+        Kolom yang diisi sama dengan SP_TambahKegiatan (Tanggal VARCHAR dan Tanggal_Date);
+        trigger insert tetap mencatat setiap baris ke log. Seluruh batch di-rollback jika ada yang gagal.
+        """
+        if not kegiatan_list:
+            return 0
+        query = """
+            INSERT INTO Kegiatan (ID_Kegiatan, Nama_Kegiatan, Tanggal, Tanggal_Date, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        params = [(k.id_entitas, k.nama_kegiatan, k.tanggal_str or None, k.tanggal,
+                   k.tempat, k.jenis_kegiatan, k.id_penanggung_jawab) for k in kegiatan_list]
+        self.execute_query(query, params, is_many=True)
+        return len(params)
+
+# --- Importer Massal Kegiatan ---
+class KegiatanImporter:
+    """Mengimpor kegiatan dari file CSV atau JSON Lines secara streaming.
+
+    File dibaca baris per baris (tidak dimuat seluruhnya ke memori), divalidasi dengan
+    Kegiatan.dari_input, lalu ditulis per batch dalam satu transaksi. Nama penanggung jawab
+    diterjemahkan ke ID_Pengguna lewat peta yang dibangun sekali di awal impor.
+    """
+    BATCH_SIZE = 500
+    KOLOM_WAJIB = ("id_kegiatan", "nama_kegiatan", "tanggal", "tempat", "jenis_kegiatan")
+    EKSTENSI_JSONL = (".jsonl", ".ndjson")
+
+    def __init__(self, db_manager: DatabaseManager, batch_size=BATCH_SIZE):
+        self.db_manager = db_manager
+        self.batch_size = max(1, batch_size)
+
+    def impor(self, path, dry_run=False, progress_callback=None):
+        """Menjalankan impor dan mengembalikan dict laporan (jumlah, error per baris, throughput).
+
+        Pada dry_run semua validasi (termasuk cek ID yang sudah ada di database) tetap dijalankan,
+        tetapi tidak ada yang ditulis. progress_callback(laporan) dipanggil setiap selesai satu batch.
+        """
+        laporan = {
+            "file": path, "dry_run": dry_run, "dibaca": 0, "valid": 0, "ditulis": 0,
+            "gagal": 0, "batch": 0, "errors": [], # errors: list (nomor_baris, id_kegiatan, pesan)
+            "durasi": 0.0, "durasi_db": 0.0, "baris_per_detik": 0.0,
+        }
+        t_mulai = time.perf_counter()
+        peta_pj = self._bangun_peta_pj()
+        id_terlihat = {} # ID (case-insensitive, mengikuti collation tabel) -> nomor baris pertama
+        batch = []
+        for nomor, data, pesan_error in self._baca_baris(path):
+            laporan["dibaca"] += 1
+            if pesan_error:
+                self._catat_error(laporan, nomor, "", pesan_error)
+                continue
+            try:
+                keg = self._validasi_baris(data, peta_pj)
+            except ValueError as e:
+                self._catat_error(laporan, nomor, str(data.get("id_kegiatan") or ""), str(e))
+                continue
+            kunci = keg.id_entitas.casefold()
+            if kunci in id_terlihat:
+                self._catat_error(laporan, nomor, keg.id_entitas,
+                                  f"ID Kegiatan duplikat di dalam file (pertama di baris {id_terlihat[kunci]}).")
+                continue
+            id_terlihat[kunci] = nomor
+            batch.append((nomor, keg))
+            if len(batch) >= self.batch_size:
+                self._proses_batch(batch, dry_run, laporan)
+                batch = []
+                if progress_callback:
+                    progress_callback(laporan)
+        if batch:
+            self._proses_batch(batch, dry_run, laporan)
+            if progress_callback:
+                progress_callback(laporan)
+
+        laporan["errors"].sort(key=lambda e: e[0]) # Error dari cek database dicatat per batch
+        laporan["durasi"] = time.perf_counter() - t_mulai
+        if laporan["durasi"] > 0:
+            laporan["baris_per_detik"] = laporan["dibaca"] / laporan["durasi"]
+        return laporan
+
+    def _bangun_peta_pj(self):
+        """Peta nama (case-insensitive) dan nama tampilan -> list ID_Pengguna; list >1 berarti nama ambigu."""
+        peta = {}
+        for p in self.db_manager.get_semua_pengguna_obj_db():
+            for kunci in {p.nama.strip().casefold(), p.get_display_name().casefold()}:
+                peta.setdefault(kunci, []).append(p.id_entitas)
+        return peta
+
+    def _baca_baris(self, path):
+        """Generator (nomor_baris, dict kolom, pesan_error) yang membaca file secara streaming."""
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            if path.lower().endswith(self.EKSTENSI_JSONL):
+                for nomor, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError as e:
+                        yield nomor, None, f"JSON tidak valid: {e}"
+                        continue
+                    if not isinstance(data, dict):
+                        yield nomor, None, "Setiap baris JSON Lines harus berupa objek."
+                        continue
+                    yield nomor, self._normalisasi_kolom(data), None
+            else:
+                reader = csv.DictReader(f)
+                header = {self._nama_kolom(k) for k in (reader.fieldnames or []) if k}
+                kurang = [k for k in self.KOLOM_WAJIB if k not in header]
+                if not {"penanggung_jawab", "id_penanggung_jawab"} & header:
+                    kurang.append("penanggung_jawab")
+                if kurang:
+                    raise ValueError(f"Header CSV tidak memiliki kolom: {', '.join(kurang)}.")
+                for data in reader:
+                    yield reader.line_num, self._normalisasi_kolom(data), None
+
+    @staticmethod
+    def _nama_kolom(nama):
+        return str(nama).strip().lower().replace(" ", "_")
+
+    def _normalisasi_kolom(self, data):
+        return {self._nama_kolom(k): v for k, v in data.items() if k is not None}
+
+    def _validasi_baris(self, data, peta_pj):
+        """Menerjemahkan PJ lalu memvalidasi baris dengan aturan yang sama seperti formulir."""
+        id_pj = data.get("id_penanggung_jawab")
+        if id_pj in (None, ""):
+            nama_pj = str(data.get("penanggung_jawab") or "").strip()
+            if nama_pj:
+                kandidat = peta_pj.get(nama_pj.casefold())
+                if not kandidat:
+                    raise ValueError(f"Penanggung jawab '{nama_pj}' tidak ditemukan.")
+                if len(kandidat) > 1:
+                    raise ValueError(f"Nama penanggung jawab '{nama_pj}' ambigu ({len(kandidat)} pengguna); "
+                                     "gunakan kolom id_penanggung_jawab.")
+                id_pj = kandidat[0]
+        return Kegiatan.dari_input(data.get("id_kegiatan"), data.get("nama_kegiatan"), data.get("tanggal"),
+                                   data.get("tempat"), data.get("jenis_kegiatan"), id_pj)
+
+    def _proses_batch(self, batch, dry_run, laporan):
+        """Memeriksa ID yang sudah ada lalu menulis batch dalam satu transaksi (kecuali dry-run)."""
+        t_db = time.perf_counter()
+        laporan["batch"] += 1
+        sudah_ada = {i.casefold() for i in self.db_manager.get_existing_kegiatan_ids_db([k.id_entitas for _, k in batch])}
+        siap = []
+        for nomor, keg in batch:
+            if keg.id_entitas.casefold() in sudah_ada:
+                self._catat_error(laporan, nomor, keg.id_entitas, "ID Kegiatan sudah terdaftar di database.")
+            else:
+                siap.append((nomor, keg))
+        if dry_run:
+            laporan["valid"] += len(siap)
+        elif siap:
+            try:
+                laporan["ditulis"] += self.db_manager.insert_kegiatan_batch_db([k for _, k in siap])
+                laporan["valid"] += len(siap)
+            except mysql.connector.Error:
+                # Batch sudah di-rollback; ulangi per baris agar baris penyebab error bisa dilaporkan
+                for nomor, keg in siap:
+                    try:
+                        laporan["ditulis"] += self.db_manager.insert_kegiatan_batch_db([keg])
+                        laporan["valid"] += 1
+                    except mysql.connector.Error as err:
+                        self._catat_error(laporan, nomor, keg.id_entitas, f"Error database: {err}")
+        laporan["durasi_db"] += time.perf_counter() - t_db
+
+    @staticmethod
+    def _catat_error(laporan, nomor, id_kegiatan, pesan):
+        laporan["gagal"] += 1
+        laporan["errors"].append((nomor, id_kegiatan, pesan))
+
+    @staticmethod
+    def ringkasan(laporan):
+        """Teks ringkasan laporan impor untuk messagebox maupun konsol."""
+        mode = "DRY-RUN (tidak ada yang ditulis)" if laporan["dry_run"] else "Impor"
+        return (f"{mode}: {laporan['dibaca']} baris dibaca, {laporan['valid']} valid, "
+                f"{laporan['ditulis']} ditulis, {laporan['gagal']} gagal dalam {laporan['batch']} batch.\n"
+                f"Waktu: {laporan['durasi']:.2f} s (database {laporan['durasi_db']:.2f} s), "
+                f"{laporan['baris_per_detik']:.0f} baris/detik.")
+
+    @staticmethod
+    def tulis_laporan_error(laporan, path):
+        """Menulis error per baris ke file CSV (baris, id_kegiatan, pesan)."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["baris", "id_kegiatan", "pesan"])
+            writer.writerows(laporan["errors"])
+
+# --- Ekspor Streaming ---
+class DataExporter:
+    """Mengekspor View_Detail_Kegiatan atau Log_Perubahan_Kegiatan ke CSV / JSON Lines (opsional gzip).
+
+    Data dibaca per chunk lewat cursor unbuffered dan langsung ditulis ke disk, sehingga
+    memori tetap rata. Format ditentukan dari ekstensi file: .csv, .jsonl/.ndjson, ditambah .gz.
+    """
+    CHUNK_SIZE = 1000
+    SUMBER = {
+        "kegiatan": {
+            "tabel": "View_Detail_Kegiatan",
+            # Nama kolom sama dengan yang dikenali KegiatanImporter, sehingga hasil ekspor bisa diimpor ulang
+            "kolom": ("ID_Kegiatan", "Nama_Kegiatan", "Tanggal", "Tempat", "Jenis_Kegiatan",
+                      "ID_Penanggung_Jawab", "Nama_Penanggung_Jawab"),
+            "kolom_waktu": "Tanggal", # Kolom DATE terindeks
+            "urutan": "Tanggal, ID_Kegiatan",
+        },
+        "log": {
+            "tabel": "Log_Perubahan_Kegiatan",
+            "kolom": ("ID_Log", "Timestamp_Aksi", "Aksi", "ID_Kegiatan_Ref", "Detail_Lama", "Detail_Baru"),
+            "kolom_waktu": "Timestamp_Aksi",
+            "urutan": "ID_Log", # Urutan primary key, tanpa filesort
+        },
+    }
+
+    def __init__(self, db_manager: DatabaseManager, chunk_size=CHUNK_SIZE):
+        self.db_manager = db_manager
+        self.chunk_size = max(1, chunk_size)
+
+    def ekspor(self, sumber, path, tanggal_dari=None, tanggal_sampai=None, progress_callback=None):
+        """Mengekspor sumber ('kegiatan' atau 'log') ke path; rentang tanggal inklusif dan opsional.
+
+        Ditulis ke file sementara lalu di-rename, sehingga ekspor yang gagal tidak meninggalkan file setengah jadi.
+        Mengembalikan dict statistik (baris, byte, durasi, baris_per_detik).
+        """
+        if sumber not in self.SUMBER:
+            raise ValueError(f"Sumber ekspor '{sumber}' tidak dikenal.")
+        if tanggal_dari and tanggal_sampai and tanggal_dari > tanggal_sampai:
+            raise ValueError("Tanggal awal tidak boleh setelah tanggal akhir.")
+        info = self.SUMBER[sumber]
+        query, params = self._bangun_query(info, tanggal_dari, tanggal_sampai)
+
+        nama_dasar = path[:-3] if path.lower().endswith(".gz") else path
+        jsonl = nama_dasar.lower().endswith(KegiatanImporter.EKSTENSI_JSONL)
+        statistik = {"sumber": sumber, "file": path, "baris": 0, "byte": 0, "durasi": 0.0, "baris_per_detik": 0.0}
+        t_mulai = time.perf_counter()
+        path_sementara = f"{path}.part"
+        try:
+            with self._buka_file(path_sementara, gzip_output=path.lower().endswith(".gz")) as f:
+                writer = None
+                if not jsonl:
+                    writer = csv.writer(f)
+                    writer.writerow(info["kolom"])
+                for rows in self.db_manager.iter_query_chunks(query, params, self.chunk_size):
+                    if jsonl:
+                        f.writelines(json.dumps(dict(zip(info["kolom"], map(self._format_nilai, row))),
+                                                ensure_ascii=False) + "\n" for row in rows)
+                    else:
+                        writer.writerows([("" if v is None else self._format_nilai(v)) for v in row] for row in rows)
+                    statistik["baris"] += len(rows)
+                    if progress_callback:
+                        progress_callback(statistik)
+            os.replace(path_sementara, path)
+        except BaseException:
+            try:
+                os.remove(path_sementara)
+            except OSError:
+                pass
+            raise
+        statistik["byte"] = os.path.getsize(path)
+        statistik["durasi"] = time.perf_counter() - t_mulai
+        if statistik["durasi"] > 0:
+            statistik["baris_per_detik"] = statistik["baris"] / statistik["durasi"]
+        return statistik
+
+    def _bangun_query(self, info, tanggal_dari, tanggal_sampai):
+        kondisi, params = [], []
+        if tanggal_dari:
+            kondisi.append(f"{info['kolom_waktu']} >= %s")
+            params.append(tanggal_dari)
+        if tanggal_sampai:
+            # Batas atas eksklusif hari berikutnya agar TIMESTAMP pada tanggal akhir ikut terambil
+            kondisi.append(f"{info['kolom_waktu']} < %s")
+            params.append(tanggal_sampai + datetime.timedelta(days=1))
+        where_clause = f"WHERE {' AND '.join(kondisi)}" if kondisi else ""
+        query = f"""
+            SELECT {', '.join(info['kolom'])}
+            FROM {info['tabel']}
+            {where_clause}
+            ORDER BY {info['urutan']}
+        """
+        return query, tuple(params)
+
+    @staticmethod
+    def _buka_file(path, gzip_output):
+        if gzip_output:
+            return gzip.open(path, "wt", encoding="utf-8", newline="")
+        return open(path, "w", encoding="utf-8", newline="")
+
+    @staticmethod
+    def _format_nilai(nilai):
+        """Tanggal ditulis dd-mm-yyyy seperti di tampilan (dan format yang diterima importer)."""
+        if isinstance(nilai, datetime.datetime):
+            return nilai.strftime("%Y-%m-%d %H:%M:%S")
+        if isinstance(nilai, datetime.date):
+            return nilai.strftime("%d-%m-%Y")
+        return nilai
+
+    @staticmethod
+    def ringkasan(statistik):
+        return (f"{statistik['baris']} baris diekspor ke {statistik['file']} "
+                f"({statistik['byte'] / 1024:.1f} KB) dalam {statistik['durasi']:.2f} s, "
+                f"{statistik['baris_per_detik']:.0f} baris/detik.")
+
+# --- Retensi Log Aktivitas ---
+class LogRetentionManager:
+    """Memindahkan log yang lebih tua dari masa retensi ke Log_Perubahan_Kegiatan_Arsip, per bulan.
+
+    Setiap bulan diekspor dulu ke file JSON Lines terkompresi, lalu dipindahkan dalam batch kecil
+    (satu transaksi pendek per batch) sehingga trigger yang menulis log tidak tertahan lama.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, retensi_bulan=LOG_RETENSI_BULAN,
+                 arsip_dir=LOG_ARSIP_DIR, batch_size=LOG_ARSIP_BATCH, jeda_batch=0.05):
+        self.db_manager = db_manager
+        self.retensi_bulan = max(1, retensi_bulan)
+        self.arsip_dir = arsip_dir
+        self.batch_size = max(1, batch_size)
+        self.jeda_batch = jeda_batch # Jeda antar batch (detik) agar transaksi lain mendapat giliran
+
+    @staticmethod
+    def _awal_bulan(tanggal, geser_bulan=0):
+        indeks = tanggal.year * 12 + (tanggal.month - 1) + geser_bulan
+        return datetime.date(indeks // 12, indeks % 12 + 1, 1)
+
+    def batas_retensi(self, hari_ini=None):
+        """Awal bulan paling tua yang masih disimpan di log aktif."""
+        return self._awal_bulan(hari_ini or datetime.date.today(), -self.retensi_bulan)
+
+    def jalankan(self, hari_ini=None, progress_callback=None):
+        """Mengarsipkan semua bulan sebelum batas retensi; mengembalikan dict ringkasan per bulan."""
+        batas = self.batas_retensi(hari_ini)
+        hasil = {"batas": batas, "bulan": [], "total_baris": 0, "durasi": 0.0}
+        t_mulai = time.perf_counter()
+        for bulan, _ in self.db_manager.get_log_bulan_sebelum_db(datetime.datetime.combine(batas, datetime.time())):
+            info = self.arsipkan_bulan(bulan, progress_callback)
+            hasil["bulan"].append(info)
+            hasil["total_baris"] += info["dipindahkan"]
+        hasil["durasi"] = time.perf_counter() - t_mulai
+        return hasil
+
+    def arsipkan_bulan(self, bulan, progress_callback=None):
+        """Mengekspor lalu memindahkan log satu bulan ('YYYY-MM') ke tabel arsip."""
+        awal = datetime.datetime.strptime(bulan, "%Y-%m").date()
+        akhir = self._awal_bulan(awal, 1)
+        waktu_dari = datetime.datetime.combine(awal, datetime.time())
+        waktu_sampai = datetime.datetime.combine(akhir, datetime.time())
+        id_min, id_max = self.db_manager.get_log_id_range_db(waktu_dari, waktu_sampai)
+        info = {"bulan": bulan, "file": None, "diekspor": 0, "dipindahkan": 0}
+        if id_min is None:
+            return info
+
+        # Rentang ID di nama file: arsip bulan yang sempat terputus tidak menimpa file sebelumnya
+        os.makedirs(self.arsip_dir, exist_ok=True)
+        info["file"] = os.path.join(self.arsip_dir, f"log_{bulan}_{id_min}-{id_max}.jsonl.gz")
+        statistik = DataExporter(self.db_manager).ekspor("log", info["file"], awal, akhir - datetime.timedelta(days=1))
+        info["diekspor"] = statistik["baris"]
+
+        while True:
+            jumlah = self.db_manager.pindahkan_log_ke_arsip_db(id_min, id_max, waktu_dari, waktu_sampai, self.batch_size)
+            if not jumlah:
+                break
+            info["dipindahkan"] += jumlah
+            if progress_callback:
+                progress_callback(info)
+            if self.jeda_batch:
+                time.sleep(self.jeda_batch)
+        self.db_manager.catat_bulan_arsip_db(bulan, info["dipindahkan"], info["file"])
+        return info
+
+    @staticmethod
+    def ringkasan(hasil):
+        if not hasil["bulan"]:
+            return f"Tidak ada log sebelum {hasil['batas']:%d-%m-%Y} yang perlu diarsipkan."
+        baris_bulan = "\n".join(f"  {b['bulan']}: {b['dipindahkan']} baris -> {b['file']}" for b in hasil["bulan"])
+        return (f"{hasil['total_baris']} baris log sebelum {hasil['batas']:%d-%m-%Y} dipindahkan ke arsip "
+                f"dalam {hasil['durasi']:.2f} s:\n{baris_bulan}")
+
+# --- Eksekutor Tugas Latar Belakang untuk UI ---
+class TaskExecutor:
+    """Menjalankan pekerjaan (misalnya panggilan DatabaseManager) di thread latar belakang.
+
+    Hasil dikirim kembali ke thread Tk lewat polling after(), berurutan per channel.
+    Tugas dengan supersede_key yang sama membatalkan tugas sebelumnya yang belum dikirim hasilnya.
+    """
+    POLL_INTERVAL_MS = 25
+
+    def __init__(self, root, max_workers=4):
+        self._root = root
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._results = queue.Queue() # Diisi thread worker, dikuras oleh thread Tk
+        self._seq = itertools.count()
+        self._tasks = {} # seq -> dict info tugas yang belum dikirim hasilnya
+        self._channel_order = {} # channel -> deque seq sesuai urutan submit
+        self._ready = {} # seq -> (status, nilai) yang sudah selesai tetapi menunggu giliran
+        self._latest_by_key = {} # supersede_key -> seq terbaru
+        self._busy_listeners = []
+        self._poll_scheduled = False
+        self._closed = False
+
+    def add_busy_listener(self, callback):
+        """callback(sibuk: bool) dipanggil saat status ada/tidaknya tugas berjalan berubah."""
+        self._busy_listeners.append(callback)
+
+    def remove_busy_listener(self, callback):
+        if callback in self._busy_listeners:
+            self._busy_listeners.remove(callback)
+
+    @property
+    def busy(self):
+        return bool(self._tasks)
+
+    def submit(self, fn, *args, on_success=None, on_error=None, channel="db", supersede_key=None, aksi=None):
+        """Menjadwalkan fn(*args) di thread worker. Harus dipanggil dari thread Tk.
+
+        on_success(hasil) / on_error(exception) dijalankan di thread Tk. Mengembalikan nomor urut tugas.
+        aksi: label aksi UI untuk instrumentasi query (default: channel dan nama fungsi).
+        """
+        if self._closed:
+            raise RuntimeError("TaskExecutor sudah ditutup.")
+        was_busy = self.busy
+        seq = next(self._seq)
+        if supersede_key is not None:
+            old_seq = self._latest_by_key.get(supersede_key)
+            if old_seq is not None:
+                self.cancel(old_seq)
+            self._latest_by_key[supersede_key] = seq
+
+        self._tasks[seq] = {"channel": channel, "on_success": on_success, "on_error": on_error,
+                            "supersede_key": supersede_key, "cancelled": False, "queued": True, "future": None}
+        self._channel_order.setdefault(channel, deque()).append(seq)
+        if aksi is None:
+            aksi = f"{channel}:{getattr(fn, '__name__', type(fn).__name__)}"
+        future = self._pool.submit(self._run, seq, fn, args, aksi)
+        # Future yang dibatalkan sebelum sempat jalan tetap harus melapor agar urutan channel tidak macet
+        future.add_done_callback(lambda f, s=seq: f.cancelled() and self._results.put((s, "cancelled", None)))
+        self._tasks[seq]["future"] = future
+
+        if not was_busy:
+            self._notify_busy(True)
+        self._schedule_poll()
+        return seq
+
+    def cancel(self, seq):
+        """Membatalkan tugas: jika belum mulai tidak dijalankan, jika sudah berjalan hasilnya dibuang."""
+        task = self._tasks.get(seq)
+        if task is None:
+            return
+        task["cancelled"] = True
+        if task["future"] is not None:
+            task["future"].cancel()
+
+    def _run(self, seq, fn, args, aksi):
+        """Dijalankan di thread worker; tidak boleh menyentuh widget Tk."""
+        _KONTEKS_AKSI.nama = aksi
+        try:
+            self._results.put((seq, "ok", fn(*args)))
+        except Exception as e:
+            self._results.put((seq, "error", e))
+        finally:
+            _KONTEKS_AKSI.nama = None
+
+    def _schedule_poll(self):
+        if not self._poll_scheduled and not self._closed:
+            self._poll_scheduled = True
+            self._root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_scheduled = False
+        while True:
+            try:
+                seq, status, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            task = self._tasks.get(seq)
+            if task is None:
+                continue
+            if task["cancelled"] and not task["queued"]:
+                self._deliver(seq, "cancelled", None) # Sudah dilepas dari antrean channel, cukup dibersihkan
+            else:
+                self._ready[seq] = (status, value)
+
+        # Kirim hasil berurutan per channel: tugas selesai menunggu tugas sebelumnya di channel yang sama.
+        # Tugas yang dibatalkan tidak ditunggu agar hasil penggantinya bisa langsung dikirim.
+        for channel, order in list(self._channel_order.items()):
+            while order and (order[0] in self._ready or self._tasks[order[0]]["cancelled"]):
+                seq = order.popleft()
+                if seq in self._ready:
+                    status, value = self._ready.pop(seq)
+                    self._deliver(seq, status, value)
+                else:
+                    self._tasks[seq]["queued"] = False # Hasilnya dibuang saat tiba nanti
+            if not order:
+                del self._channel_order[channel]
 
-    def check_username_exists(self, username):
-        query = "SELECT 1 FROM Pengguna WHERE Username = %s"
-        return self.execute_query(query, (username,), fetch_one=True) is not None
+        if self._tasks:
+            self._schedule_poll()
+        else:
+            self._notify_busy(False)
+
+    def _deliver(self, seq, status, value):
+        task = self._tasks.pop(seq)
+        key = task["supersede_key"]
+        if key is not None and self._latest_by_key.get(key) == seq:
+            del self._latest_by_key[key]
+        if task["cancelled"] or status == "cancelled":
+            return
+        try:
+            if status == "ok":
+                if task["on_success"]:
+                    task["on_success"](value)
+            elif task["on_error"]:
+                task["on_error"](value)
+            else:
+                print(f"Error di tugas latar belakang: {value}")
+        except tk.TclError as e:
+            # Jendela tujuan sudah ditutup sebelum hasil tiba
+            print(f"Info: Hasil tugas latar belakang diabaikan, widget sudah tidak ada ({e}).")
+        except Exception:
+            self._root.report_callback_exception(*sys.exc_info()) # Sama seperti error di callback Tk biasa
+
+    def _notify_busy(self, busy):
+        for callback in list(self._busy_listeners):
+            try:
+                callback(busy)
+            except tk.TclError:
+                self.remove_busy_listener(callback) # Widget pemilik listener sudah dihancurkan
+
+    def shutdown(self):
+        """Menghentikan worker; tugas yang belum mulai dibatalkan."""
+        self._closed = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# --- Watchdog Event Loop Tk dan Waktu Aksi Tombol ---
+class AksiTerukur:
+    """Aksi tombol yang sedang diukur; mulai bisa digeser setelah konfirmasi pengguna."""
+    __slots__ = ("nama", "mulai")
+
+    def __init__(self, nama):
+        self.nama = nama
+        self.mulai = time.perf_counter()
+
+
+class UIWatchdog:
+    """Mengukur latensi event loop Tk dengan tick after() dan mencatat stall beserta handler yang aktif.
+
+    Tick dijadwalkan setiap interval_ms; keterlambatannya adalah waktu event loop tertahan. Thread
+    pemantau memeriksa tick yang belum datang dan, selama stall berlangsung, mengambil frame thread Tk
+    (sys._current_frames) untuk mengetahui handler yang sedang berjalan. Waktu aksi tombol dari klik
+    sampai hasilnya diterapkan dicatat lewat mulai_aksi/selesai_aksi.
+    """
+    BATAS_HISTOGRAM_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000) # Bucket terakhir: > 5000 ms
+    # Fungsi perantara (dispatch hasil worker, pembungkus tombol) yang bukan handler sebenarnya
+    FRAME_PEMBUNGKUS = frozenset({"_poll", "_deliver", "_done", "<lambda>", "_aksi_terukur"})
+    HANDLER_TK = "Tcl/Tk (redraw, layout, event internal)"
+
+    def __init__(self, root, interval_ms=UI_WATCHDOG_INTERVAL_MS, ambang_ms=UI_STALL_AMBANG_MS,
+                 maks_catatan=UI_DIAGNOSTIK_MAKS_CATATAN):
+        self._root = root
+        self.interval_ms = interval_ms
+        self.ambang_ms = ambang_ms
+        self.stall = deque(maxlen=maks_catatan) # dict per stall, terbaru di akhir
+        self.riwayat_aksi = deque(maxlen=maks_catatan) # dict per aksi tombol yang selesai
+        self._aksi = {} # nama aksi -> statistik agregat
+        self._histogram = [0] * (len(self.BATAS_HISTOGRAM_MS) + 1)
+        self._jumlah_tick = 0
+        self._total_lag_ms = 0.0
+        self._maks_lag_ms = 0.0
+        self._jadwal = None # perf_counter saat tick berikutnya seharusnya jalan
+        self._sampel = None # (handler, lokasi) yang diambil thread pemantau selama stall berjalan
+        self._thread_tk = None
+        self._after_id = None
+        self._berhenti = threading.Event()
+        self._mulai = time.time()
+
+    def mulai(self):
+        """Mulai tick dan thread pemantau. Harus dipanggil dari thread Tk."""
+        self._thread_tk = threading.get_ident()
+        self._berhenti.clear()
+        self._jadwalkan()
+        threading.Thread(target=self._pantau, name="ui-watchdog", daemon=True).start()
+
+    def hentikan(self):
+        self._berhenti.set()
+        if self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass # Root sudah dihancurkan
+            self._after_id = None
+
+    def _jadwalkan(self):
+        self._jadwal = time.perf_counter() + self.interval_ms / 1000
+        self._after_id = self._root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        lag_ms = max(0.0, (time.perf_counter() - self._jadwal) * 1000)
+        self._jumlah_tick += 1
+        self._total_lag_ms += lag_ms
+        self._maks_lag_ms = max(self._maks_lag_ms, lag_ms)
+        self._histogram[bisect.bisect_left(self.BATAS_HISTOGRAM_MS, lag_ms)] += 1
+        if lag_ms >= self.ambang_ms:
+            handler, lokasi = self._sampel or ("(tidak tersampel)", None)
+            self.stall.append({"waktu": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                               "durasi_ms": round(lag_ms, 1), "handler": handler, "lokasi": lokasi})
+        self._sampel = None
+        if not self._berhenti.is_set():
+            self._jadwalkan()
+
+    def _pantau(self):
+        """Thread pemantau: saat tick terlambat melewati ambang, ambil sekali frame yang sedang dijalankan thread Tk."""
+        periode = min(self.ambang_ms / 4, 50) / 1000
+        while not self._berhenti.wait(periode):
+            jadwal = self._jadwal
+            if jadwal is None or self._sampel is not None:
+                continue
+            if (time.perf_counter() - jadwal) * 1000 >= self.ambang_ms:
+                frame = sys._current_frames().get(self._thread_tk)
+                if frame is not None:
+                    self._sampel = self._ringkas_frame(frame)
+
+    def _ringkas_frame(self, frame):
+        """(handler, lokasi): handler = fungsi aplikasi terluar di callback Tk yang sedang berjalan,
+        lokasi = frame terdalam (bisa di modul lain, mis. tkcalendar)."""
+        lokasi = None
+        handler_app = None
+        terluar = None
+        while frame is not None:
+            kode = frame.f_code
+            modul = frame.f_globals.get("__name__", "?")
+            if lokasi is None:
+                lokasi = f"{modul}.{kode.co_name}:{frame.f_lineno}"
+            if modul == "tkinter" and kode.co_name == "__call__":
+                break # Batas dispatch callback Tk; di luarnya hanya mainloop/wait_window
+            if modul == __name__ and kode.co_name not in self.FRAME_PEMBUNGKUS:
+                handler_app = getattr(kode, "co_qualname", kode.co_name)
+            if modul != "tkinter":
+                terluar = f"{modul}.{kode.co_name}"
+            frame = frame.f_back
+        return handler_app or terluar or self.HANDLER_TK, lokasi
+
+    def mulai_aksi(self, nama):
+        return AksiTerukur(nama)
+
+    def selesai_aksi(self, aksi, status="ok"):
+        """Mencatat durasi aksi; status 'ok', 'gagal', 'dibatalkan', atau 'tanpa_db' (selesai tanpa tugas latar belakang)."""
+        durasi_ms = (time.perf_counter() - aksi.mulai) * 1000
+        stat = self._aksi.get(aksi.nama)
+        if stat is None:
+            stat = self._aksi[aksi.nama] = {"jumlah": 0, "gagal": 0, "total_ms": 0.0, "maks_ms": 0.0, "terakhir_ms": 0.0}
+        stat["jumlah"] += 1
+        stat["gagal"] += status == "gagal"
+        stat["total_ms"] += durasi_ms
+        stat["maks_ms"] = max(stat["maks_ms"], durasi_ms)
+        stat["terakhir_ms"] = durasi_ms
+        self.riwayat_aksi.append({"waktu": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                                  "aksi": aksi.nama, "durasi_ms": round(durasi_ms, 1), "status": status})
+
+    def ringkasan(self):
+        return {"tick": self._jumlah_tick, "rata_lag_ms": round(self._total_lag_ms / self._jumlah_tick, 2) if self._jumlah_tick else 0.0,
+                "maks_lag_ms": round(self._maks_lag_ms, 1), "stall": len(self.stall)}
+
+    def snapshot(self):
+        """Semua hasil dalam bentuk yang aman diserialisasi JSON (untuk jendela diagnostik dan ekspor)."""
+        aksi = {}
+        for nama, stat in self._aksi.items():
+            aksi[nama] = {k: round(v, 1) if isinstance(v, float) else v for k, v in stat.items()}
+            aksi[nama]["rata_ms"] = round(stat["total_ms"] / stat["jumlah"], 1)
+        return {
+            "dibuat": datetime.datetime.now().isoformat(timespec="seconds"),
+            "sejak": datetime.datetime.fromtimestamp(self._mulai).isoformat(timespec="seconds"),
+            "interval_ms": self.interval_ms,
+            "ambang_stall_ms": self.ambang_ms,
+            "event_loop": dict(self.ringkasan(), batas_histogram_ms=list(self.BATAS_HISTOGRAM_MS),
+                               histogram=list(self._histogram)),
+            "stall": list(self.stall),
+            "aksi": aksi,
+            "riwayat_aksi": list(self.riwayat_aksi),
+        }
 
-    def check_nimid_exists(self, nim_nip):
-        query = "SELECT 1 FROM Pengguna WHERE NIM_NIP = %s"
-        return self.execute_query(query, (nim_nip,), fetch_one=True) is not None
+# --- Change Feed Antar-Klien dari Log_Perubahan_Kegiatan ---
+class ChangeFeedPoller:
+    """Memantau Log_Perubahan_Kegiatan di latar belakang dan meneruskan perubahan klien lain ke UI.
+
+    Hanya baris log dengan ID_Log di atas ID terakhir yang dibaca. Interval polling adaptif: cepat setelah
+    ada perubahan, melambat saat sepi. Jika selisih terlalu besar atau log sudah dipangkas, diminta resync penuh.
+    """
+    MIN_INTERVAL_MS = 1000
+    MAX_INTERVAL_MS = 30000
+    BACKOFF_FACTOR = 1.5
+    BATCH_LIMIT = 500 # Selisih log di atas ini lebih murah diselesaikan dengan resync penuh
+    GAP_RECHECK_SECONDS = 60 # ID_Log yang terlewat (transaksi belum commit) diperiksa ulang selama ini
+
+    def __init__(self, root, db_manager: DatabaseManager, executor: TaskExecutor, on_delta, on_resync):
+        self._root = root
+        self._db_manager = db_manager
+        self._executor = executor
+        self._on_delta = on_delta # on_delta(perubahan: dict id -> item atau None, total_kegiatan atau None)
+        self._on_resync = on_resync # on_resync() memuat ulang grid penuh
+        self._last_seen_id = None
+        self._gaps = {} # ID_Log yang terlewat -> waktu pertama terlihat
+        self._interval_ms = self.MIN_INTERVAL_MS
+        self._after_id = None
+        self._running = False
+        self._in_flight = False
+        self.stats = {"polls": 0, "deltas": 0, "resyncs": 0, "log_rows": 0}
+
+    def start(self):
+        """Mencatat ID_Log terakhir saat ini sebagai titik awal, lalu mulai polling."""
+        if self._running:
+            return
+        self._running = True
+        self._in_flight = True
+        self._executor.submit(self._db_manager.get_log_bounds_db, on_success=self._on_baseline,
+                              on_error=self._on_poll_error, channel="change_feed")
+
+    def stop(self):
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def reset_baseline(self, last_seen_id):
+        """Dipanggil setelah resync penuh: perubahan sampai last_seen_id sudah tercermin di grid."""
+        if last_seen_id is not None:
+            self._last_seen_id = last_seen_id
+            self._gaps.clear()
+
+    def poll_now(self):
+        """Memaksa polling segera (misalnya setelah aksi pengguna)."""
+        self._interval_ms = self.MIN_INTERVAL_MS
+        self._schedule(0)
+
+    def _on_baseline(self, bounds):
+        self._in_flight = False
+        self._last_seen_id = bounds[1] or 0
+        self._schedule(self._interval_ms)
+
+    def _schedule(self, delay_ms):
+        if not self._running:
+            return
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+        self._after_id = self._root.after(delay_ms, self._tick)
 
-    def get_max_pengguna_id(self):
-        query = "SELECT MAX(ID_Pengguna) FROM Pengguna"
-        result = self.execute_query(query, fetch_one=True)
-        return result[0] if result and result[0] is not None else 0
+    def _tick(self):
+        self._after_id = None
+        if not self._running or self._in_flight:
+            return
+        self._in_flight = True
+        now = time.monotonic()
+        self._gaps = {gap: seen for gap, seen in self._gaps.items() if now - seen < self.GAP_RECHECK_SECONDS}
+        self._executor.submit(self._fetch_changes, self._last_seen_id, tuple(self._gaps),
+                              on_success=self._on_poll_result, on_error=self._on_poll_error,
+                              channel="change_feed", supersede_key="change_feed")
+
+    def _fetch_changes(self, last_seen_id, gap_ids):
+        """Dijalankan di thread worker."""
+        min_id, max_id = self._db_manager.get_log_bounds_db()
+        if max_id is None or (max_id <= last_seen_id and not gap_ids):
+            return "idle", None
+        if min_id is not None and min_id > last_seen_id + 1:
+            return "resync", max_id # Log setelah titik terakhir sudah dipangkas (retensi/arsip)
+        if max_id - last_seen_id > self.BATCH_LIMIT:
+            return "resync", max_id
+
+        logs = self._db_manager.get_log_changes_since_db(last_seen_id, self.BATCH_LIMIT, gap_ids)
+        if not logs:
+            return "idle", None
+        changed_ids = list(dict.fromkeys(row[2] for row in logs if row[2] is not None))
+        items = {keg.id_entitas: keg for keg in self._db_manager.get_kegiatan_by_ids_db(changed_ids)}
+        # INSERT/DELETE mengubah jumlah baris: ambil COUNT(*) agar total tidak terhitung ganda dengan aksi lokal
+        total = None
+        if any(row[1] in ("INSERT", "DELETE") for row in logs):
+            total = self._db_manager.count_kegiatan_db()
+        return "delta", ([row[0] for row in logs], {id_keg: items.get(id_keg) for id_keg in changed_ids}, total)
+
+    def _on_poll_result(self, hasil):
+        self._in_flight = False
+        self.stats["polls"] += 1
+        status, payload = hasil
+        if status == "idle":
+            self._interval_ms = min(self.MAX_INTERVAL_MS, int(self._interval_ms * self.BACKOFF_FACTOR))
+        elif status == "resync":
+            self.stats["resyncs"] += 1
+            self.reset_baseline(payload)
+            self._on_resync()
+            self._interval_ms = self.MIN_INTERVAL_MS
+        else:
+            log_ids, changes, total = payload
+            self.stats["deltas"] += 1
+            self.stats["log_rows"] += len(log_ids)
+            self._track_gaps(log_ids)
+            self._on_delta(changes, total)
+            self._interval_ms = self.MIN_INTERVAL_MS
+        self._schedule(self._interval_ms)
+
+    def _track_gaps(self, log_ids):
+        """ID_Log yang dilewati (dialokasikan tetapi belum commit) dicatat untuk diperiksa ulang."""
+        now = time.monotonic()
+        expected = self._last_seen_id + 1
+        for log_id in log_ids:
+            self._gaps.pop(log_id, None)
+            if log_id > self._last_seen_id:
+                for missing in range(expected, log_id):
+                    self._gaps.setdefault(missing, now)
+                expected = log_id + 1
+                self._last_seen_id = log_id
+
+    def _on_poll_error(self, err):
+        self._in_flight = False
+        print(f"Info: Polling change feed gagal, dicoba lagi nanti: {err}")
+        self._interval_ms = min(self.MAX_INTERVAL_MS, int(self._interval_ms * self.BACKOFF_FACTOR))
+        if self._last_seen_id is None:
+            self._running = False
+            self._root.after(self._interval_ms, self.start) # Baseline belum ada, ulangi start
+            return
+        self._schedule(self._interval_ms)
+
+# --- Pemilih Penanggung Jawab dengan Pencarian Bertahap ---
+class DirektoriPengguna:
+    """Pengguna yang dikenal UI, dibagi semua pemilih penanggung jawab.
+
+    Mode lokal: seluruh pengguna dimuat (lewat cache data referensi) dan dicari dengan IndeksPrefixPengguna.
+    Mode server (lebih dari PJ_INDEKS_LOKAL_MAKS pengguna): setiap pencarian menjadi query LIKE 'prefix%';
+    obj_map dan id_ke_tampilan hanya berisi pengguna yang pernah muncul di hasil pencarian atau di grid.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, executor: TaskExecutor):
+        self._db_manager = db_manager
+        self._executor = executor
+        self.obj_map = {} # nama tampilan -> objek Pengguna
+        self.id_ke_tampilan = {} # id_pengguna -> nama tampilan
+        self.indeks = None
+        self.mode_server = False
+
+    def ambil(self):
+        """Dijalankan di thread worker: memilih mode dari jumlah pengguna dan membangun indeks lokal jika cukup kecil."""
+        total = self._db_manager.jumlah_pengguna_db()
+        if total > PJ_INDEKS_LOKAL_MAKS:
+            return total, None
+        return total, IndeksPrefixPengguna(self._db_manager.get_semua_pengguna_obj_db())
+
+    def terapkan(self, hasil):
+        """Dijalankan di thread Tk dengan hasil ambil(); map diisi ulang di tempat (objek dict tetap sama)."""
+        _, indeks = hasil
+        self.obj_map.clear()
+        self.id_ke_tampilan.clear()
+        self.indeks = indeks
+        self.mode_server = indeks is None
+        if indeks is not None:
+            self.daftarkan(indeks.semua())
+
+    def daftarkan(self, pengguna_list):
+        for pengguna in pengguna_list:
+            tampilan = pengguna.get_display_name()
+            self.obj_map[tampilan] = pengguna
+            self.id_ke_tampilan[pengguna.id_entitas] = tampilan
+
+    def cari(self, teks, callback, batas=PJ_PICKER_BATAS, kunci="pj"):
+        """callback(list Pengguna) dipanggil langsung (mode lokal) atau setelah query server selesai."""
+        if not self.mode_server:
+            callback(self.indeks.cari(teks, batas) if self.indeks is not None else [])
+            return
 
-    def add_user_obj_db(self, pengguna_obj: 'Pengguna'): # Tambahkan type hint
-        query = """
-            INSERT INTO Pengguna (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        self.execute_query(query, (pengguna_obj.id_entitas, pengguna_obj.nama, pengguna_obj.role_id,
-                                   pengguna_obj.nim_nip, pengguna_obj.username, pengguna_obj._password))
+        def on_success(hasil):
+            self.daftarkan(hasil)
+            callback(hasil)
+        self._executor.submit(self._db_manager.cari_pengguna_prefix_db, teks.strip(), batas,
+                              on_success=on_success,
+                              on_error=lambda err: print(f"Peringatan: Pencarian penanggung jawab gagal: {err}"),
+                              supersede_key=f"cari_pengguna_{kunci}")
+
+
+class PenggunaPicker(ttk.Combobox):
+    """Combobox penanggung jawab yang bisa diketik: daftar pilihan hanya berisi kecocokan teratas.
+
+    Teks yang diketik dicari sebagai prefix nama, kata dalam nama, NIM/NIP, atau username. Nilai yang sah
+    hanya nama tampilan dari daftar (atau salah satu opsi_tetap, mis. "Semua"); pengguna_terpilih()
+    mengembalikan objek Pengguna-nya.
+    """
+    TOMBOL_NAVIGASI = frozenset({"Up", "Down", "Return", "KP_Enter", "Escape", "Tab", "ISO_Left_Tab",
+                                 "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"})
+
+    def __init__(self, master, direktori: DirektoriPengguna, opsi_tetap=(), batas=PJ_PICKER_BATAS, **kwargs):
+        super().__init__(master, postcommand=self._sebelum_dibuka, **kwargs)
+        self._direktori = direktori
+        self._opsi_tetap = list(opsi_tetap)
+        self._batas = batas
+        self._teks_dicari = None
+        self._job = None
+        self["values"] = self._opsi_tetap
+        self.bind("<KeyRelease>", self._on_ketik)
+
+    def pengguna_terpilih(self):
+        return self._direktori.obj_map.get(self.get())
+
+    def segarkan(self):
+        """Menjalankan ulang pencarian untuk teks saat ini (mis. setelah direktori dimuat ulang)."""
+        self._teks_dicari = None
+        self._cari()
+
+    def _on_ketik(self, event):
+        if event.keysym in self.TOMBOL_NAVIGASI:
+            return
+        if self._job:
+            self.after_cancel(self._job)
+            self._job = None
+        if self._direktori.mode_server:
+            self._job = self.after(PJ_CARI_DEBOUNCE_MS, self._cari)
+        else:
+            self._cari()
+
+    def _sebelum_dibuka(self):
+        if not self._direktori.mode_server:
+            self._cari() # Murah di mode lokal; mode server memakai hasil pencarian terakhir
+
+    def _cari(self):
+        self._job = None
+        teks = self.get()
+        if teks in self._opsi_tetap or teks in self._direktori.obj_map:
+            teks = "" # Pilihan yang sudah jadi: tampilkan daftar awal, bukan hasil pencarian teksnya
+        if teks == self._teks_dicari:
+            return
+        self._teks_dicari = teks
+        self._direktori.cari(teks, self._tampilkan, self._batas, kunci=str(id(self)))
 
+    def _tampilkan(self, hasil):
+        if self.winfo_exists():
+            self["values"] = self._opsi_tetap + [pengguna.get_display_name() for pengguna in hasil]
 
-    def get_activity_log_db(self):
-        query = """
-            SELECT ID_Log, Timestamp_Aksi, Aksi, ID_Kegiatan_Ref, Detail_Lama, Detail_Baru
-            FROM Log_Perubahan_Kegiatan
-            ORDER BY Timestamp_Aksi DESC
-        """
-        return self.execute_query(query, fetch_all=True)
 
 # --- Kelas Dasar untuk Dialog UI ---
 class BaseDialog:
@@ -604,6 +3241,14 @@ class BaseDialog:
         """Handler saat dialog ditutup."""
         self.top.destroy()
 
+    def _set_busy(self, busy, *widgets):
+        """Indikator sibuk: kursor jam pasir dan widget aksi nonaktif selama tugas DB berjalan."""
+        if not self.top.winfo_exists():
+            return
+        self.top.config(cursor="watch" if busy else "")
+        for widget in widgets:
+            widget.config(state="disabled" if busy else "normal")
+
     def show(self):
         """Menampilkan dialog dan menunggu hingga ditutup."""
         self.parent_root.wait_window(self.top)
@@ -611,10 +3256,19 @@ class BaseDialog:
 
 # --- Kelas untuk Jendela Login (Mewarisi BaseDialog) ---
 class LoginDialog(BaseDialog):
-    def __init__(self, parent_root, db_manager: DatabaseManager, open_signup_callback):
+    BG_SOURCE = "./assets/LOGIN (1).png"
+    RESIZE_DEBOUNCE_MS = 150 # Jeda setelah perubahan ukuran terakhir sebelum latar diproses ulang
+
+    def __init__(self, parent_root, db_manager: DatabaseManager, open_signup_callback, executor: TaskExecutor):
         self.db_manager = db_manager
+        self.executor = executor
+        self.aset_cache = AssetCache()
+        self._bg_size = None # Ukuran latar yang terakhir diminta
+        self._bg_label = None
+        self._resize_job = None
         self.open_signup_callback = open_signup_callback
         self.login_successful = False # Tetap ada untuk kompatibilitas logika di main
+        self.db_siap = False # Diset lewat set_db_siap() setelah inisialisasi database di latar belakang selesai
         super().__init__(parent_root, "Login Aplikasi Manajemen Kegiatan", "1080x720")
 
     def _setup_styles(self): # Override untuk style khusus Login
@@ -627,19 +3281,10 @@ class LoginDialog(BaseDialog):
 
 
     def _build_ui(self): # Polimorfisme: Implementasi spesifik untuk LoginDialog
-        try:
-            # Pastikan path ke aset benar
-            img = Image.open("./assets/LOGIN (1).png")
-            img = img.resize((1080, 720), Image.LANCZOS)
-            self.bg_image = ImageTk.PhotoImage(img)
-            bg_label = ttk.Label(self.top, image=self.bg_image)
-            bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-        except FileNotFoundError:
-            print("Peringatan: Gambar latar login './assets/LOGIN (1).png' tidak ditemukan.")
-            # self.top.configure(bg="lightgray") # Sudah dihandle oleh BaseDialog
-        except Exception as e:
-            print(f"Error memuat gambar latar: {e}")
-            # self.top.configure(bg="lightgray")
+        # Gambar latar disiapkan di worker (dari cache jika ada) setelah form tampil
+        self.top.resizable(True, True) # Latar mengikuti ukuran jendela
+        self._muat_gambar_latar((1080, 720))
+        self.top.bind("<Configure>", self._on_resize)
 
         # Frame dibuat transparan agar gambar latar terlihat
         center_frame = ttk.Frame(self.top, style="TFrame") # Style default TFrame biasanya transparan
@@ -657,8 +3302,12 @@ class LoginDialog(BaseDialog):
 
         self.password_entry.bind("<Return>", self._attempt_login)
 
-        login_button = ttk.Button(center_frame, text="Login", command=self._attempt_login, style="Login.TButton")
-        login_button.grid(row=4, column=0, pady=10, sticky="ew")
+        self.login_button = ttk.Button(center_frame, text="Login", command=self._attempt_login, style="Login.TButton")
+        self.login_button.grid(row=4, column=0, pady=10, sticky="ew")
+        self.login_button.config(state="disabled") # Aktif setelah set_db_siap()
+
+        self.db_status_label = ttk.Label(center_frame, text="⏳ Menghubungkan ke database...", style="Login.TLabel")
+        self.db_status_label.grid(row=6, column=0, pady=(10, 0))
 
         signup_label = ttk.Label(center_frame, text="Belum punya akun? Daftar di sini", style="Link.TLabel", cursor="hand2")
         signup_label.grid(row=5, column=0, pady=(10,0))
@@ -666,6 +3315,48 @@ class LoginDialog(BaseDialog):
 
         self.username_entry.focus_set()
 
+    def _on_resize(self, event):
+        if event.widget is not self.top:
+            return
+        size = (event.width, event.height)
+        if size == self._bg_size or min(size) <= 1:
+            return
+        # Debounce: hanya ukuran terakhir setelah jendela berhenti di-resize yang diproses
+        if self._resize_job:
+            self.top.after_cancel(self._resize_job)
+        self._resize_job = self.top.after(self.RESIZE_DEBOUNCE_MS, lambda: self._muat_gambar_latar(size))
+
+    def _muat_gambar_latar(self, size):
+        self._resize_job = None
+        self._bg_size = size
+        # Cache miss (blur/resize dengan PIL) dikerjakan di worker; permintaan lama dibatalkan oleh yang baru
+        self.executor.submit(self.aset_cache.siapkan, self.BG_SOURCE, size,
+                             on_success=self._pasang_gambar_latar, on_error=self._on_gambar_latar_error,
+                             channel="aset", supersede_key=f"login_bg_{id(self)}")
+
+    def _pasang_gambar_latar(self, path):
+        # PhotoImage harus dibuat di thread Tk; PPM dibaca langsung oleh Tk tanpa PIL
+        self.bg_image = tk.PhotoImage(file=path)
+        if self._bg_label is None:
+            self._bg_label = ttk.Label(self.top, image=self.bg_image)
+            self._bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+            self._bg_label.lower() # Di belakang form yang sudah tampil
+        else:
+            self._bg_label.config(image=self.bg_image)
+
+    def _on_gambar_latar_error(self, err):
+        if isinstance(err, FileNotFoundError):
+            print(f"Peringatan: Gambar latar login '{self.BG_SOURCE}' tidak ditemukan.")
+        else:
+            print(f"Error memuat gambar latar: {err}")
+
+    def set_db_siap(self):
+        """Dipanggil setelah inisialisasi database di latar belakang selesai."""
+        self.db_siap = True
+        if self.top.winfo_exists():
+            self.login_button.config(state="normal")
+            self.db_status_label.config(text="")
+
     def _on_close(self): # Override jika ada perilaku khusus saat menutup
         print("Jendela login ditutup oleh pengguna.")
         self.login_successful = False
@@ -675,6 +3366,8 @@ class LoginDialog(BaseDialog):
         #     self.parent_root.destroy()
 
     def _attempt_login(self, event=None):
+        if not self.db_siap:
+            return # Tombol Enter sebelum database siap
         username = self.username_entry.get()
         password = self.password_entry.get()
 
@@ -682,25 +3375,35 @@ class LoginDialog(BaseDialog):
             messagebox.showerror("Login Gagal", "Username dan Password harus diisi.", parent=self.top)
             return
 
-        try:
-            user_obj = self.db_manager.verify_user_credentials(username, password)
-            if user_obj: # Jika objek Pengguna dikembalikan, login berhasil
-                messagebox.showinfo("Login Berhasil", f"Login berhasil! Selamat datang {user_obj.nama}.", parent=self.top)
-                self.login_successful = True
-                self.result = user_obj # Simpan objek pengguna jika perlu diakses setelah dialog
-                self.top.destroy()
-            else:
-                messagebox.showerror("Login Gagal", "Username atau password salah.", parent=self.top)
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Tidak dapat terhubung ke database: {db_err}", parent=self.top)
-        except Exception as e:
-            messagebox.showerror("Error", f"Terjadi kesalahan: {e}", parent=self.top)
+        # Verifikasi berjalan di thread worker agar jendela tetap responsif
+        self._set_busy(True, self.login_button)
+        self.executor.submit(self.db_manager.verify_user_credentials, username, password,
+                             on_success=self._on_login_result, on_error=self._on_login_error,
+                             supersede_key="login")
+
+    def _on_login_result(self, user_obj):
+        self._set_busy(False, self.login_button)
+        if user_obj: # Jika objek Pengguna dikembalikan, login berhasil
+            messagebox.showinfo("Login Berhasil", f"Login berhasil! Selamat datang {user_obj.nama}.", parent=self.top)
+            self.login_successful = True
+            self.result = user_obj # Simpan objek pengguna jika perlu diakses setelah dialog
+            self.top.destroy()
+        else:
+            messagebox.showerror("Login Gagal", "Username atau password salah.", parent=self.top)
+
+    def _on_login_error(self, err):
+        self._set_busy(False, self.login_button)
+        if isinstance(err, mysql.connector.Error):
+            messagebox.showerror("Error Database", f"Tidak dapat terhubung ke database: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan: {err}", parent=self.top)
 
 
 # --- Kelas untuk Jendela Signup (Mewarisi BaseDialog) ---
 class SignupDialog(BaseDialog):
-    def __init__(self, parent_root, db_manager: DatabaseManager):
+    def __init__(self, parent_root, db_manager: DatabaseManager, executor: TaskExecutor):
         self.db_manager = db_manager
+        self.executor = executor
         self.signup_successful = False
         super().__init__(parent_root, "Pendaftaran Pengguna Baru", "500x500") # Geometri disesuaikan
 
@@ -753,8 +3456,8 @@ class SignupDialog(BaseDialog):
         button_frame = ttk.Frame(form_frame, style="TFrame") # Pastikan TFrame ada
         button_frame.grid(row=row_idx, column=0, columnspan=2, pady=20)
 
-        signup_button = ttk.Button(button_frame, text="Daftar", command=self._attempt_signup, style="Signup.TButton")
-        signup_button.pack(side=tk.LEFT, padx=10)
+        self.signup_button = ttk.Button(button_frame, text="Daftar", command=self._attempt_signup, style="Signup.TButton")
+        self.signup_button.pack(side=tk.LEFT, padx=10)
 
         cancel_button = ttk.Button(button_frame, text="Batal", command=self._on_close, style="Signup.TButton")
         cancel_button.pack(side=tk.LEFT, padx=10)
@@ -764,21 +3467,27 @@ class SignupDialog(BaseDialog):
 
 
     def _load_roles(self):
-        try:
-            roles_data = self.db_manager.get_roles_db()
-            if roles_data:
-                self.role_map = {nama_role: role_id for role_id, nama_role in roles_data}
-                self.role_combo["values"] = list(self.role_map.keys())
-                if self.role_combo["values"]:
-                    self.role_combo.current(0) # Pilih item pertama jika ada
-            else:
-                self.role_combo["values"] = []
-                self.role_map = {}
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Gagal memuat role: {db_err}", parent=self.top)
+        self.role_map = {}
+        self.role_combo["values"] = []
+        self.executor.submit(self.db_manager.get_roles_db,
+                             on_success=self._on_roles_loaded, on_error=self._on_roles_error,
+                             supersede_key=f"roles_{id(self)}")
+
+    def _on_roles_loaded(self, roles_data):
+        if roles_data:
+            self.role_map = {nama_role: role_id for role_id, nama_role in roles_data}
+            self.role_combo["values"] = list(self.role_map.keys())
+            if self.role_combo["values"]:
+                self.role_combo.current(0) # Pilih item pertama jika ada
+        else:
             self.role_combo["values"] = []
             self.role_map = {}
 
+    def _on_roles_error(self, db_err):
+        messagebox.showerror("Error Database", f"Gagal memuat role: {db_err}", parent=self.top)
+        self.role_combo["values"] = []
+        self.role_map = {}
+
     def _attempt_signup(self, event=None):
         nama = self._nama_entry.get().strip()
         nim_nip = self._nimid_entry.get().strip()
@@ -804,104 +3513,537 @@ class SignupDialog(BaseDialog):
             messagebox.showerror("Pendaftaran Gagal", "Role tidak valid.", parent=self.top)
             return
 
-        try:
-            if self.db_manager.check_username_exists(username):
-                messagebox.showerror("Pendaftaran Gagal", f"Username '{username}' sudah digunakan.", parent=self.top)
-                return
-            if self.db_manager.check_nimid_exists(nim_nip):
-                messagebox.showerror("Pendaftaran Gagal", f"NIM/NIP '{nim_nip}' sudah terdaftar.", parent=self.top)
-                return
-
-            max_id = self.db_manager.get_max_pengguna_id()
-            new_id_pengguna = max_id + 1
-            
-            # Membuat objek Pengguna baru
-            new_user = Pengguna(new_id_pengguna, nama, role_id, nim_nip, username, password)
-            self.db_manager.add_user_obj_db(new_user) # Menggunakan metode baru dengan objek
+        self._set_busy(True, self.signup_button)
+        self.executor.submit(self._daftarkan_pengguna_db, nama, nim_nip, username, password, role_id,
+                             on_success=self._on_signup_result, on_error=self._on_signup_error,
+                             supersede_key=f"signup_{id(self)}")
+
+    def _daftarkan_pengguna_db(self, nama, nim_nip, username, password, role_id):
+        """Dijalankan di thread worker. Mengembalikan (status, objek Pengguna baru atau nilai yang duplikat)."""
+        # ID dan pengecekan duplikat dikerjakan atomik oleh SP di server (satu round trip)
+        status, new_id_pengguna = self.db_manager.daftarkan_pengguna_db(nama, nim_nip, username, password, role_id)
+        if status == "username_ada":
+            return status, username
+        if status == "nimnip_ada":
+            return status, nim_nip
+        if status != "ok":
+            return status, role_id
+        return "ok", Pengguna(new_id_pengguna, nama, role_id, nim_nip, username, password)
+
+    def _on_signup_result(self, hasil):
+        self._set_busy(False, self.signup_button)
+        status, new_user = hasil
+        if status == "username_ada":
+            messagebox.showerror("Pendaftaran Gagal", f"Username '{new_user}' sudah digunakan.", parent=self.top)
+            return
+        if status == "nimnip_ada":
+            messagebox.showerror("Pendaftaran Gagal", f"NIM/NIP '{new_user}' sudah terdaftar.", parent=self.top)
+            return
+        if status == "role_tidak_valid":
+            messagebox.showerror("Pendaftaran Gagal", "Role tidak valid.", parent=self.top)
+            return
 
-            messagebox.showinfo("Pendaftaran Berhasil", "Pengguna baru berhasil didaftarkan! Silakan login.", parent=self.top)
-            self.signup_successful = True
-            self.result = new_user # Simpan objek pengguna jika perlu
-            self._on_close()
+        messagebox.showinfo("Pendaftaran Berhasil", "Pengguna baru berhasil didaftarkan! Silakan login.", parent=self.top)
+        self.signup_successful = True
+        self.result = new_user # Simpan objek pengguna jika perlu
+        self._on_close()
 
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Gagal mendaftarkan pengguna: {db_err}", parent=self.top)
-        except Exception as e:
-            messagebox.showerror("Error", f"Terjadi kesalahan: {e}", parent=self.top)
+    def _on_signup_error(self, err):
+        self._set_busy(False, self.signup_button)
+        if isinstance(err, mysql.connector.Error):
+            messagebox.showerror("Error Database", f"Gagal mendaftarkan pengguna: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan: {err}", parent=self.top)
 
 
 # --- Kelas untuk Jendela Riwayat Aktivitas (Mewarisi BaseDialog) ---
 class ActivityLogDialog(BaseDialog):
-    def __init__(self, parent, db_manager: DatabaseManager):
+    PAGE_SIZE = 100 # Baris log per halaman keyset
+    AKSI_OPTIONS = ("Semua", "INSERT", "UPDATE", "DELETE")
+
+    def __init__(self, parent, db_manager: DatabaseManager, executor: TaskExecutor, on_siap=None):
         self.db_manager = db_manager
-        super().__init__(parent, "📜 Riwayat Aktivitas Kegiatan", "950x500")
+        self.executor = executor
+        self._on_siap = on_siap # on_siap(status) dipanggil sekali saat halaman pertama tampil atau gagal dimuat
+        self._filters = {}
+        self._last_id = None # ID_Log terkecil yang sudah ditampilkan (kursor keyset)
+        self._habis = False
+        self._loading = False
+        super().__init__(parent, "📜 Riwayat Aktivitas Kegiatan", "950x600")
 
     def _build_ui(self):
+        style_prefix = self.__class__.__name__
+        filter_frame = ttk.Frame(self.top, style="TFrame")
+        filter_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        ttk.Label(filter_frame, text="Aksi:", style=f"{style_prefix}.TLabel").pack(side=tk.LEFT, padx=(0, 5))
+        self.combo_aksi = ttk.Combobox(filter_frame, values=self.AKSI_OPTIONS, state="readonly", width=10, style=f"{style_prefix}.TCombobox")
+        self.combo_aksi.current(0)
+        self.combo_aksi.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(filter_frame, text="ID Kegiatan:", style=f"{style_prefix}.TLabel").pack(side=tk.LEFT, padx=(0, 5))
+        self.entry_id_keg = ttk.Entry(filter_frame, width=12, style=f"{style_prefix}.TEntry")
+        self.entry_id_keg.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(filter_frame, text="Dari:", style=f"{style_prefix}.TLabel").pack(side=tk.LEFT, padx=(0, 5))
+        self.entry_dari = ttk.Entry(filter_frame, width=12, style=f"{style_prefix}.TEntry")
+        self.entry_dari.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(filter_frame, text="Sampai:", style=f"{style_prefix}.TLabel").pack(side=tk.LEFT, padx=(0, 5))
+        self.entry_sampai = ttk.Entry(filter_frame, width=12, style=f"{style_prefix}.TEntry")
+        self.entry_sampai.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.var_arsip = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_frame, text="🗄️ Cari di arsip", variable=self.var_arsip).pack(side=tk.LEFT, padx=(0, 10))
+
+        self.filter_button = ttk.Button(filter_frame, text="🔍 Terapkan Filter", command=self._load_log_data, style=f"{style_prefix}.TButton")
+        self.filter_button.pack(side=tk.LEFT)
+
         log_frame = ttk.LabelFrame(self.top, text="Log Perubahan Data Kegiatan", padding="10")
         log_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
 
-        columns = ("id_log", "timestamp", "aksi", "id_keg_ref", "detail_lama", "detail_baru")
-        self.log_tree = ttk.Treeview(log_frame, columns=columns, show="headings")
+        columns = ("id_log", "timestamp", "aksi", "id_keg_ref")
+        self.log_tree = ttk.Treeview(log_frame, columns=columns, show="headings", selectmode="browse")
 
         col_configs = {
-            "id_log": {"text": "ID Log", "width": 60, "anchor": "center"},
-            "timestamp": {"text": "Waktu", "width": 150, "anchor": "w"},
-            "aksi": {"text": "Aksi", "width": 80, "anchor": "w"},
-            "id_keg_ref": {"text": "ID Kegiatan", "width": 100, "anchor": "center"},
-            "detail_lama": {"text": "Data Lama", "width": 250, "anchor": "w"},
-            "detail_baru": {"text": "Data Baru", "width": 250, "anchor": "w"}
+            "id_log": {"text": "ID Log", "width": 80, "anchor": "center"},
+            "timestamp": {"text": "Waktu", "width": 180, "anchor": "w"},
+            "aksi": {"text": "Aksi", "width": 100, "anchor": "w"},
+            "id_keg_ref": {"text": "ID Kegiatan", "width": 120, "anchor": "center"},
         }
         for col, config in col_configs.items():
             self.log_tree.heading(col, text=config["text"])
             self.log_tree.column(col, width=config["width"], anchor=config["anchor"])
 
+        self.log_scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=self.log_tree.yview)
+        self.log_tree.configure(yscrollcommand=self._on_log_yscroll) # Dibungkus agar bisa memuat halaman berikutnya
+        self.log_tree.bind("<<TreeviewSelect>>", self._on_log_select)
 
-        scrollbar_y = ttk.Scrollbar(log_frame, orient="vertical", command=self.log_tree.yview)
-        scrollbar_x = ttk.Scrollbar(log_frame, orient="horizontal", command=self.log_tree.xview)
-        self.log_tree.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        self.log_tree.grid(row=0, column=0, rowspan=2, sticky="nsew")
+        self.log_scrollbar.grid(row=0, column=1, rowspan=2, sticky="ns")
 
-        self.log_tree.grid(row=0, column=0, sticky="nsew")
-        scrollbar_y.grid(row=0, column=1, sticky="ns")
-        scrollbar_x.grid(row=1, column=0, sticky="ew")
+        # Detail TEXT hanya dimuat untuk baris yang dipilih
+        self.detail_texts = {}
+        for row_idx, (kunci, judul) in enumerate((("lama", "Data Lama"), ("baru", "Data Baru"))):
+            detail_frame = ttk.LabelFrame(log_frame, text=judul, padding="5")
+            detail_frame.grid(row=row_idx, column=2, sticky="nsew", padx=(10, 0))
+            text = tk.Text(detail_frame, width=45, height=8, wrap="word", font=FONT_STYLE, state="disabled")
+            text.pack(expand=True, fill=tk.BOTH)
+            self.detail_texts[kunci] = text
 
         log_frame.grid_rowconfigure(0, weight=1)
+        log_frame.grid_rowconfigure(1, weight=1)
         log_frame.grid_columnconfigure(0, weight=1)
+        log_frame.grid_columnconfigure(2, weight=1)
 
         button_frame = ttk.Frame(self.top, style="TFrame") # Pastikan TFrame ada
         button_frame.pack(pady=10)
 
-        refresh_button = ttk.Button(button_frame, text="🔄 Muat Ulang", command=self._load_log_data, style=f"{self.__class__.__name__}.TButton")
-        refresh_button.pack(side=tk.LEFT, padx=5)
+        self.refresh_button = ttk.Button(button_frame, text="🔄 Muat Ulang", command=self._load_log_data, style=f"{style_prefix}.TButton")
+        self.refresh_button.pack(side=tk.LEFT, padx=5)
+
+        self.more_button = ttk.Button(button_frame, text="⬇️ Muat Lebih Banyak", command=self._load_next_page, style=f"{style_prefix}.TButton")
+        self.more_button.pack(side=tk.LEFT, padx=5)
 
-        close_button = ttk.Button(button_frame, text="Tutup", command=self._on_close, style=f"{self.__class__.__name__}.TButton")
+        self.arsip_button = ttk.Button(button_frame, text="🗄️ Arsipkan Log Lama", command=self._arsipkan_log_lama, style=f"{style_prefix}.TButton")
+        self.arsip_button.pack(side=tk.LEFT, padx=5)
+
+        close_button = ttk.Button(button_frame, text="Tutup", command=self._on_close, style=f"{style_prefix}.TButton")
         close_button.pack(side=tk.LEFT, padx=5)
 
         self._load_log_data()
 
+    def _read_filters(self):
+        """Membaca filter dari form; rentang tanggal inklusif diubah menjadi [dari 00:00, sampai+1 hari 00:00)."""
+        filters = {"arsip": True} if self.var_arsip.get() else {}
+        aksi = self.combo_aksi.get()
+        if aksi and aksi != "Semua":
+            filters["aksi"] = aksi
+        id_keg = self.entry_id_keg.get().strip()
+        if id_keg:
+            filters["id_kegiatan"] = id_keg
+        for kunci, entry, geser_hari in (("waktu_dari", self.entry_dari, 0), ("waktu_sampai", self.entry_sampai, 1)):
+            teks = entry.get().strip()
+            if teks:
+                try:
+                    tanggal = datetime.datetime.strptime(teks, "%d-%m-%Y")
+                except ValueError:
+                    raise ValueError(f"Tanggal '{teks}' tidak valid (gunakan dd-mm-yyyy).") from None
+                filters[kunci] = tanggal + datetime.timedelta(days=geser_hari)
+        return filters
+
     def _load_log_data(self):
+        try:
+            filters = self._read_filters()
+        except ValueError as e:
+            self._lapor_siap("gagal")
+            messagebox.showwarning("⚠️ Filter Tidak Valid", str(e), parent=self.top)
+            return
+        # Klik berulang membatalkan permintaan sebelumnya yang belum selesai
+        self._loading = True
+        self._set_busy(True, self.refresh_button, self.filter_button, self.more_button)
+        self.executor.submit(self._ambil_halaman_pertama, filters,
+                             on_success=self._on_log_loaded, on_error=self._on_log_error,
+                             supersede_key=f"log_{id(self)}")
+
+    def _ambil_halaman_pertama(self, filters):
+        """Dijalankan di worker: filter waktu diterjemahkan sekali menjadi rentang ID_Log, lalu halaman pertama."""
+        if filters.get("waktu_dari") or filters.get("waktu_sampai"):
+            filters = dict(filters, rentang_id=self.db_manager.get_log_id_range_db(filters.get("waktu_dari"),
+                                                                                     filters.get("waktu_sampai"),
+                                                                                     arsip=filters.get("arsip", False)))
+        return filters, self.db_manager.get_log_page_db(filters, None, self.PAGE_SIZE)
+
+    def _load_next_page(self):
+        if self._loading or self._habis:
+            return
+        self._loading = True
+        self._set_busy(True, self.more_button)
+        self.executor.submit(self.db_manager.get_log_page_db, self._filters, self._last_id, self.PAGE_SIZE,
+                             on_success=self._on_page_loaded, on_error=self._on_log_error,
+                             supersede_key=f"log_{id(self)}")
+
+    def _on_log_yscroll(self, first, last):
+        self.log_scrollbar.set(first, last)
+        if float(last) >= 0.9 and not self._loading and not self._habis and self._last_id is not None:
+            self.top.after_idle(self._load_next_page)
+
+    def _on_log_loaded(self, hasil):
+        filters, rows = hasil
+        self._filters = filters
+        self._last_id = None
+        self._habis = False
         for item in self.log_tree.get_children():
             self.log_tree.delete(item)
+        self._show_detail(None, None)
+        self._set_busy(False, self.refresh_button, self.filter_button)
+        if not rows:
+            self.log_tree.insert("", tk.END, values=("", "Tidak ada data log.", "", ""))
+        self._on_page_loaded(rows)
+        self._lapor_siap("ok")
+
+    def _lapor_siap(self, status):
+        if self._on_siap is not None:
+            on_siap, self._on_siap = self._on_siap, None
+            on_siap(status)
+
+    def _on_page_loaded(self, rows):
+        self._loading = False
+        for row in rows:
+            formatted_row = list(row)
+            if isinstance(row[1], datetime.datetime):
+                formatted_row[1] = row[1].strftime("%Y-%m-%d %H:%M:%S")
+            self.log_tree.insert("", tk.END, iid=str(row[0]), values=formatted_row)
+        if rows:
+            self._last_id = rows[-1][0]
+        self._habis = len(rows) < self.PAGE_SIZE
+        self._set_busy(False, self.more_button)
+        if self._habis:
+            self.more_button.config(state="disabled")
+
+    def _on_log_select(self, event=None):
+        selected = self.log_tree.selection()
+        if not selected or not selected[0].isdigit():
+            return
+        self.executor.submit(self.db_manager.get_log_detail_db, int(selected[0]), self._filters.get("arsip", False),
+                             on_success=lambda detail: self._show_detail(*detail),
+                             on_error=lambda err: messagebox.showerror("Error Database", f"Gagal memuat detail log: {err}", parent=self.top),
+                             supersede_key=f"log_detail_{id(self)}")
+
+    def _show_detail(self, detail_lama, detail_baru):
+        for kunci, isi in (("lama", detail_lama), ("baru", detail_baru)):
+            text = self.detail_texts[kunci]
+            text.config(state="normal")
+            text.delete("1.0", tk.END)
+            text.insert("1.0", isi or "-")
+            text.config(state="disabled")
+
+    def _arsipkan_log_lama(self):
+        retensi = LogRetentionManager(self.db_manager)
+        if not messagebox.askyesno("🗄️ Arsipkan Log Lama",
+                                   f"Pindahkan log sebelum {retensi.batas_retensi():%d-%m-%Y} ke tabel arsip?\n"
+                                   f"Setiap bulan diekspor dulu ke folder '{retensi.arsip_dir}'.", parent=self.top):
+            return
+        self._set_busy(True, self.arsip_button)
+        # Channel terpisah: pemindahan bertahap bisa lama dan tidak boleh menahan pemuatan halaman log
+        self.executor.submit(retensi.jalankan, on_success=self._on_arsip_done,
+                             on_error=self._on_arsip_error, channel="arsip_log")
+
+    def _on_arsip_done(self, hasil):
+        self._set_busy(False, self.arsip_button)
+        messagebox.showinfo("🗄️ Arsip Selesai", LogRetentionManager.ringkasan(hasil), parent=self.top)
+        if hasil["total_baris"]:
+            self._load_log_data()
+
+    def _on_arsip_error(self, err):
+        self._set_busy(False, self.arsip_button)
+        messagebox.showerror("Error", f"Gagal mengarsipkan log: {err}", parent=self.top)
+
+    def _on_log_error(self, err):
+        self._loading = False
+        self._set_busy(False, self.refresh_button, self.filter_button, self.more_button)
+        self._lapor_siap("gagal")
+        if isinstance(err, mysql.connector.Error):
+            messagebox.showerror("Error Database", f"Gagal memuat riwayat aktivitas: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat memuat log: {err}", parent=self.top)
+
+
+class ExportDialog(BaseDialog):
+    SUMBER_OPTIONS = {"Kegiatan (View_Detail_Kegiatan)": "kegiatan", "Log Perubahan Kegiatan": "log"}
+    FORMAT_OPTIONS = {"CSV": ".csv", "JSON Lines": ".jsonl"}
+
+    def __init__(self, parent, db_manager: DatabaseManager, executor: TaskExecutor):
+        self.db_manager = db_manager
+        self.executor = executor
+        super().__init__(parent, "📤 Ekspor Data", "420x300")
+
+    def _build_ui(self):
+        style_prefix = self.__class__.__name__
+        frame = ttk.Frame(self.top, padding="15", style="TFrame")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        ttk.Label(frame, text="Sumber:", style=f"{style_prefix}.TLabel").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.combo_sumber = ttk.Combobox(frame, values=list(self.SUMBER_OPTIONS), state="readonly", width=30, style=f"{style_prefix}.TCombobox")
+        self.combo_sumber.current(0)
+        self.combo_sumber.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
+        ttk.Label(frame, text="Format:", style=f"{style_prefix}.TLabel").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.combo_format = ttk.Combobox(frame, values=list(self.FORMAT_OPTIONS), state="readonly", width=30, style=f"{style_prefix}.TCombobox")
+        self.combo_format.current(0)
+        self.combo_format.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+
+        ttk.Label(frame, text="Dari (dd-mm-yyyy):", style=f"{style_prefix}.TLabel").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.entry_dari = ttk.Entry(frame, width=32, style=f"{style_prefix}.TEntry")
+        self.entry_dari.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+
+        ttk.Label(frame, text="Sampai (dd-mm-yyyy):", style=f"{style_prefix}.TLabel").grid(row=3, column=0, padx=5, pady=5, sticky="w")
+        self.entry_sampai = ttk.Entry(frame, width=32, style=f"{style_prefix}.TEntry")
+        self.entry_sampai.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
+
+        self.var_gzip = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Kompres dengan gzip (.gz)", variable=self.var_gzip).grid(row=4, column=1, padx=5, pady=5, sticky="w")
+
+        self.ekspor_button = ttk.Button(frame, text="📤 Ekspor...", command=self._attempt_export, style=f"{style_prefix}.TButton")
+        self.ekspor_button.grid(row=5, column=0, columnspan=2, pady=15)
+
+    def _parse_tanggal(self, entry, label):
+        teks = entry.get().strip()
+        if not teks:
+            return None
         try:
-            log_data = self.db_manager.get_activity_log_db()
-            if log_data:
-                for row in log_data:
-                    formatted_row = list(row)
-                    if isinstance(row[1], datetime.datetime):
-                        formatted_row[1] = row[1].strftime("%Y-%m-%d %H:%M:%S")
-                    self.log_tree.insert("", tk.END, values=formatted_row)
-            else:
-                self.log_tree.insert("", tk.END, values=("", "Tidak ada data log.", "", "", "", ""))
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Gagal memuat riwayat aktivitas: {db_err}", parent=self.top)
-        except Exception as e:
-            messagebox.showerror("Error", f"Terjadi kesalahan saat memuat log: {e}", parent=self.top)
+            return datetime.datetime.strptime(teks, "%d-%m-%Y").date()
+        except ValueError:
+            raise ValueError(f"Tanggal {label} '{teks}' tidak valid (gunakan dd-mm-yyyy).") from None
+
+    def _attempt_export(self):
+        try:
+            tanggal_dari = self._parse_tanggal(self.entry_dari, "awal")
+            tanggal_sampai = self._parse_tanggal(self.entry_sampai, "akhir")
+        except ValueError as e:
+            messagebox.showwarning("⚠️ Validasi Gagal", str(e), parent=self.top)
+            return
+        sumber = self.SUMBER_OPTIONS[self.combo_sumber.get()]
+        ekstensi = self.FORMAT_OPTIONS[self.combo_format.get()] + (".gz" if self.var_gzip.get() else "")
+        path = filedialog.asksaveasfilename(parent=self.top, title="Simpan Ekspor", defaultextension=ekstensi,
+                                            initialfile=f"{sumber}_{datetime.date.today():%Y%m%d}{ekstensi}",
+                                            filetypes=[(self.combo_format.get(), f"*{ekstensi}"), ("Semua file", "*.*")])
+        if not path:
+            return
+        self._set_busy(True, self.ekspor_button)
+        exporter = DataExporter(self.db_manager)
+        # Channel terpisah: ekspor besar tidak menahan urutan hasil aksi DB di jendela utama
+        self.executor.submit(exporter.ekspor, sumber, path, tanggal_dari, tanggal_sampai,
+                             on_success=self._on_export_done, on_error=self._on_export_error, channel="ekspor")
+
+    def _on_export_done(self, statistik):
+        self._set_busy(False, self.ekspor_button)
+        messagebox.showinfo("✅ Ekspor Selesai", DataExporter.ringkasan(statistik), parent=self.top)
+
+    def _on_export_error(self, err):
+        self._set_busy(False, self.ekspor_button)
+        if isinstance(err, mysql.connector.Error):
+            messagebox.showerror("Error Database", f"Gagal mengekspor data: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat ekspor: {err}", parent=self.top)
+
+
+class UbahMassalDialog(BaseDialog):
+    """Memilih kolom yang diubah untuk semua kegiatan terpilih; hasilnya dict perubahan (lihat update_kegiatan_massal_db)."""
+    PJ_KOSONG = "(Tanpa penanggung jawab)"
+
+    def __init__(self, parent, jumlah, tempat_options, direktori_pengguna: DirektoriPengguna):
+        self.jumlah = jumlah
+        self.tempat_options = tempat_options
+        self.direktori_pengguna = direktori_pengguna
+        super().__init__(parent, f"🗂️ Ubah Massal ({jumlah} kegiatan)", "460x260")
+
+    def _build_ui(self):
+        style_prefix = self.__class__.__name__
+        frame = ttk.Frame(self.top, padding="15", style="TFrame")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        ttk.Label(frame, text=f"Centang kolom yang akan diubah untuk {self.jumlah} kegiatan:",
+                  style=f"{style_prefix}.TLabel").grid(row=0, column=0, columnspan=2, padx=5, pady=(0, 10), sticky="w")
+
+        self.var_tempat = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Tempat", variable=self.var_tempat).grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.combo_tempat = ttk.Combobox(frame, values=self.tempat_options, state="readonly", width=30, style=f"{style_prefix}.TCombobox")
+        self.combo_tempat.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+
+        self.var_jenis = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Jenis Kegiatan", variable=self.var_jenis).grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.entry_jenis = ttk.Entry(frame, width=32, style=f"{style_prefix}.TEntry")
+        self.entry_jenis.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+
+        self.var_pj = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Penanggung Jawab", variable=self.var_pj).grid(row=3, column=0, padx=5, pady=5, sticky="w")
+        self.combo_pj = PenggunaPicker(frame, self.direktori_pengguna, opsi_tetap=[self.PJ_KOSONG],
+                                       width=30, style=f"{style_prefix}.TCombobox")
+        self.combo_pj.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
+
+        button_frame = ttk.Frame(frame, style="TFrame")
+        button_frame.grid(row=4, column=0, columnspan=2, pady=15)
+        ttk.Button(button_frame, text="Terapkan", command=self._terapkan, style=f"{style_prefix}.TButton").pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Batal", command=self._on_close, style=f"{style_prefix}.TButton").pack(side=tk.LEFT, padx=10)
+
+    def _terapkan(self):
+        perubahan = {}
+        if self.var_tempat.get():
+            if not self.combo_tempat.get():
+                messagebox.showwarning("⚠️ Validasi Gagal", "Pilih tempat baru.", parent=self.top)
+                return
+            perubahan["tempat"] = self.combo_tempat.get()
+        if self.var_jenis.get():
+            jenis = self.entry_jenis.get().strip()
+            if not jenis:
+                messagebox.showwarning("⚠️ Validasi Gagal", "Jenis Kegiatan tidak boleh kosong.", parent=self.top)
+                return
+            if len(jenis) > Kegiatan.PANJANG_MAKS["Jenis Kegiatan"]:
+                messagebox.showwarning("⚠️ Validasi Gagal", f"Jenis Kegiatan terlalu panjang (maksimal "
+                                       f"{Kegiatan.PANJANG_MAKS['Jenis Kegiatan']} karakter).", parent=self.top)
+                return
+            perubahan["jenis"] = jenis
+        if self.var_pj.get():
+            pilihan = self.combo_pj.get()
+            pengguna_obj = self.combo_pj.pengguna_terpilih()
+            if pilihan != self.PJ_KOSONG and pengguna_obj is None:
+                messagebox.showwarning("⚠️ Validasi Gagal", "Pilih penanggung jawab baru dari daftar hasil pencarian.",
+                                       parent=self.top)
+                return
+            perubahan["id_pj"] = pengguna_obj.id_entitas if pengguna_obj else None
+        if not perubahan:
+            messagebox.showwarning("⚠️ Peringatan", "Centang minimal satu kolom yang akan diubah.", parent=self.top)
+            return
+        self.result = perubahan
+        self._on_close()
+
+
+class DiagnostikDialog(BaseDialog):
+    """Menampilkan hasil UIWatchdog (stall event loop, waktu aksi tombol) dan instrumentasi query jika aktif."""
+
+    def __init__(self, parent, watchdog: UIWatchdog, db_manager: DatabaseManager):
+        self.watchdog = watchdog
+        self.db_manager = db_manager
+        super().__init__(parent, "🩺 Diagnostik Aplikasi", "900x560")
+
+    def _build_ui(self):
+        style_prefix = self.__class__.__name__
+        self.label_ringkasan = ttk.Label(self.top, style=f"{style_prefix}.TLabel")
+        self.label_ringkasan.pack(fill=tk.X, padx=10, pady=(10, 5))
+
+        notebook = ttk.Notebook(self.top)
+        notebook.pack(expand=True, fill=tk.BOTH, padx=10, pady=5)
+        self.tree_stall = self._buat_tabel(notebook, "⏱️ Stall Event Loop", (
+            ("waktu", "Waktu", 170), ("durasi", "Durasi (ms)", 90), ("handler", "Handler", 300), ("lokasi", "Lokasi", 280)))
+        self.tree_aksi = self._buat_tabel(notebook, "🖱️ Aksi Tombol", (
+            ("aksi", "Aksi", 200), ("jumlah", "Jumlah", 70), ("gagal", "Gagal", 60), ("rata", "Rata-rata (ms)", 110),
+            ("maks", "Maks (ms)", 100), ("terakhir", "Terakhir (ms)", 110)))
+        if self.db_manager.instrumentasi is not None:
+            self.tree_query = self._buat_tabel(notebook, "🗄️ Query", (
+                ("sidik", "Fingerprint SQL", 420), ("jumlah", "Jumlah", 70), ("rata", "Rata-rata (ms)", 100),
+                ("maks", "Maks (ms)", 90), ("connect", "Connect (ms)", 90), ("baris", "Baris", 70)))
+        else:
+            self.tree_query = None
+
+        button_frame = ttk.Frame(self.top, style="TFrame")
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="🔄 Segarkan", command=self._segarkan, style=f"{style_prefix}.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="💾 Ekspor JSON...", command=self._ekspor, style=f"{style_prefix}.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Tutup", command=self._on_close, style=f"{style_prefix}.TButton").pack(side=tk.LEFT, padx=5)
+        self._segarkan()
+
+    def _buat_tabel(self, notebook, judul, kolom):
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=judul)
+        tree = ttk.Treeview(frame, columns=[k for k, _, _ in kolom], show="headings")
+        for kunci, teks, lebar in kolom:
+            tree.heading(kunci, text=teks)
+            tree.column(kunci, width=lebar, anchor="w")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(expand=True, fill=tk.BOTH)
+        return tree
+
+    def _data(self):
+        data = {"ui": self.watchdog.snapshot(), "pool": self.db_manager.get_pool_stats(),
+                "statement": self.db_manager.get_statement_stats(), "referensi": self.db_manager.get_referensi_stats()}
+        if self.db_manager.instrumentasi is not None:
+            data["query"] = self.db_manager.instrumentasi.snapshot()
+        return data
+
+    def _segarkan(self):
+        data = self._data()
+        ui = data["ui"]
+        loop = ui["event_loop"]
+        self.label_ringkasan.config(text=f"Event loop: {loop['tick']} tick, rata-rata terlambat {loop['rata_lag_ms']} ms, "
+                                         f"maks {loop['maks_lag_ms']} ms, {loop['stall']} stall di atas "
+                                         f"{ui['ambang_stall_ms']} ms (sejak {ui['sejak']})")
+        rows_stall = [(s["waktu"], s["durasi_ms"], s["handler"], s["lokasi"] or "-") for s in reversed(ui["stall"])]
+        rows_aksi = [(nama, a["jumlah"], a["gagal"], a["rata_ms"], a["maks_ms"], a["terakhir_ms"])
+                     for nama, a in sorted(ui["aksi"].items(), key=lambda item: item[1]["maks_ms"], reverse=True)]
+        self._isi(self.tree_stall, rows_stall)
+        self._isi(self.tree_aksi, rows_aksi)
+        if self.tree_query is not None:
+            self._isi(self.tree_query, [(q["sidik"], q["jumlah"], q["rata_ms"], q["maks_ms"],
+                                         round(q["connect_ms"] / q["jumlah"], 3), q["baris"])
+                                        for q in data["query"]["statement"]])
+
+    @staticmethod
+    def _isi(tree, rows):
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", tk.END, values=row)
+
+    def _ekspor(self):
+        path = filedialog.asksaveasfilename(parent=self.top, title="Simpan Diagnostik", defaultextension=".json",
+                                            initialfile=f"diagnostik_{datetime.datetime.now():%Y%m%d_%H%M%S}.json",
+                                            filetypes=[("JSON", "*.json"), ("Semua file", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._data(), f, ensure_ascii=False, indent=1, default=str)
+        except OSError as e:
+            messagebox.showerror("Error", f"Gagal menyimpan diagnostik: {e}", parent=self.top)
+            return
+        messagebox.showinfo("✅ Ekspor Selesai", f"Diagnostik disimpan ke {path}.", parent=self.top)
 
 
 # --- Kelas Aplikasi Utama ---
 class KegiatanApp:
-    def __init__(self, root, db_manager: DatabaseManager):
+    TABEL_FRAME_TITLE = "📋 Daftar Kegiatan (dari View)"
+
+    def __init__(self, root, db_manager: DatabaseManager, executor: TaskExecutor, watchdog: UIWatchdog = None):
         self.root = root
         self.db_manager = db_manager
+        self.executor = executor # Semua panggilan DB dijalankan di thread worker
+        self.watchdog = watchdog # Stall event loop dan waktu aksi tombol; None berarti tanpa pengukuran
+        self._aksi_aktif = None # AksiTerukur milik klik tombol yang sedang diproses
+        self._aksi_muat_ulang = None # AksiTerukur Muat Ulang yang menunggu data grid
+        self._beban_bulan = {} # (tahun, bulan) -> {tanggal: jumlah kegiatan}; heat-map kalender
+        self._heatmap_dijadwalkan = False
         self.current_user: Pengguna = None # Akan diisi setelah login
         self.selected_kegiatan_obj_for_update: Kegiatan = None # Menyimpan objek Kegiatan yang dipilih
         
@@ -911,11 +4053,40 @@ class KegiatanApp:
 
         self._setup_styles()
         
-        self.pengguna_obj_map = {} # Map: display_name -> objek Pengguna
-        self.pengguna_id_to_display_map = {} # Map: id_pengguna -> display_name
+        # Pengguna yang dikenal UI; kedua map milik direktori dan diisi ulang di tempat
+        self.direktori_pengguna = DirektoriPengguna(db_manager, executor)
+        self.pengguna_obj_map = self.direktori_pengguna.obj_map # Map: display_name -> objek Pengguna
+        self.pengguna_id_to_display_map = self.direktori_pengguna.id_ke_tampilan # Map: id_pengguna -> display_name
 
+        self._init_state_grid()
         self._build_ui()
 
+    def _init_state_grid(self):
+        """State grid (cache, urutan, mode paged, filter) tanpa widget; dipakai juga oleh benchmark headless."""
+        # Cache grid: sumber kebenaran untuk isi Treeview. iid Treeview = ID_Kegiatan.
+        self.kegiatan_data_cache = {} # Map: id_kegiatan -> objek Kegiatan
+        self._grid_keys = [] # Kunci urutan ascending; Treeview menampilkan urutan kebalikannya
+
+        # Urut kolom & saring cepat di sisi klien (hanya saat seluruh data ada di cache, bukan mode paged)
+        self._kunci_baris = {} # Map: id_kegiatan -> (tuple kunci urut per kolom, teks saring lowercase); dibangun lazy
+        self._indeks_urut = {} # Map: (kolom, descending) -> list id terurut; dibuang saat data berubah
+        self._sort_state = None # (kolom, descending) atau None untuk urutan default
+        self._quick_filter_text = ""
+        self._tunda_tampilan = False # True selama patch massal; tampilan disusun ulang sekali di akhir
+
+        # State mode grid paged (keyset pagination + jendela baris terbatas)
+        self._paged_mode = False
+        self._page_keys = [None] # _page_keys[i] = after_key untuk mengambil halaman ke-i
+        self._page_window = deque() # Berisi tuple (indeks_halaman, [iid baris]) yang sedang ada di Treeview
+        self._page_loading = False
+        self._total_kegiatan = 0
+        self._grid_generation = 0 # Naik setiap refresh; hasil halaman dari generasi lama dibuang
+
+        # Filter pencarian server-side: _filter_pencarian dari form, _filter_grid yang berlaku untuk isi grid
+        self._filter_pencarian = {}
+        self._filter_grid = {}
+        self._search_job = None
+
     def _setup_styles(self):
         style = ttk.Style()
         style.theme_use('clam')
@@ -928,17 +4099,58 @@ class KegiatanApp:
         style.configure("TButton", font=FONT_STYLE, padding=5)
         style.configure("TLabelframe.Label", font=FONT_BOLD, background=BG_COLOR)
 
-    def _styled_button(self, parent, text, command, style_name="TButton"):
+    def _styled_button(self, parent, text, command, style_name="TButton", aksi=None):
+        if aksi is not None and self.watchdog is not None:
+            command = self._ukur_aksi(aksi, command)
         btn = ttk.Button(parent, text=text, command=command, style=style_name)
         return btn
 
+    # --- Pengukuran waktu aksi tombol (klik sampai hasil diterapkan) ---
+    def _ukur_aksi(self, nama, command):
+        """Membungkus command tombol; aksi yang diteruskan ke worker diselesaikan saat hasilnya kembali."""
+        def _aksi_terukur():
+            aksi = self.watchdog.mulai_aksi(nama)
+            self._aksi_aktif = aksi
+            berhasil = False
+            try:
+                command()
+                berhasil = True
+            finally:
+                if self._aksi_aktif is aksi: # Tidak diambil worker: validasi gagal, dibatalkan, atau tanpa DB
+                    self.watchdog.selesai_aksi(aksi, "tanpa_db" if berhasil else "gagal")
+                self._aksi_aktif = None
+        return _aksi_terukur
+
+    def _ambil_aksi_aktif(self):
+        """Mengambil alih aksi tombol yang sedang diukur; pemanggil wajib memanggil selesai_aksi nanti."""
+        aksi, self._aksi_aktif = self._aksi_aktif, None
+        return aksi
+
+    def _aksi_setelah_konfirmasi(self):
+        """Waktu menunggu jawaban dialog konfirmasi pengguna tidak ikut dihitung."""
+        if self._aksi_aktif is not None:
+            self._aksi_aktif.mulai = time.perf_counter()
+
+    def _open_diagnostik_dialog(self, event=None):
+        if self.watchdog is not None:
+            DiagnostikDialog(self.root, self.watchdog, self.db_manager).show()
+
     def _build_ui(self):
         self._create_input_frame()
         self._create_action_buttons()
+        self._create_search_bar()
         self._create_table_frame()
+        self._create_status_bar()
 
         self._load_pengguna_ui() # Memuat data pengguna untuk combobox
         self._tampilkan_semua_kegiatan_ui() # Menampilkan data kegiatan awal
+        self._perbarui_heatmap()
+
+        # Perubahan dari klien lain diterapkan otomatis lewat change feed Log_Perubahan_Kegiatan
+        self.change_feed = ChangeFeedPoller(self.root, self.db_manager, self.executor,
+                                            on_delta=self._terapkan_perubahan_feed,
+                                            on_resync=self._muat_ulang_data)
+        self.change_feed.start()
 
     def _create_input_frame(self):
         input_frame = ttk.LabelFrame(self.root, text="Formulir Kegiatan")
@@ -977,6 +4189,7 @@ class KegiatanApp:
         
         # Tanggal (Kalender)
         ttk.Label(form_fields_frame, text=self.labels_texts_map["tanggal"]).grid(row=current_row_idx, column=col_idx_label, sticky="nw", padx=5, pady=5) # sticky nw
+        Calendar = impor_lazy("tkcalendar").Calendar
         self.cal_tanggal = Calendar(form_fields_frame, selectmode='day', date_pattern='dd-mm-yyyy',
                                     font=FONT_STYLE, showweeknumbers=False, locale='id_ID',
                                     background=BTN_COLOR, foreground='white', bordercolor=BTN_COLOR,
@@ -988,6 +4201,9 @@ class KegiatanApp:
                                     othermonthwebackground='lightgray', othermonthweforeground='darkgray')
         self.cal_tanggal.grid(row=current_row_idx, column=col_idx_widget, sticky="ew", padx=5, pady=5, rowspan=3)
         self.entries["tanggal"] = self.cal_tanggal
+        for tingkat, (latar, teks) in enumerate(KALENDER_WARNA_BEBAN, start=1):
+            self.cal_tanggal.tag_config(f"beban_{tingkat}", background=latar, foreground=teks)
+        self.cal_tanggal.bind("<<CalendarMonthChanged>>", lambda e: self._perbarui_heatmap())
         # self.cal_tanggal.bind("<<CalendarSelected>>", self._on_calendar_selected_debug) # Jika perlu debug
         current_row_idx += 3 # Kalender memakan 3 baris efektif
 
@@ -1006,7 +4222,7 @@ class KegiatanApp:
 
         # Penanggung Jawab (Combobox)
         ttk.Label(form_fields_frame, text=self.labels_texts_map["pj"]).grid(row=current_row_idx, column=col_idx_label, sticky="w", padx=5, pady=5)
-        self.combo_pj = ttk.Combobox(form_fields_frame, state="readonly", width=37, font=FONT_STYLE)
+        self.combo_pj = PenggunaPicker(form_fields_frame, self.direktori_pengguna, width=37, font=FONT_STYLE)
         self.combo_pj.grid(row=current_row_idx, column=col_idx_widget, sticky="ew", padx=5, pady=5)
         self.entries["pj"] = self.combo_pj
         current_row_idx += 1
@@ -1032,29 +4248,129 @@ class KegiatanApp:
         action_buttons_frame = ttk.Frame(target_input_frame) # style="TFrame"
         action_buttons_frame.pack(pady=20)
 
-        self.btn_simpan = self._styled_button(action_buttons_frame, "➕ Tambah", self._tambah_kegiatan)
+        self.btn_simpan = self._styled_button(action_buttons_frame, "➕ Tambah", self._tambah_kegiatan, aksi="Tambah")
         self.btn_simpan.pack(side=tk.LEFT, padx=5)
 
-        self.btn_update = self._styled_button(action_buttons_frame, "✏️ Update", self._update_kegiatan)
+        self.btn_update = self._styled_button(action_buttons_frame, "✏️ Update", self._update_kegiatan, aksi="Update")
         self.btn_update.pack(side=tk.LEFT, padx=5)
         self.btn_update.config(state="disabled")
 
-        self.btn_hapus = self._styled_button(action_buttons_frame, "❌ Hapus", self._hapus_kegiatan)
+        self.btn_hapus = self._styled_button(action_buttons_frame, "❌ Hapus", self._hapus_kegiatan, aksi="Hapus")
         self.btn_hapus.pack(side=tk.LEFT, padx=5)
 
+        self.btn_ubah_massal = self._styled_button(action_buttons_frame, "🗂️ Ubah Massal", self._ubah_massal_kegiatan,
+                                                   aksi="Ubah Massal")
+        self.btn_ubah_massal.pack(side=tk.LEFT, padx=5)
+        self.btn_ubah_massal.config(state="disabled")
+
         self.btn_clear_form = self._styled_button(action_buttons_frame, "🧹 Bersihkan Form", self._clear_form_action)
         self.btn_clear_form.pack(side=tk.LEFT, padx=5)
 
-        self.btn_refresh_data = self._styled_button(action_buttons_frame, "🔄 Muat Ulang Data", self._tampilkan_semua_kegiatan_ui)
+        self.btn_refresh_data = self._styled_button(action_buttons_frame, "🔄 Muat Ulang Data", self._muat_ulang_data,
+                                                    aksi="Muat Ulang")
         self.btn_refresh_data.pack(side=tk.LEFT, padx=5)
 
-        self.btn_activity_log = self._styled_button(action_buttons_frame, "📜 Riwayat Aktivitas", self._open_activity_log_dialog)
+        self.btn_activity_log = self._styled_button(action_buttons_frame, "📜 Riwayat Aktivitas", self._open_activity_log_dialog,
+                                                    aksi="Riwayat")
         self.btn_activity_log.pack(side=tk.LEFT, padx=5)
 
+        self.btn_impor = self._styled_button(action_buttons_frame, "📥 Impor", self._impor_kegiatan)
+        self.btn_impor.pack(side=tk.LEFT, padx=5)
+
+        self.btn_ekspor = self._styled_button(action_buttons_frame, "📤 Ekspor", self._open_export_dialog)
+        self.btn_ekspor.pack(side=tk.LEFT, padx=5)
+
+
+    def _create_search_bar(self):
+        search_frame = ttk.LabelFrame(self.root, text="🔍 Cari & Filter Kegiatan")
+        search_frame.pack(fill='x', padx=15, pady=(0, 5))
+        baris_1 = ttk.Frame(search_frame)
+        baris_1.pack(fill='x', padx=10, pady=(5, 2))
+        baris_2 = ttk.Frame(search_frame)
+        baris_2.pack(fill='x', padx=10, pady=(2, 5))
+
+        ttk.Label(baris_1, text="Nama:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_nama = ttk.Entry(baris_1, font=FONT_STYLE, width=30)
+        self.search_nama.pack(side=tk.LEFT, padx=(0, 5))
+        self.var_fulltext = tk.BooleanVar(value=False)
+        ttk.Checkbutton(baris_1, text="Full-text", variable=self.var_fulltext,
+                        command=lambda: self._jadwalkan_pencarian(0)).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(baris_1, text="Dari (dd-mm-yyyy):").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_dari = ttk.Entry(baris_1, font=FONT_STYLE, width=12)
+        self.search_dari.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(baris_1, text="Sampai:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_sampai = ttk.Entry(baris_1, font=FONT_STYLE, width=12)
+        self.search_sampai.pack(side=tk.LEFT)
+
+        ttk.Label(baris_2, text="Tempat:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_tempat = ttk.Combobox(baris_2, values=["Semua"] + self.tempat_options, state="readonly", width=16, font=FONT_STYLE)
+        self.search_tempat.current(0)
+        self.search_tempat.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(baris_2, text="Jenis:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_jenis = ttk.Entry(baris_2, font=FONT_STYLE, width=14)
+        self.search_jenis.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(baris_2, text="P. Jawab:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_pj = PenggunaPicker(baris_2, self.direktori_pengguna, opsi_tetap=["Semua"], width=24, font=FONT_STYLE)
+        self.search_pj.current(0)
+        self.search_pj.pack(side=tk.LEFT, padx=(0, 10))
+        self._styled_button(baris_2, "✖ Reset Filter", self._reset_pencarian).pack(side=tk.LEFT)
+
+        # Ketikan di-debounce; pilihan combobox langsung diterapkan
+        for entry in (self.search_nama, self.search_dari, self.search_sampai, self.search_jenis):
+            entry.bind("<KeyRelease>", lambda e: self._jadwalkan_pencarian())
+        for combo in (self.search_tempat, self.search_pj):
+            combo.bind("<<ComboboxSelected>>", lambda e: self._jadwalkan_pencarian(0))
+        # P. Jawab bisa diketik: filter diperbarui saat Enter atau fokus pindah (teks tak dikenal = tanpa filter)
+        for sequence in ("<Return>", "<FocusOut>"):
+            self.search_pj.bind(sequence, lambda e: self._jadwalkan_pencarian(0))
+
+    def _jadwalkan_pencarian(self, delay_ms=GRID_SEARCH_DEBOUNCE_MS):
+        if self._search_job:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(delay_ms, self._terapkan_pencarian)
+
+    def _baca_filter_pencarian(self):
+        """Filter dari search bar; tanggal yang belum lengkap/valid diabaikan sampai selesai diketik."""
+        filters = {}
+        nama = self.search_nama.get().strip()
+        if nama:
+            filters["nama"] = nama
+            filters["fulltext"] = self.var_fulltext.get()
+        for kunci, entry in (("tanggal_dari", self.search_dari), ("tanggal_sampai", self.search_sampai)):
+            try:
+                filters[kunci] = datetime.datetime.strptime(entry.get().strip(), "%d-%m-%Y").date()
+            except ValueError:
+                pass
+        if self.search_tempat.get() not in ("", "Semua"):
+            filters["tempat"] = self.search_tempat.get()
+        jenis = self.search_jenis.get().strip()
+        if jenis:
+            filters["jenis"] = jenis
+        pengguna_obj = self.search_pj.pengguna_terpilih() # Teks yang belum dipilih dari daftar tidak memfilter
+        if pengguna_obj:
+            filters["id_pj"] = pengguna_obj.id_entitas
+        return filters
+
+    def _terapkan_pencarian(self):
+        self._search_job = None
+        filters = self._baca_filter_pencarian()
+        if filters == self._filter_pencarian:
+            return # Tombol yang tidak mengubah filter (panah, Shift, ...) tidak memicu query
+        self._filter_pencarian = filters
+        self._tampilkan_semua_kegiatan_ui()
+
+    def _reset_pencarian(self):
+        for entry in (self.search_nama, self.search_dari, self.search_sampai, self.search_jenis):
+            entry.delete(0, tk.END)
+        self.search_tempat.current(0)
+        self.search_pj.current(0)
+        self.var_fulltext.set(False)
+        self._jadwalkan_pencarian(0)
 
     def _create_table_frame(self):
-        tabel_frame = ttk.LabelFrame(self.root, text="📋 Daftar Kegiatan (dari View)")
+        tabel_frame = ttk.LabelFrame(self.root, text=self.TABEL_FRAME_TITLE)
         tabel_frame.pack(fill='both', expand=True, padx=15, pady=10)
+        self.tabel_frame = tabel_frame
 
         columns_info = {
             "id": {"text": "ID Keg.", "width": 80, "anchor": "w"},
@@ -1065,10 +4381,20 @@ class KegiatanApp:
             "pj_nama": {"text": "P. Jawab", "width": 150, "anchor": "w"},
             "pj_id": {"text": "ID PJ", "width": 0, "anchor": "w"} # Kolom tersembunyi
         }
-        self.tree = ttk.Treeview(tabel_frame, columns=list(columns_info.keys()), show="headings")
-
+        quick_frame = ttk.Frame(tabel_frame)
+        quick_frame.pack(side="top", fill="x", pady=(0, 5))
+        ttk.Label(quick_frame, text="⚡ Saring cepat:").pack(side=tk.LEFT, padx=(0, 5))
+        self.quick_filter_entry = ttk.Entry(quick_frame, font=FONT_STYLE, width=30)
+        self.quick_filter_entry.pack(side=tk.LEFT)
+        self.quick_filter_entry.bind("<KeyRelease>", self._on_quick_filter)
+        ttk.Label(quick_frame, text="(klik judul kolom untuk mengurutkan)").pack(side=tk.LEFT, padx=10)
+
+        # Ctrl/Shift+klik memilih banyak baris untuk hapus dan ubah massal
+        self.tree = ttk.Treeview(tabel_frame, columns=list(columns_info.keys()), show="headings", selectmode="extended")
+
+        self._judul_kolom = {col_id: info["text"] for col_id, info in columns_info.items()}
         for col_id, info in columns_info.items():
-            self.tree.heading(col_id, text=info["text"])
+            self.tree.heading(col_id, text=info["text"], command=lambda c=col_id: self._on_heading_click(c))
             self.tree.column(col_id, anchor=info["anchor"], width=info["width"],
                              minwidth=info["width"] if info["width"] > 50 else 50,
                              stretch=tk.NO if info["width"] == 0 else tk.YES)
@@ -1077,9 +4403,36 @@ class KegiatanApp:
         self.tree.pack(side="left", fill="both", expand=True)
         self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
 
-        scrollbar = ttk.Scrollbar(tabel_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.tree_scrollbar = ttk.Scrollbar(tabel_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=self._on_tree_yscroll) # Dibungkus agar bisa memicu pemuatan halaman
+        self.tree_scrollbar.pack(side=tk.RIGHT, fill="y")
+
+    def _create_status_bar(self):
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(fill='x', side=tk.BOTTOM, padx=15, pady=(0, 5))
+        if self.watchdog is not None:
+            ttk.Button(status_frame, text="🩺 Diagnostik (F12)", command=self._open_diagnostik_dialog).pack(side=tk.RIGHT)
+            self.root.bind("<F12>", self._open_diagnostik_dialog)
+        self.status_label = ttk.Label(status_frame, text="Siap", anchor="w")
+        self.status_label.pack(fill='x', side=tk.LEFT, expand=True)
+        self.executor.add_busy_listener(self._on_executor_busy)
+
+    def _on_executor_busy(self, busy):
+        """Indikator sibuk global: kursor jam pasir dan teks status selama ada tugas DB berjalan."""
+        self.root.config(cursor="watch" if busy else "")
+        self.status_label.config(text="⏳ Memproses permintaan database..." if busy else "Siap")
+
+    def _on_tree_yscroll(self, first, last):
+        """Meneruskan posisi scroll ke scrollbar dan memuat halaman baru saat mendekati ujung (mode paged)."""
+        self.tree_scrollbar.set(first, last)
+        if not self._paged_mode or self._page_loading or not self._page_window:
+            return
+        if float(last) >= 1.0 - GRID_PREFETCH_FRACTION and self._page_window[-1][0] + 1 < len(self._page_keys):
+            self._page_loading = True
+            self.root.after_idle(self._muat_halaman_berikut)
+        elif float(first) <= GRID_PREFETCH_FRACTION and self._page_window[0][0] > 0:
+            self._page_loading = True
+            self.root.after_idle(self._muat_halaman_sebelum)
 
     def _clear_form_fields(self):
         self.entries["id_kegiatan"].config(state="normal")
@@ -1097,15 +4450,25 @@ class KegiatanApp:
         self.btn_simpan.config(state="normal")
         self.btn_update.config(state="disabled")
         if self.tree.selection():
-            self.tree.selection_remove(self.tree.selection()[0])
+            self.tree.selection_remove(*self.tree.selection())
 
     def _on_tree_select(self, event=None):
         selected_items = self.tree.selection()
+        self.btn_ubah_massal.config(state="normal" if selected_items else "disabled")
         if not selected_items:
             self._clear_form_action()
             return
+        if len(selected_items) > 1:
+            # Banyak baris: formulir tidak mewakili satu kegiatan, hanya aksi massal yang tersedia
+            self._clear_form_fields()
+            self.selected_kegiatan_obj_for_update = None
+            self.entries["id_kegiatan"].config(state="normal")
+            self.btn_simpan.config(state="disabled")
+            self.btn_update.config(state="disabled")
+            self.status_label.config(text=f"{len(selected_items)} kegiatan dipilih — gunakan Hapus atau Ubah Massal")
+            return
 
-        item_id = selected_items[0] # ID internal treeview, bukan ID kegiatan
+        item_id = selected_items[0] # iid Treeview = ID_Kegiatan
         item_values = self.tree.item(item_id, "values")
 
         if not item_values or len(item_values) < 7:
@@ -1115,27 +4478,28 @@ class KegiatanApp:
 
         self._clear_form_fields()
 
-        id_keg_val, nama_keg_val, tgl_val, tempat_val, jenis_val, _, pj_id_val_hidden = item_values
+        id_keg_val, nama_keg_val, tgl_val, tempat_val, jenis_val, nama_pj_val, pj_id_val_hidden = item_values
         
         # Cari objek Kegiatan yang sesuai dari data yang sudah dimuat
         # Ini asumsi bahwa ID kegiatan (id_keg_val) unik dan ada di self.kegiatan_data_cache
         # Jika tidak ada cache, Anda perlu query lagi ke DB atau simpan objek saat memuat tree
-        self.selected_kegiatan_obj_for_update = Kegiatan(id_keg_val, nama_keg_val, tgl_val, tempat_val, jenis_val, int(pj_id_val_hidden) if pj_id_val_hidden and pj_id_val_hidden != 'None' else None)
+        date_obj = None
+        try:
+            if tgl_val:
+                date_obj = datetime.datetime.strptime(tgl_val, "%d-%m-%Y").date() # Tree menampilkan dd-mm-yyyy
+        except ValueError:
+            print(f"Format tanggal salah dari tree: {tgl_val}")
+
+        # Objek dari cache grid; fallback ke nilai baris jika belum ada di cache
+        self.selected_kegiatan_obj_for_update = self.kegiatan_data_cache.get(item_id) or Kegiatan(id_keg_val, nama_keg_val, date_obj, tempat_val, jenis_val, int(pj_id_val_hidden) if pj_id_val_hidden and pj_id_val_hidden != 'None' else None)
 
 
         self.entries["id_kegiatan"].insert(0, id_keg_val)
         self.entries["id_kegiatan"].config(state="readonly")
         self.entries["nama_kegiatan"].insert(0, nama_keg_val)
 
-        try:
-            if tgl_val:
-                date_obj = datetime.datetime.strptime(tgl_val, "%d-%m-%Y").date()
-                self.cal_tanggal.selection_set(date_obj)
-            else: # Jika tgl_val kosong atau None
-                self.cal_tanggal.selection_set(datetime.date.today())
-        except ValueError:
-            print(f"Format tanggal salah dari tree: {tgl_val}")
-            self.cal_tanggal.selection_set(datetime.date.today()) # Default ke hari ini
+        # Jika tanggal kosong atau tidak valid, default ke hari ini
+        self.cal_tanggal.selection_set(date_obj if date_obj else datetime.date.today())
 
         if tempat_val in self.tempat_options:
             self.combo_tempat.set(tempat_val)
@@ -1147,6 +4511,9 @@ class KegiatanApp:
         if pj_id_val_hidden and pj_id_val_hidden != 'None' and pj_id_val_hidden.strip():
             try:
                 pj_id_int = int(pj_id_val_hidden)
+                if pj_id_int not in self.pengguna_id_to_display_map and nama_pj_val and self.direktori_pengguna.mode_server:
+                    # Direktori besar tidak dimuat penuh; PJ dari baris grid didaftarkan agar bisa dipilih
+                    self.direktori_pengguna.daftarkan([Pengguna(pj_id_int, nama_pj_val)])
                 pj_display_text = self.pengguna_id_to_display_map.get(pj_id_int)
                 if pj_display_text:
                     self.combo_pj.set(pj_display_text)
@@ -1162,18 +4529,15 @@ class KegiatanApp:
         self.btn_update.config(state="normal")
 
     def _load_pengguna_ui(self):
-        try:
-            pengguna_list_obj = self.db_manager.get_semua_pengguna_obj_db() # Dapat list objek Pengguna
-            if pengguna_list_obj:
-                self.pengguna_obj_map = {p_obj.get_display_name(): p_obj for p_obj in pengguna_list_obj}
-                self.pengguna_id_to_display_map = {p_obj.id_entitas: p_obj.get_display_name() for p_obj in pengguna_list_obj}
-                self.combo_pj["values"] = list(self.pengguna_obj_map.keys())
-            else:
-                self.combo_pj["values"] = []
-                self.pengguna_obj_map = {}
-                self.pengguna_id_to_display_map = {}
-        except mysql.connector.Error as err:
-            messagebox.showerror("Error Database", f"Gagal memuat data pengguna: {err}", parent=self.root)
+        self.executor.submit(self.direktori_pengguna.ambil, # Indeks prefix dibangun di worker
+                             on_success=self._on_pengguna_loaded,
+                             on_error=lambda err: messagebox.showerror("Error Database", f"Gagal memuat data pengguna: {err}", parent=self.root),
+                             supersede_key="pengguna")
+
+    def _on_pengguna_loaded(self, hasil):
+        self.direktori_pengguna.terapkan(hasil)
+        for picker in (self.combo_pj, self.search_pj):
+            picker.segarkan()
 
 
     def _get_form_data_as_kegiatan_object(self, for_update=False):
@@ -1183,57 +4547,71 @@ class KegiatanApp:
             id_keg = self.selected_kegiatan_obj_for_update.id_entitas # Gunakan ID dari objek yang dipilih untuk update
 
         nama = self.entries["nama_kegiatan"].get().strip()
-        
-        tanggal_obj_from_cal = self.cal_tanggal.get_date() # Ini adalah objek datetime.date
-        tanggal_str = ""
-        if isinstance(tanggal_obj_from_cal, datetime.date):
-            tanggal_str = tanggal_obj_from_cal.strftime("%d-%m-%Y")
-        elif isinstance(tanggal_obj_from_cal, str) and tanggal_obj_from_cal: # Jika get_date() mengembalikan string
-             try:
-                parsed_date = datetime.datetime.strptime(tanggal_obj_from_cal, "%d-%m-%Y").date()
-                tanggal_str = parsed_date.strftime("%d-%m-%Y")
-             except ValueError:
-                messagebox.showerror("Error Tanggal", f"Format tanggal dari kalender ('{tanggal_obj_from_cal}') tidak valid.", parent=self.root)
-                return None # Indikasi error
-        else: # tanggal_obj_from_cal adalah None atau tipe tidak dikenal
-            messagebox.showwarning("Validasi Gagal", "Tanggal harus dipilih.", parent=self.root)
-            return None # Indikasi error
-
-
+        tanggal_obj_from_cal = self.cal_tanggal.get_date() # datetime.date, atau string dd-mm-yyyy
         tempat = self.combo_tempat.get().strip()
         jenis = self.entries["jenis_kegiatan"].get().strip()
-        pj_display_name = self.combo_pj.get()
-
-        if not all([id_keg, nama, tanggal_str, tempat, jenis, pj_display_name]):
-            messagebox.showwarning("⚠️ Validasi Gagal", "Semua kolom formulir harus diisi.", parent=self.root)
+        pj_display_name = self.combo_pj.get().strip()
+
+        id_pj = None
+        if pj_display_name:
+            selected_pengguna_obj = self.combo_pj.pengguna_terpilih()
+            if not selected_pengguna_obj:
+                messagebox.showwarning("⚠️ Validasi Gagal", "Pilih penanggung jawab dari daftar hasil pencarian.",
+                                       parent=self.root)
+                return None
+            id_pj = selected_pengguna_obj.id_entitas
+
+        # Aturan validasi yang sama dipakai oleh importer massal (KegiatanImporter)
+        try:
+            return Kegiatan.dari_input(id_keg, nama, tanggal_obj_from_cal, tempat, jenis, id_pj)
+        except ValueError as e:
+            messagebox.showwarning("⚠️ Validasi Gagal", str(e), parent=self.root)
             return None
 
-        selected_pengguna_obj = self.pengguna_obj_map.get(pj_display_name)
-        if not selected_pengguna_obj:
-            messagebox.showerror("Error Internal", "Penanggung jawab tidak valid.", parent=self.root)
-            return None
-        id_pj = selected_pengguna_obj.id_entitas
 
-        return Kegiatan(id_keg, nama, tanggal_str, tempat, jenis, id_pj)
+    def _run_db_action(self, button, fn, *args, on_success, on_error, channel="db"):
+        """Menjalankan aksi DB di worker; tombol aksi dinonaktifkan sampai hasilnya kembali."""
+        previous_state = str(button.cget("state"))
+        button.config(state="disabled")
+        aksi_terukur = self._ambil_aksi_aktif()
 
+        def _done(callback, value, status):
+            button.config(state=previous_state)
+            if aksi_terukur is not None:
+                # Diselesaikan sebelum callback: pesan sukses/gagal menunggu klik pengguna
+                self.watchdog.selesai_aksi(aksi_terukur, status)
+            callback(value)
+        self.executor.submit(fn, *args,
+                             on_success=lambda hasil: _done(on_success, hasil, "ok"),
+                             on_error=lambda err: _done(on_error, err, "gagal"),
+                             channel=channel, aksi=f"tombol:{button.cget('text')}")
 
     def _tambah_kegiatan(self):
         kegiatan_baru = self._get_form_data_as_kegiatan_object()
         if not kegiatan_baru:
             return # Validasi gagal atau error saat ambil data form
 
-        try:
-            self.db_manager.tambah_kegiatan_obj_db(kegiatan_baru)
+        def on_success(_):
+            self._invalidasi_beban(kegiatan_baru.tanggal)
             messagebox.showinfo("✅ Sukses", f"Kegiatan '{kegiatan_baru.nama_kegiatan}' berhasil ditambahkan.", parent=self.root)
-            self._tampilkan_semua_kegiatan_ui()
+
+            def patch():
+                kegiatan_baru.nama_pj = self._nama_pj_untuk(kegiatan_baru.id_penanggung_jawab)
+                self._grid_upsert_kegiatan(kegiatan_baru)
+                self._ubah_total_kegiatan(self._total_kegiatan + 1)
+            self._terapkan_perubahan_lokal(patch)
             self._clear_form_action()
-        except mysql.connector.Error as db_err:
-            if db_err.errno == 1062 or (hasattr(db_err, 'msg') and 'ID Kegiatan sudah ada.' in db_err.msg) :
+
+        def on_error(db_err):
+            if not isinstance(db_err, mysql.connector.Error):
+                messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga: {db_err}", parent=self.root)
+            elif db_err.errno == 1062 or (hasattr(db_err, 'msg') and 'ID Kegiatan sudah ada.' in db_err.msg) :
                  messagebox.showerror("❌ Error Duplikasi", f"ID Kegiatan '{kegiatan_baru.id_entitas}' sudah terdaftar atau ada error SP terkait duplikasi.", parent=self.root)
             else:
                  messagebox.showerror("❌ Error Database", f"Gagal menambah kegiatan: {db_err}", parent=self.root)
-        except Exception as e:
-            messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga: {e}", parent=self.root)
+
+        self._run_db_action(self.btn_simpan, self.db_manager.tambah_kegiatan_obj_db, kegiatan_baru,
+                            on_success=on_success, on_error=on_error)
 
 
     def _update_kegiatan(self):
@@ -1244,99 +4622,837 @@ class KegiatanApp:
         kegiatan_update = self._get_form_data_as_kegiatan_object(for_update=True)
         if not kegiatan_update:
             return # Validasi gagal
+        tanggal_lama = self.selected_kegiatan_obj_for_update.tanggal
 
-        try:
-            self.db_manager.update_kegiatan_obj_db(kegiatan_update)
+        def on_success(_):
+            self._invalidasi_beban(tanggal_lama, kegiatan_update.tanggal)
             messagebox.showinfo("✅ Sukses", f"Kegiatan (ID: {kegiatan_update.id_entitas}) berhasil diperbarui.", parent=self.root)
-            self._tampilkan_semua_kegiatan_ui()
+            kegiatan_update.nama_pj = self._nama_pj_untuk(kegiatan_update.id_penanggung_jawab)
+            self._terapkan_perubahan_lokal(lambda: self._grid_upsert_kegiatan(kegiatan_update))
             self._clear_form_action()
-        except mysql.connector.Error as db_err:
-             messagebox.showerror("❌ Error Database", f"Gagal memperbarui kegiatan: {db_err}", parent=self.root)
-        except Exception as e:
-            messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga saat update: {e}", parent=self.root)
+
+        def on_error(db_err):
+            if isinstance(db_err, mysql.connector.Error):
+                 messagebox.showerror("❌ Error Database", f"Gagal memperbarui kegiatan: {db_err}", parent=self.root)
+            else:
+                messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga saat update: {db_err}", parent=self.root)
+
+        self._run_db_action(self.btn_update, self.db_manager.update_kegiatan_obj_db, kegiatan_update,
+                            on_success=on_success, on_error=on_error)
 
     def _hapus_kegiatan(self):
         selected_items = self.tree.selection()
         if not selected_items:
-            messagebox.showwarning("⚠️ Peringatan", "Pilih satu kegiatan yang ingin dihapus.", parent=self.root)
+            messagebox.showwarning("⚠️ Peringatan", "Pilih kegiatan yang ingin dihapus.", parent=self.root)
             return
-        if len(selected_items) > 1: # Seharusnya tidak terjadi karena treeview single select
-            messagebox.showwarning("⚠️ Peringatan", "Hanya bisa menghapus satu kegiatan dalam satu waktu.", parent=self.root)
+        if len(selected_items) > 1:
+            self._hapus_kegiatan_massal(list(selected_items))
             return
 
-        id_keg_to_delete = self.tree.item(selected_items[0], "values")[0]
-        nama_keg_to_delete = self.tree.item(selected_items[0], "values")[1]
+        id_keg_to_delete = selected_items[0] # iid Treeview = ID_Kegiatan
+        nama_keg_to_delete = self.kegiatan_data_cache[id_keg_to_delete].nama_kegiatan
+        tanggal_dihapus = self.kegiatan_data_cache[id_keg_to_delete].tanggal
 
 
         if not messagebox.askyesno("❓ Konfirmasi Hapus", f"Anda yakin ingin menghapus kegiatan '{nama_keg_to_delete}' (ID: {id_keg_to_delete})?", parent=self.root):
             return
+        self._aksi_setelah_konfirmasi()
 
-        try:
-            self.db_manager.hapus_kegiatan_db(id_keg_to_delete)
+        def on_success(_):
+            self._invalidasi_beban(tanggal_dihapus)
             messagebox.showinfo("🗑️ Sukses", f"Kegiatan ID: {id_keg_to_delete} berhasil dihapus.", parent=self.root)
-            self._tampilkan_semua_kegiatan_ui()
             self._clear_form_action()
-        except mysql.connector.Error as err:
+
+            def patch():
+                self._grid_hapus_kegiatan(id_keg_to_delete)
+                self._ubah_total_kegiatan(self._total_kegiatan - 1)
+            self._terapkan_perubahan_lokal(patch)
+
+        def on_error(err):
             messagebox.showerror("❌ Error Database", f"Gagal menghapus ID {id_keg_to_delete}: {err}", parent=self.root)
 
+        self._run_db_action(self.btn_hapus, self.db_manager.hapus_kegiatan_db, id_keg_to_delete,
+                            on_success=on_success, on_error=on_error)
+
+
+    def _hapus_kegiatan_massal(self, id_list):
+        if not messagebox.askyesno("❓ Konfirmasi Hapus", f"Anda yakin ingin menghapus {len(id_list)} kegiatan terpilih?\n"
+                                   "Semua dihapus dalam satu transaksi.", parent=self.root):
+            return
+        self._aksi_setelah_konfirmasi()
+        tanggal_dihapus = [self.kegiatan_data_cache[i].tanggal for i in id_list if i in self.kegiatan_data_cache]
+
+        def on_success(jumlah):
+            self._invalidasi_beban(*tanggal_dihapus, semua=len(tanggal_dihapus) < len(id_list))
+            messagebox.showinfo("🗑️ Sukses", f"{jumlah} kegiatan berhasil dihapus.", parent=self.root)
+            self._clear_form_action()
+
+            def patch():
+                with self._tampilan_ditunda():
+                    for id_keg in id_list:
+                        self._grid_hapus_kegiatan(id_keg)
+                self._ubah_total_kegiatan(self._total_kegiatan - jumlah)
+            self._terapkan_perubahan_lokal(patch)
+
+        def on_error(err):
+            messagebox.showerror("❌ Error Database", f"Gagal menghapus {len(id_list)} kegiatan (tidak ada yang dihapus): {err}", parent=self.root)
+
+        self._run_db_action(self.btn_hapus, self.db_manager.hapus_kegiatan_massal_db, id_list,
+                            on_success=on_success, on_error=on_error)
+
+    def _ubah_massal_kegiatan(self):
+        id_list = [iid for iid in self.tree.selection() if iid in self.kegiatan_data_cache]
+        if not id_list:
+            messagebox.showwarning("⚠️ Peringatan", "Pilih kegiatan yang ingin diubah.", parent=self.root)
+            return
+        perubahan = UbahMassalDialog(self.root, len(id_list), self.tempat_options, self.direktori_pengguna).show()
+        if not perubahan:
+            return
+        self._aksi_setelah_konfirmasi()
+
+        def on_success(jumlah):
+            messagebox.showinfo("✅ Sukses", f"{len(id_list)} kegiatan diproses, {jumlah} berubah.", parent=self.root)
+            self._clear_form_action()
+
+            def patch():
+                with self._tampilan_ditunda():
+                    for id_keg in id_list:
+                        lama = self.kegiatan_data_cache.get(id_keg)
+                        if lama is None:
+                            continue # Sudah dihapus oleh change feed sementara transaksi berjalan
+                        id_pj = perubahan.get("id_pj", lama.id_penanggung_jawab)
+                        nama_pj = self._nama_pj_untuk(id_pj) if "id_pj" in perubahan else lama.nama_pj
+                        self._grid_upsert_kegiatan(Kegiatan(lama.id_entitas, lama.nama_kegiatan, lama.tanggal,
+                                                            perubahan.get("tempat", lama.tempat),
+                                                            perubahan.get("jenis", lama.jenis_kegiatan), id_pj, nama_pj))
+            self._terapkan_perubahan_lokal(patch)
+
+        def on_error(err):
+            messagebox.showerror("❌ Error Database", f"Gagal mengubah {len(id_list)} kegiatan (tidak ada yang diubah): {err}", parent=self.root)
+
+        self._run_db_action(self.btn_ubah_massal, self.db_manager.update_kegiatan_massal_db, id_list, perubahan,
+                            on_success=on_success, on_error=on_error)
 
     def _tampilkan_semua_kegiatan_ui(self):
+        # Klik Muat Ulang berulang membatalkan refresh sebelumnya; halaman dari generasi lama diabaikan
+        aksi_terukur = self._ambil_aksi_aktif()
+        if aksi_terukur is not None:
+            self._selesaikan_aksi_muat_ulang("dibatalkan")
+            self._aksi_muat_ulang = aksi_terukur
+        self._grid_generation += 1
+        self._page_loading = True # Tahan pemuatan halaman selama refresh berjalan
+        self.executor.submit(self._ambil_data_grid, dict(self._filter_pencarian), on_success=self._on_data_grid_loaded,
+                             on_error=self._on_data_grid_error, supersede_key="grid_refresh")
+
+    def _ambil_data_grid(self, filters):
+        """Dijalankan di thread worker: hitung dulu (murah) untuk memilih mode, tabel besar dimuat per halaman."""
+        # ID_Log terakhir dibaca sebelum data, sehingga change feed tidak melewatkan perubahan selama refresh
+        _, log_max_id = self.db_manager.get_log_bounds_db()
+        total = self.db_manager.count_kegiatan_db(filters)
+        if total > GRID_PAGED_THRESHOLD:
+            return log_max_id, total, None, self.db_manager.get_kegiatan_page_db(None, GRID_PAGE_SIZE, filters), filters
+        # get_semua_kegiatan_obj_db mengembalikan list objek Kegiatan (nama_pj sudah terisi dari view)
+        return log_max_id, total, self.db_manager.get_semua_kegiatan_obj_db(filters), None, filters
+
+    def _selesaikan_aksi_muat_ulang(self, status):
+        if self._aksi_muat_ulang is not None:
+            self.watchdog.selesai_aksi(self._aksi_muat_ulang, status)
+            self._aksi_muat_ulang = None
+
+    def _on_data_grid_loaded(self, hasil):
+        try:
+            self._terapkan_data_grid(hasil)
+        finally:
+            self._selesaikan_aksi_muat_ulang("ok") # Setelah grid diperbarui, termasuk diff Treeview
+
+    def _terapkan_data_grid(self, hasil):
+        log_max_id, total, kegiatan_data_list, first_page, filters = hasil
+        self._filter_grid = filters
+        if hasattr(self, "change_feed"):
+            self.change_feed.reset_baseline(log_max_id or 0)
+        was_paged = self._paged_mode
+        self._total_kegiatan = total
+        self._update_total_label()
+        self._page_loading = False
+        if first_page is not None:
+            self._clear_grid()
+            self._mulai_mode_paged(first_page)
+            return
+        self._paged_mode = False
+        if was_paged:
+            self._clear_grid() # Isi mode paged tidak sebanding dengan data penuh, mulai dari kosong
+        self._terapkan_diff_grid(kegiatan_data_list or [])
+
+    def _on_data_grid_error(self, err):
+        self._page_loading = False
+        self._selesaikan_aksi_muat_ulang("gagal")
+        messagebox.showerror("Error Database", f"Gagal memuat daftar kegiatan: {err}", parent=self.root)
+
+    def _update_total_label(self):
+        mode_text = f", mode paged {GRID_PAGE_SIZE}/halaman" if self._total_kegiatan > GRID_PAGED_THRESHOLD else ""
+        jumlah_text = (f"{self._total_kegiatan} hasil pencarian" if self._filter_grid
+                       else f"total {self._total_kegiatan} kegiatan")
+        self.tabel_frame.config(text=f"{self.TABEL_FRAME_TITLE} — {jumlah_text}{mode_text}")
+
+    # --- Pemeliharaan Treeview secara inkremental ---
+    def _grid_sort_key(self, keg_obj):
+        """Kunci urutan ascending; Treeview menampilkan kebalikannya (Tanggal DESC, ID DESC, tanpa tanggal di akhir)."""
+        tanggal = keg_obj.tanggal if isinstance(keg_obj.tanggal, datetime.date) else None
+        return (tanggal is not None, tanggal or datetime.date.min, str(keg_obj.id_entitas))
+
+    def _grid_index_for_key(self, key):
+        """Indeks Treeview tempat baris dengan kunci ini seharusnya berada (kunci belum ada di _grid_keys)."""
+        return len(self._grid_keys) - bisect.bisect_left(self._grid_keys, key)
+
+    def _grid_keys_remove(self, key):
+        pos = bisect.bisect_left(self._grid_keys, key)
+        if pos < len(self._grid_keys) and self._grid_keys[pos] == key:
+            del self._grid_keys[pos]
+
+    def _clear_grid(self):
         for row in self.tree.get_children():
             self.tree.delete(row)
+        self.kegiatan_data_cache = {}
+        self._grid_keys = []
+        self._kunci_baris = {}
+        self._indeks_urut = {}
+        self._page_window.clear()
+
+    def _terapkan_diff_grid(self, kegiatan_data_list):
+        """Menyamakan Treeview dengan data baru; hanya baris yang berubah, baru, hilang, atau pindah yang disentuh."""
+        if self._tampilan_kustom_aktif():
+            self.tree.set_children("", *self._urutan_default()) # Diff dihitung terhadap urutan default
+        items = sorted(kegiatan_data_list, key=self._grid_sort_key, reverse=True)
+        new_ids = {keg_obj.id_entitas for keg_obj in items}
+        for id_keg in [i for i in self.kegiatan_data_cache if i not in new_ids]:
+            self._grid_remove_row(id_keg)
+
+        current = list(self.tree.get_children())
+        ada_perubahan = False
+        for idx, keg_obj in enumerate(items):
+            id_keg = keg_obj.id_entitas
+            display_values = keg_obj.to_tuple_for_display()
+            old_obj = self.kegiatan_data_cache.get(id_keg)
+            if old_obj is None:
+                self.tree.insert("", idx, iid=id_keg, values=display_values)
+                current.insert(idx, id_keg)
+                self._kunci_baris.pop(id_keg, None)
+                ada_perubahan = True
+            else:
+                if old_obj.to_tuple_for_display() != display_values:
+                    self.tree.item(id_keg, values=display_values)
+                    # Tuple tampilan memuat semua kolom, jadi baris yang tuple-nya sama mempertahankan kuncinya
+                    self._kunci_baris.pop(id_keg, None)
+                    ada_perubahan = True
+                if current[idx] != id_keg:
+                    current.remove(id_keg)
+                    current.insert(idx, id_keg)
+                    self.tree.detach(id_keg) # Lepas dulu agar indeks move dihitung tanpa baris ini
+                    self.tree.move(id_keg, "", idx)
+            self.kegiatan_data_cache[id_keg] = keg_obj
+        if ada_perubahan:
+            self._indeks_urut.clear() # Baris yang hilang sudah membuangnya lewat _grid_remove_row
+        self._grid_keys = sorted(self._grid_sort_key(keg_obj) for keg_obj in items)
+        self._terapkan_tampilan()
+
+    def _insert_kegiatan_rows(self, kegiatan_data_list, position):
+        """Memasukkan baris ke Treeview mulai dari posisi tertentu dan mengembalikan iid-nya."""
+        iids = []
+        insert_index = position
+        for keg_obj in kegiatan_data_list:
+            id_keg = keg_obj.id_entitas
+            if id_keg in self.kegiatan_data_cache:
+                continue # Baris sudah tampil (misalnya baru saja ditambahkan secara inkremental)
+            self.kegiatan_data_cache[id_keg] = keg_obj # Cache objeknya
+            self._tandai_baris_berubah(id_keg)
+            bisect.insort(self._grid_keys, self._grid_sort_key(keg_obj))
+
+            display_values = keg_obj.to_tuple_for_display()
+            iids.append(self.tree.insert("", insert_index, iid=id_keg, values=display_values))
+            if insert_index != "end":
+                insert_index += 1
+        return iids
+
+    def _grid_remove_row(self, id_keg):
+        keg_obj = self.kegiatan_data_cache.pop(id_keg, None)
+        self._tandai_baris_berubah(id_keg)
+        if keg_obj is not None:
+            self._grid_keys_remove(self._grid_sort_key(keg_obj))
+        if self.tree.exists(id_keg):
+            self.tree.delete(id_keg)
+
+    def _remove_page_rows(self, iids):
+        for iid in iids:
+            self._grid_remove_row(iid)
+
+    def _key_in_page_window(self, key):
+        """Apakah kunci berada dalam rentang halaman yang sedang dimuat (mode paged)."""
+        if not self._page_window:
+            return True
+        at_first_page = self._page_window[0][0] == 0
+        at_last_page = self._page_window[-1][0] + 1 >= len(self._page_keys)
+        above_min = at_last_page or (self._grid_keys and key >= self._grid_keys[0])
+        below_max = at_first_page or (self._grid_keys and key <= self._grid_keys[-1])
+        return bool(above_min and below_max)
+
+    def _grid_upsert_kegiatan(self, keg_obj):
+        """Menambah atau memperbarui satu baris di posisi urut yang benar tanpa memuat ulang grid."""
+        id_keg = keg_obj.id_entitas
+        new_key = self._grid_sort_key(keg_obj)
+        display_values = keg_obj.to_tuple_for_display()
+        old_obj = self.kegiatan_data_cache.get(id_keg)
+        if self._tampilan_kustom_aktif():
+            # Posisi ditentukan ulang oleh _terapkan_tampilan, indeks default tidak berlaku
+            if old_obj is not None:
+                self._grid_keys_remove(self._grid_sort_key(old_obj))
+                self.tree.item(id_keg, values=display_values)
+            else:
+                self.tree.insert("", "end", iid=id_keg, values=display_values)
+            bisect.insort(self._grid_keys, new_key)
+            self.kegiatan_data_cache[id_keg] = keg_obj
+            self._tandai_baris_berubah(id_keg)
+            self._terapkan_tampilan()
+            return
+        if old_obj is not None:
+            old_key = self._grid_sort_key(old_obj)
+            if old_key != new_key:
+                self._grid_keys_remove(old_key)
+                index = self._grid_index_for_key(new_key)
+                bisect.insort(self._grid_keys, new_key)
+                self.tree.detach(id_keg)
+                self.tree.move(id_keg, "", index)
+            self.tree.item(id_keg, values=display_values)
+        else:
+            if self._paged_mode and not self._key_in_page_window(new_key):
+                return # Berada di luar jendela halaman; akan muncul saat halamannya dimuat
+            index = self._grid_index_for_key(new_key)
+            bisect.insort(self._grid_keys, new_key)
+            self.tree.insert("", index, iid=id_keg, values=display_values)
+            if self._paged_mode:
+                self._tambah_ke_halaman(id_keg, index)
+        self.kegiatan_data_cache[id_keg] = keg_obj
+        self._tandai_baris_berubah(id_keg)
+
+    def _tambah_ke_halaman(self, id_keg, index):
+        """Mencatat baris baru di halaman tetangganya agar ikut dibuang saat halaman itu keluar jendela."""
+        children = self.tree.get_children()
+        neighbor = children[index - 1] if index > 0 else (children[1] if len(children) > 1 else None)
+        for _, iids in self._page_window:
+            if neighbor is None or neighbor in iids:
+                iids.append(id_keg)
+                return
+
+    def _grid_hapus_kegiatan(self, id_keg):
+        """Menghapus satu baris dari grid dan cache (juga dari daftar halaman di mode paged)."""
+        self._grid_remove_row(id_keg)
+        for _, iids in self._page_window:
+            if id_keg in iids:
+                iids.remove(id_keg)
+                break
+
+    # --- Urut kolom & saring cepat di sisi klien ---
+    def _tampilan_kustom_aktif(self):
+        return self._sort_state is not None or bool(self._quick_filter_text)
+
+    def _tandai_baris_berubah(self, id_keg):
+        """Membuang kunci urut baris ini dan indeks urut kolom; keduanya dibangun ulang saat dibutuhkan."""
+        self._kunci_baris.pop(id_keg, None)
+        self._indeks_urut.clear()
+
+    def _urutan_default(self):
+        """ID dalam urutan default grid (Tanggal DESC, ID DESC); kunci _grid_keys memuat ID di elemen terakhir."""
+        return [key[2] for key in reversed(self._grid_keys)]
+
+    def _kunci_untuk(self, id_keg):
+        """Kunci urut per kolom (tanggal ter-parse, teks lowercase) dan teks saring, dihitung sekali per baris."""
+        entry = self._kunci_baris.get(id_keg)
+        if entry is None:
+            keg_obj = self.kegiatan_data_cache[id_keg]
+            nama_pj = keg_obj.nama_pj or ""
+            tanggal = keg_obj.tanggal if isinstance(keg_obj.tanggal, datetime.date) else None
+            kunci = {
+                "id": str(id_keg).casefold(),
+                "nama": (keg_obj.nama_kegiatan or "").casefold(),
+                "tanggal": (tanggal is not None, tanggal or datetime.date.min),
+                "tempat": (keg_obj.tempat or "").casefold(),
+                "jenis": (keg_obj.jenis_kegiatan or "").casefold(),
+                "pj_nama": nama_pj.casefold(),
+                "pj_id": keg_obj.id_penanggung_jawab if keg_obj.id_penanggung_jawab is not None else -1,
+            }
+            teks = "\x1f".join(str(v) for v in keg_obj.to_tuple_for_display()).casefold()
+            entry = (kunci, teks)
+            self._kunci_baris[id_keg] = entry
+        return entry
+
+    def _ids_terurut(self):
+        """ID sesuai urutan aktif; indeks per (kolom, arah) di-cache sampai data berubah."""
+        default_order = self._urutan_default()
+        if self._sort_state is None:
+            return default_order
+        ids = self._indeks_urut.get(self._sort_state)
+        if ids is None:
+            kolom, descending = self._sort_state
+            # sorted() stabil, juga dengan reverse=True: baris dengan kunci sama tetap dalam urutan default
+            ids = sorted(default_order, key=lambda i: self._kunci_untuk(i)[0][kolom], reverse=descending)
+            self._indeks_urut[self._sort_state] = ids
+        return ids
+
+    @contextlib.contextmanager
+    def _tampilan_ditunda(self):
+        """Menunda _terapkan_tampilan selama banyak baris di-patch, lalu menerapkannya sekali."""
+        self._tunda_tampilan = True
         try:
-            # get_semua_kegiatan_obj_db mengembalikan list dict {'objek':Kegiatan, 'nama_pj':str}
-            kegiatan_data_list = self.db_manager.get_semua_kegiatan_obj_db()
-            if kegiatan_data_list:
-                self.kegiatan_data_cache = {} # Untuk menyimpan objek kegiatan jika perlu diakses nanti
-                for data_item in kegiatan_data_list:
-                    keg_obj = data_item['objek']
-                    nama_pj = data_item['nama_pj']
-                    self.kegiatan_data_cache[keg_obj.id_entitas] = keg_obj # Cache objeknya
-                    
-                    # Pastikan tanggal adalah string yang diformat
-                    tanggal_display = keg_obj.tanggal
-                    if isinstance(keg_obj.tanggal, datetime.date):
-                        tanggal_display = keg_obj.tanggal.strftime("%d-%m-%Y")
-                    
-                    display_values = keg_obj.to_tuple_for_display(nama_pj=nama_pj)
-                    self.tree.insert("", "end", values=display_values) # iid tidak di-set, akan otomatis
+            yield
+        finally:
+            self._tunda_tampilan = False
+            self._terapkan_tampilan()
+
+    def _terapkan_tampilan(self):
+        """Menyusun ulang Treeview (satu panggilan set_children) sesuai urutan dan saring cepat aktif."""
+        if self._tunda_tampilan or self._paged_mode or not self._tampilan_kustom_aktif():
+            return
+        ids = self._ids_terurut()
+        if self._quick_filter_text:
+            needle = self._quick_filter_text
+            ids = [i for i in ids if needle in self._kunci_untuk(i)[1]]
+        # Baris yang tidak tercantum di-detach (tetap ada, bisa dipasang lagi), bukan dihapus
+        self.tree.set_children("", *ids)
+
+    def _reset_tampilan_kustom(self):
+        self._sort_state = None
+        self._quick_filter_text = ""
+        if hasattr(self, "quick_filter_entry"):
+            self.quick_filter_entry.delete(0, tk.END)
+        self._perbarui_judul_kolom()
+
+    def _perbarui_judul_kolom(self):
+        for col_id, teks in self._judul_kolom.items():
+            if self._sort_state and self._sort_state[0] == col_id:
+                teks = f"{teks} {'▼' if self._sort_state[1] else '▲'}"
+            self.tree.heading(col_id, text=teks)
+
+    def _on_heading_click(self, col_id):
+        if self._paged_mode:
+            messagebox.showinfo("ℹ️ Urutkan Kolom", "Data besar dimuat per halaman; urutan klien tidak tersedia.\n"
+                                "Gunakan Cari & Filter untuk mempersempit data terlebih dahulu.", parent=self.root)
+            return
+        # Klik berulang: ascending -> descending -> urutan default
+        if self._sort_state is None or self._sort_state[0] != col_id:
+            self._sort_state = (col_id, False)
+        elif not self._sort_state[1]:
+            self._sort_state = (col_id, True)
+        else:
+            self._sort_state = None
+        self._perbarui_judul_kolom()
+        if self._tampilan_kustom_aktif():
+            self._terapkan_tampilan()
+        else:
+            self.tree.set_children("", *self._urutan_default())
+
+    def _on_quick_filter(self, event=None):
+        teks = self.quick_filter_entry.get().strip().casefold()
+        if teks == self._quick_filter_text:
+            return
+        if self._paged_mode:
+            self.quick_filter_entry.delete(0, tk.END)
+            messagebox.showinfo("ℹ️ Saring Cepat", "Data besar dimuat per halaman; saring cepat tidak tersedia.\n"
+                                "Gunakan Cari & Filter untuk mempersempit data terlebih dahulu.", parent=self.root)
+            return
+        self._quick_filter_text = teks
+        if self._tampilan_kustom_aktif():
+            self._terapkan_tampilan()
+        else:
+            self.tree.set_children("", *self._urutan_default())
+
+    def _ubah_total_kegiatan(self, total):
+        self._total_kegiatan = max(0, total)
+        self._update_total_label()
+
+    def _terapkan_perubahan_lokal(self, patch):
+        """Menjalankan patch inkremental, kecuali saat filter pencarian aktif.
+
+        Edit bisa membuat baris masuk atau keluar dari hasil filter (dan jumlah hasilnya berubah),
+        jadi grid yang terfilter dimuat ulang dengan query yang sama dan di-diff.
+        """
+        if self._filter_grid:
+            self._tampilkan_semua_kegiatan_ui()
+        else:
+            patch()
+
+    def _terapkan_perubahan_feed(self, changes, total):
+        """Menerapkan delta dari change feed (perubahan oleh klien lain) ke cache dan grid."""
+        self._invalidasi_beban_dari_feed(changes) # Sebelum patch: tanggal lama masih ada di cache grid
+        if self._filter_grid:
+            self._tampilkan_semua_kegiatan_ui()
+            return
+        for id_keg, item in changes.items():
+            if item is None:
+                self._grid_hapus_kegiatan(id_keg)
             else:
-                 self.kegiatan_data_cache = {}
-        except mysql.connector.Error as err:
-            messagebox.showerror("Error Database", f"Gagal memuat daftar kegiatan: {err}", parent=self.root)
+                self._grid_upsert_kegiatan(item)
+        if total is not None:
+            self._ubah_total_kegiatan(total)
+
+    def _muat_ulang_data(self):
+        """Muat Ulang dan resync change feed: grid dimuat penuh, heat-map kalender dihitung ulang."""
+        self._invalidasi_beban(semua=True)
+        self._tampilkan_semua_kegiatan_ui()
+
+    # --- Heat-map beban kegiatan di kalender ---
+    def _bulan_tampil(self):
+        bulan, tahun = self.cal_tanggal.get_displayed_month()
+        return tahun, bulan
+
+    def _perbarui_heatmap(self):
+        """Mewarnai hari di bulan yang tampil; bulan yang sudah di-cache langsung digambar tanpa query."""
+        self._heatmap_dijadwalkan = False
+        kunci = self._bulan_tampil()
+        beban = self._beban_bulan.get(kunci)
+        if beban is not None:
+            self._gambar_heatmap(beban)
+            return
+        self.executor.submit(self.db_manager.get_beban_bulan_db, *kunci,
+                             on_success=lambda hasil: self._on_beban_loaded(kunci, hasil),
+                             on_error=lambda err: print(f"Peringatan: Beban kalender {kunci[1]:02d}-{kunci[0]} gagal dimuat: {err}"),
+                             supersede_key="heatmap")
+
+    def _on_beban_loaded(self, kunci, beban):
+        self._beban_bulan[kunci] = beban
+        if self._bulan_tampil() == kunci: # Pengguna bisa sudah pindah bulan selama query berjalan
+            self._gambar_heatmap(beban)
+
+    def _gambar_heatmap(self, beban):
+        self.cal_tanggal.calevent_remove(tag="beban")
+        if not beban:
+            return
+        puncak = max(beban.values())
+        tingkat_maks = len(KALENDER_WARNA_BEBAN)
+        for tanggal, jumlah in beban.items():
+            tingkat = max(1, -(-jumlah * tingkat_maks // puncak)) # Pembulatan ke atas: 1 kegiatan tetap terlihat
+            # Warna hari diambil dari tag terakhir event
+            self.cal_tanggal.calevent_create(tanggal, f"{jumlah} kegiatan", tags=["beban", f"beban_{tingkat}"])
+
+    def _invalidasi_beban(self, *tanggal_list, semua=False):
+        """Membuang cache bulan yang memuat tanggal_list (atau semuanya); bulan yang tampil digambar ulang."""
+        if semua:
+            self._beban_bulan.clear()
+        for tanggal in tanggal_list:
+            if isinstance(tanggal, datetime.date):
+                self._beban_bulan.pop((tanggal.year, tanggal.month), None)
+        if self._bulan_tampil() not in self._beban_bulan and not self._heatmap_dijadwalkan:
+            self._heatmap_dijadwalkan = True # Beberapa invalidasi berturut-turut cukup satu query
+            self.root.after_idle(self._perbarui_heatmap)
+
+    def _invalidasi_beban_dari_feed(self, changes):
+        """Bulan lama dan baru setiap kegiatan yang berubah. Tanpa cache grid lengkap (mode paged atau filter),
+        tanggal lama kegiatan yang tidak ada di cache tidak diketahui, jadi seluruh cache dibuang."""
+        cache_lengkap = not self._paged_mode and not self._filter_grid
+        tanggal_list = []
+        for id_keg, item in changes.items():
+            lama = self.kegiatan_data_cache.get(id_keg)
+            if lama is not None:
+                tanggal_list.append(lama.tanggal)
+            elif not cache_lengkap:
+                self._invalidasi_beban(semua=True)
+                return
+            if item is not None:
+                tanggal_list.append(item.tanggal)
+        if tanggal_list:
+            self._invalidasi_beban(*tanggal_list)
+
+    def _nama_pj_untuk(self, id_pj):
+        display_name = self.pengguna_id_to_display_map.get(id_pj)
+        pengguna_obj = self.pengguna_obj_map.get(display_name) if display_name else None
+        return pengguna_obj.nama if pengguna_obj else None
+
+    def _mulai_mode_paged(self, first_page):
+        """Menampilkan halaman pertama; halaman berikutnya dimuat saat scroll mendekati ujung."""
+        self._paged_mode = True
+        self._page_keys = [None]
+        self._reset_tampilan_kustom() # Urut/saring klien butuh seluruh data; mode paged hanya memegang jendela halaman
+        self._apply_halaman(0, True, first_page)
+
+    def _muat_halaman(self, page_idx, at_end):
+        generation = self._grid_generation
+        self.executor.submit(self.db_manager.get_kegiatan_page_db, self._page_keys[page_idx], GRID_PAGE_SIZE, self._filter_grid,
+                             on_success=lambda page: self._on_halaman_loaded(generation, page_idx, at_end, page),
+                             on_error=lambda err: self._on_halaman_error(generation, err))
+
+    def _on_halaman_loaded(self, generation, page_idx, at_end, page):
+        if generation != self._grid_generation:
+            return # Grid sudah di-refresh, halaman ini milik data lama
+        self._page_loading = False
+        self._apply_halaman(page_idx, at_end, page)
+
+    def _on_halaman_error(self, generation, err):
+        if generation != self._grid_generation:
+            return
+        self._page_loading = False
+        messagebox.showerror("Error Database", f"Gagal memuat halaman kegiatan: {err}", parent=self.root)
+
+    def _apply_halaman(self, page_idx, at_end, page):
+        items, next_key = page
+        if next_key is not None and len(self._page_keys) == page_idx + 1:
+            self._page_keys.append(next_key)
+
+        total_before = len(self.tree.get_children())
+        top_index = float(self.tree.yview()[0]) * total_before # Indeks baris teratas yang terlihat
+
+        if at_end:
+            iids = self._insert_kegiatan_rows(items, "end")
+            self._page_window.append((page_idx, iids))
+            if len(self._page_window) > GRID_MAX_PAGES:
+                _, dropped = self._page_window.popleft()
+                self._remove_page_rows(dropped)
+                top_index -= len(dropped)
+        else:
+            iids = self._insert_kegiatan_rows(items, 0)
+            self._page_window.appendleft((page_idx, iids))
+            top_index += len(iids)
+            if len(self._page_window) > GRID_MAX_PAGES:
+                _, dropped = self._page_window.pop()
+                self._remove_page_rows(dropped)
+
+        # Pertahankan baris yang sedang dilihat pengguna meski baris di atasnya berubah
+        total_after = len(self.tree.get_children())
+        if total_after and total_before:
+            self.tree.yview_moveto(max(0.0, top_index) / total_after)
+
+    def _muat_halaman_berikut(self):
+        if not self._page_window:
+            self._page_loading = False
+            return
+        self._muat_halaman(self._page_window[-1][0] + 1, at_end=True)
+
+    def _muat_halaman_sebelum(self):
+        if not self._page_window or self._page_window[0][0] == 0:
+            self._page_loading = False
+            return
+        self._muat_halaman(self._page_window[0][0] - 1, at_end=False)
+
+    def _impor_kegiatan(self):
+        path = filedialog.askopenfilename(parent=self.root, title="Pilih File Impor Kegiatan",
+                                          filetypes=[("CSV / JSON Lines", "*.csv *.jsonl *.ndjson"), ("Semua file", "*.*")])
+        if not path:
+            return
+        jawaban = messagebox.askyesnocancel("📥 Impor Kegiatan",
+                                            "Jalankan dry-run dulu (hanya validasi, tidak ada yang ditulis)?\n\n"
+                                            "Ya = dry-run, Tidak = impor sekarang.", parent=self.root)
+        if jawaban is None:
+            return
+        dry_run = jawaban
+
+        def on_success(laporan):
+            pesan = KegiatanImporter.ringkasan(laporan)
+            if laporan["errors"]:
+                path_error = f"{path}.errors.csv"
+                try:
+                    KegiatanImporter.tulis_laporan_error(laporan, path_error)
+                    pesan += f"\n\nLaporan error per baris: {path_error}"
+                except OSError as e:
+                    pesan += f"\n\nGagal menulis laporan error: {e}"
+                contoh = "\n".join(f"Baris {nomor} ({id_keg or '-'}): {teks}" for nomor, id_keg, teks in laporan["errors"][:5])
+                pesan += f"\n\nContoh error:\n{contoh}"
+                messagebox.showwarning("📥 Impor Selesai dengan Error", pesan, parent=self.root)
+            else:
+                messagebox.showinfo("📥 Impor Selesai", pesan, parent=self.root)
+            if laporan["ditulis"]:
+                self._invalidasi_beban(semua=True)
+                self._tampilkan_semua_kegiatan_ui()
+
+        def on_error(err):
+            messagebox.showerror("❌ Impor Gagal", f"Gagal mengimpor '{path}': {err}", parent=self.root)
+
+        importer = KegiatanImporter(self.db_manager)
+        # Channel terpisah agar impor panjang tidak menahan urutan hasil aksi DB lain
+        self._run_db_action(self.btn_impor, importer.impor, path, dry_run,
+                            on_success=on_success, on_error=on_error, channel="impor")
 
     def _open_activity_log_dialog(self):
-        log_dialog = ActivityLogDialog(self.root, self.db_manager)
+        aksi_terukur = self._ambil_aksi_aktif()
+
+        def on_siap(status):
+            # Riwayat diukur sampai halaman log pertama tampil, bukan sampai dialog ditutup
+            if aksi_terukur is not None:
+                self.watchdog.selesai_aksi(aksi_terukur, status)
+        log_dialog = ActivityLogDialog(self.root, self.db_manager, self.executor, on_siap=on_siap)
         log_dialog.show() # Menggunakan metode show dari BaseDialog
 
+    def _open_export_dialog(self):
+        ExportDialog(self.root, self.db_manager, self.executor).show()
+
 # --- Titik Masuk Aplikasi ---
+def impor_dari_cli(path, dry_run, db_manager):
+    """Impor massal dari baris perintah; mengembalikan kode keluar (0 sukses, 1 ada error)."""
+    try:
+        db_manager.initialize_database()
+        laporan = KegiatanImporter(db_manager).impor(
+            path, dry_run=dry_run,
+            progress_callback=lambda lap: print(f"  batch {lap['batch']}: {lap['dibaca']} baris dibaca, "
+                                                f"{lap['ditulis']} ditulis, {lap['gagal']} gagal"))
+    except (OSError, ValueError, mysql.connector.Error) as e:
+        print(f"Impor gagal: {e}")
+        return 1
+    finally:
+        db_manager.close()
+    print(KegiatanImporter.ringkasan(laporan))
+    for nomor, id_keg, pesan in laporan["errors"]:
+        print(f"  baris {nomor} ({id_keg or '-'}): {pesan}")
+    return 1 if laporan["errors"] else 0
+
+def ekspor_dari_cli(sumber, path, dari, sampai, db_manager):
+    """Ekspor streaming dari baris perintah; mengembalikan kode keluar."""
+    try:
+        tanggal_dari = datetime.datetime.strptime(dari, "%d-%m-%Y").date() if dari else None
+        tanggal_sampai = datetime.datetime.strptime(sampai, "%d-%m-%Y").date() if sampai else None
+        db_manager.initialize_database()
+        statistik = DataExporter(db_manager).ekspor(sumber, path, tanggal_dari, tanggal_sampai)
+    except (OSError, ValueError, mysql.connector.Error) as e:
+        print(f"Ekspor gagal: {e}")
+        return 1
+    finally:
+        db_manager.close()
+    print(DataExporter.ringkasan(statistik))
+    return 0
+
+def arsip_log_dari_cli(retensi_bulan, db_manager):
+    """Retensi log dari baris perintah; mengembalikan kode keluar."""
+    try:
+        db_manager.initialize_database()
+        hasil = LogRetentionManager(db_manager, retensi_bulan=retensi_bulan).jalankan(
+            progress_callback=lambda info: print(f"  {info['bulan']}: {info['dipindahkan']} baris dipindahkan"))
+    except (OSError, ValueError, mysql.connector.Error) as e:
+        print(f"Arsip log gagal: {e}")
+        return 1
+    finally:
+        db_manager.close()
+    print(LogRetentionManager.ringkasan(hasil))
+    return 0
+
 def main():
     DB_HOST = "localhost"
     DB_USER = "root"
     DB_PASS = "" # Isi password database Anda jika ada
     DB_NAME = "ManajemenKegiatanDTEI_VTS_OOP" # Nama DB bisa disesuaikan
+    DB_POOL_MIN = 1 # Koneksi yang selalu dijaga tetap terbuka
+    DB_POOL_MAX = 5 # Batas atas koneksi bersamaan ke server
+
+    parser = argparse.ArgumentParser(description="Aplikasi Manajemen Kegiatan DTEI")
+    parser.add_argument("--impor", metavar="FILE", help="impor kegiatan dari file CSV/JSON Lines tanpa membuka GUI")
+    parser.add_argument("--dry-run", action="store_true", help="bersama --impor: hanya validasi, tidak menulis ke database")
+    parser.add_argument("--ekspor", nargs=2, metavar=("SUMBER", "FILE"),
+                        help="ekspor 'kegiatan' atau 'log' ke FILE (.csv/.jsonl, tambahkan .gz untuk kompresi)")
+    parser.add_argument("--dari", metavar="DD-MM-YYYY", help="bersama --ekspor: tanggal awal (inklusif)")
+    parser.add_argument("--sampai", metavar="DD-MM-YYYY", help="bersama --ekspor: tanggal akhir (inklusif)")
+    parser.add_argument("--arsip-log", action="store_true",
+                        help="pindahkan log yang lebih tua dari masa retensi ke tabel arsip (cocok untuk cron)")
+    parser.add_argument("--retensi-bulan", type=int, default=LOG_RETENSI_BULAN, metavar="N",
+                        help=f"bersama --arsip-log: jumlah bulan log yang tetap di tabel aktif (default {LOG_RETENSI_BULAN})")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="cetak rincian waktu impor modul dan inisialisasi saat startup")
+    parser.add_argument("--instrumentasi", action="store_true",
+                        help="ukur latensi, jumlah baris, dan waktu koneksi setiap query/stored procedure")
+    parser.add_argument("--slow-query-ms", type=float, default=INSTRUMENTASI_SLOW_MS, metavar="MS",
+                        help=f"bersama --instrumentasi: ambang slow-query log (default {INSTRUMENTASI_SLOW_MS} ms)")
+    parser.add_argument("--slow-query-log", default=INSTRUMENTASI_SLOW_LOG, metavar="FILE",
+                        help=f"bersama --instrumentasi: file slow-query log (default {INSTRUMENTASI_SLOW_LOG})")
+    parser.add_argument("--dump-instrumentasi", default=INSTRUMENTASI_DUMP_FILE, metavar="FILE",
+                        help=f"bersama --instrumentasi: file ringkasan JSON (default {INSTRUMENTASI_DUMP_FILE})")
+    parser.add_argument("--dump-interval", type=float, default=INSTRUMENTASI_DUMP_DETIK, metavar="DETIK",
+                        help=f"bersama --instrumentasi: interval penulisan ringkasan (default {INSTRUMENTASI_DUMP_DETIK} s)")
+    parser.add_argument("--ui-stall-ms", type=float, default=UI_STALL_AMBANG_MS, metavar="MS",
+                        help=f"ambang stall event loop yang dicatat di jendela diagnostik (default {UI_STALL_AMBANG_MS} ms)")
+    args = parser.parse_args()
+
+    instrumentasi = None
+    if args.instrumentasi:
+        instrumentasi = QueryInstrumentation(slow_ms=args.slow_query_ms, slow_log_path=args.slow_query_log)
+
+    def selesai_instrumentasi(db):
+        if instrumentasi is None:
+            return
+        instrumentasi.hentikan()
+        instrumentasi.tulis_dump(args.dump_instrumentasi, {"pool": db.get_pool_stats()})
+        print(f"Ringkasan instrumentasi query ditulis ke {args.dump_instrumentasi}.")
+
+    def jalankan_cli(fungsi, *fungsi_args):
+        db = DatabaseManager(DB_HOST, DB_USER, DB_PASS, DB_NAME, instrumentasi=instrumentasi)
+        try:
+            return fungsi(*fungsi_args, db)
+        finally:
+            selesai_instrumentasi(db)
+
+    if args.arsip_log:
+        sys.exit(jalankan_cli(arsip_log_dari_cli, args.retensi_bulan))
+    if args.impor:
+        sys.exit(jalankan_cli(impor_dari_cli, args.impor, args.dry_run))
+    if args.ekspor:
+        sys.exit(jalankan_cli(ekspor_dari_cli, args.ekspor[0], args.ekspor[1], args.dari, args.sampai))
 
+    startup_timings = {} # Rincian waktu startup (detik) untuk memastikan warm start cepat
+    t_start = time.perf_counter()
     main_root = tk.Tk()
     main_root.withdraw() # Sembunyikan jendela utama awal
+    startup_timings["tk_init"] = time.perf_counter() - t_start
+    watchdog = UIWatchdog(main_root, ambang_ms=args.ui_stall_ms) # Aktif sejak login agar stall startup ikut tercatat
+    watchdog.mulai()
+
+    db_manager = DatabaseManager(DB_HOST, DB_USER, DB_PASS, DB_NAME,
+                                 pool_min_size=DB_POOL_MIN, pool_max_size=DB_POOL_MAX, instrumentasi=instrumentasi)
+    if instrumentasi is not None:
+        instrumentasi.mulai_dump_berkala(args.dump_instrumentasi, args.dump_interval,
+                                         ekstra=lambda: {"pool": db_manager.get_pool_stats()})
+    executor = TaskExecutor(main_root, max_workers=DB_POOL_MAX) # Worker tidak perlu melebihi jumlah koneksi
+
+    def cetak_profil_startup(judul, timings):
+        if not args.profile_startup:
+            return
+        print(judul)
+        for nama, durasi in timings.items():
+            print(f"  {nama:<28} {durasi * 1000:8.1f} ms")
+
+    def do_open_signup():
+        if not login_dialog.db_siap:
+            return # Pendaftaran butuh database yang sudah siap
+        signup_dialog = SignupDialog(main_root, db_manager, executor)
+        signup_dialog.show() # Tampilkan dialog signup
 
-    db_manager = DatabaseManager(DB_HOST, DB_USER, DB_PASS, DB_NAME)
+    # Proses Login: jendela tampil lebih dulu, koneksi dan verifikasi skema berjalan di latar belakang
+    t_login = time.perf_counter()
+    login_dialog = LoginDialog(main_root, db_manager, do_open_signup, executor)
+    startup_timings["login_ui"] = time.perf_counter() - t_login
 
-    try:
-        print(f"Menginisialisasi database '{DB_NAME}'...")
+    def on_login_tampil():
+        startup_timings["total_hingga_login"] = time.perf_counter() - _T_IMPOR_MULAI # Sejak awal impor modul
+        cetak_profil_startup("Rincian waktu impor:", IMPORT_TIMINGS)
+        cetak_profil_startup("Rincian waktu startup (hingga jendela login tampil):", startup_timings)
+    main_root.after_idle(on_login_tampil)
+
+    def init_database():
+        t_db = time.perf_counter()
         db_manager.initialize_database()
-        print("Inisialisasi database selesai.")
-    except Exception as e:
-        messagebox.showerror("Kritikal: Inisialisasi Database Gagal", f"Aplikasi tidak dapat dimulai.\nError: {e}")
+        return time.perf_counter() - t_db
+
+    def on_db_siap(durasi):
+        db_timings = {"db_init": durasi}
+        for nama, durasi_langkah in db_manager.startup_timings.items():
+            db_timings[f"db_init.{nama}"] = durasi_langkah
+        db_timings["total_hingga_db_siap"] = time.perf_counter() - _T_IMPOR_MULAI
+        jenis_start = "warm start, DDL dilewati" if db_manager.schema_warm_start else "cold start/upgrade"
+        print(f"Inisialisasi database selesai ({jenis_start}).")
+        cetak_profil_startup("Rincian waktu inisialisasi database (latar belakang):", db_timings)
+        login_dialog.set_db_siap()
+        # Kalender di form utama dimuat sambil pengguna mengetik password
+        executor.submit(impor_lazy, "tkcalendar", channel="aset")
+
+    def on_db_error(e):
+        messagebox.showerror("Kritikal: Inisialisasi Database Gagal", f"Aplikasi tidak dapat dimulai.\nError: {e}",
+                             parent=login_dialog.top)
         print(f"Kritikal: Inisialisasi Database Gagal - {e}")
-        main_root.destroy()
-        return # Keluar dari fungsi main
+        login_dialog.top.destroy() # wait_window di bawah selesai, aplikasi keluar lewat jalur login gagal
 
-    def do_open_signup():
-        signup_dialog = SignupDialog(main_root, db_manager)
-        signup_dialog.show() # Tampilkan dialog signup
-
-    # Proses Login
-    login_dialog = LoginDialog(main_root, db_manager, do_open_signup)
+    print(f"Menginisialisasi database '{DB_NAME}' di latar belakang...")
+    executor.submit(init_database, on_success=on_db_siap, on_error=on_db_error, channel="init")
     # login_dialog.show() # Tidak perlu karena kita cek login_successful secara manual
 
     # Modifikasi loop login agar parent_root tidak hancur prematur
@@ -1345,7 +5461,7 @@ def main():
     if hasattr(login_dialog, 'login_successful') and login_dialog.login_successful:
         current_user_obj = login_dialog.result # Ambil objek Pengguna dari hasil dialog
         main_root.deiconify() # Tampilkan jendela utama
-        app = KegiatanApp(main_root, db_manager)
+        app = KegiatanApp(main_root, db_manager, executor, watchdog)
         app.current_user = current_user_obj # Set pengguna yang login di aplikasi utama
         print(f"Pengguna login: {current_user_obj.get_details_string()}") # Polimorfisme contoh
         
@@ -1356,10 +5472,20 @@ def main():
         #    print(f"Detail kegiatan pertama: {first_keg_obj.get_details_string()}")
 
         main_root.mainloop()
+        app.change_feed.stop()
     else:
         print("Login gagal atau jendela login ditutup. Aplikasi keluar.")
         main_root.destroy() # Hancurkan root jika login tidak berhasil
 
+    watchdog.hentikan()
+    executor.shutdown()
+    print(f"Statistik event loop UI: {watchdog.ringkasan()}")
+    print(f"Statistik pool koneksi: {db_manager.get_pool_stats()}")
+    print(f"Statistik prepared statement: {db_manager.get_statement_stats()}")
+    print(f"Statistik cache data referensi: {db_manager.get_referensi_stats()}")
+    selesai_instrumentasi(db_manager)
+    db_manager.close()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
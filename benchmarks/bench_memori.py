@@ -0,0 +1,90 @@
+"""Benchmark memori representasi kegiatan di grid: byte per kegiatan pada 100 ribu dan 1 juta baris.
+
+Membandingkan representasi lama (objek Kegiatan ber-__dict__ dibungkus dict {'objek', 'nama_pj'})
+dengan representasi sekarang (Kegiatan ber-__slots__ dengan nama_pj, dibuat langsung dari tuple cursor).
+Baris sumber dibuat lebih dulu dan tidak ikut diukur, sehingga angka yang dilaporkan adalah biaya
+representasi per kegiatan (objek + pembungkus + slot list), bukan isi string/tanggalnya.
+
+Jalankan dari root repositori:
+    python benchmarks/bench_memori.py
+    python benchmarks/bench_memori.py --jumlah 100000 250000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from baru import Kegiatan  # noqa: E402
+from data_sintetis import buat_kegiatan  # noqa: E402
+
+
+class _EntitasLama:
+    """Salinan struktur Entitas sebelum __slots__ (baseline)."""
+    def __init__(self, id_entitas):
+        self._id_entitas = id_entitas
+
+
+class _KegiatanLama(_EntitasLama):
+    """Salinan struktur Kegiatan sebelum __slots__ (baseline), tanpa atribut nama_pj."""
+    def __init__(self, id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab=None):
+        super().__init__(id_kegiatan)
+        self._nama_kegiatan = nama_kegiatan
+        self._tanggal = tanggal
+        self._tempat = tempat
+        self._jenis_kegiatan = jenis_kegiatan
+        self._id_penanggung_jawab = id_penanggung_jawab
+
+
+def bangun_lama(rows):
+    return [{'objek': _KegiatanLama(id_kegiatan=row[0], nama_kegiatan=row[1], tanggal=row[2],
+                                    tempat=row[3], jenis_kegiatan=row[4], id_penanggung_jawab=row[5]),
+             'nama_pj': row[6]} for row in rows]
+
+
+def bangun_baru(rows):
+    return [Kegiatan.dari_baris_view(row) for row in rows]
+
+
+VARIAN = {"lama (dict + __dict__)": bangun_lama, "baru (__slots__)": bangun_baru}
+
+PJ = [(101, "Paul Fajar"), (102, "Dr. Zhafier"), (103, "Vijaypal Singh")]
+
+
+def ukur(bangun, rows):
+    """Byte yang dialokasikan (dan puncak) untuk membangun representasi dari rows."""
+    gc.collect()
+    tracemalloc.start()
+    hasil = bangun(rows)
+    sekarang, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del hasil
+    gc.collect()
+    return sekarang, puncak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memori representasi kegiatan.")
+    parser.add_argument("--jumlah", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Jumlah baris yang diukur (default: 100000 1000000).")
+    args = parser.parse_args()
+
+    print(f"{'baris':>10}  {'varian':<24} {'byte/kegiatan':>14} {'total (MB)':>11} {'puncak (MB)':>12}")
+    for jumlah in args.jumlah:
+        rows = buat_kegiatan(jumlah, PJ)
+        hasil_varian = {}
+        for nama, bangun in VARIAN.items():
+            sekarang, puncak = ukur(bangun, rows)
+            hasil_varian[nama] = sekarang / jumlah
+            print(f"{jumlah:>10}  {nama:<24} {sekarang / jumlah:>14.1f} {sekarang / 2**20:>11.1f} {puncak / 2**20:>12.1f}")
+        lama, baru = hasil_varian.values()
+        print(f"{'':>10}  hemat {lama - baru:.1f} byte/kegiatan ({(1 - baru / lama) * 100:.0f}%)")
+        del rows
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
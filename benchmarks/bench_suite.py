@@ -0,0 +1,323 @@
+"""Suite micro-benchmark DatabaseManager dan jalur data grid, dengan hasil JSON yang bisa dibandingkan antar-commit.
+
+Backend:
+- simulasi (default): KoneksiSimulasi di memori, tanpa server; mengukur biaya sisi klien.
+  DDL migrasi hanya dimodelkan sebagian (CAKUPAN_DDL, dicatat di meta 'ddl' hasil).
+- mysql: server MySQL/MariaDB lokal. Gunakan database KHUSUS benchmark (default ManajemenKegiatanBench),
+  jangan database produksi: data sintetis dimasukkan dan skema dimigrasikan ulang (cold init).
+
+Contoh:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --kegiatan 50000 --log 200000 --output hasil_baru.json
+    python benchmarks/bench_suite.py --backend mysql --user root --database ManajemenKegiatanBench
+    python benchmarks/bench_suite.py --bandingkan benchmarks/hasil/lama.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+DIR_BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIR_BENCH))
+sys.path.insert(0, DIR_BENCH)
+
+import baru  # noqa: E402
+import data_sintetis  # noqa: E402
+from koneksi_simulasi import CAKUPAN_DDL, DatabaseManagerSimulasi, PenyimpananSimulasi  # noqa: E402
+
+DIR_HASIL = os.path.join(DIR_BENCH, "hasil")
+
+
+# --- Pengukuran ---
+def statistik(durasi_ms):
+    durasi_ms = sorted(durasi_ms)
+    return {
+        "ulang": len(durasi_ms),
+        "min_ms": round(durasi_ms[0], 4),
+        "median_ms": round(statistics.median(durasi_ms), 4),
+        "p95_ms": round(durasi_ms[min(len(durasi_ms) - 1, int(len(durasi_ms) * 0.95))], 4),
+        "rata_ms": round(statistics.fmean(durasi_ms), 4),
+    }
+
+
+def ukur(fn, ulang, pemanasan=1):
+    """Menjalankan fn (tanpa argumen) pemanasan + ulang kali; mengembalikan statistik durasi dalam milidetik."""
+    for _ in range(pemanasan):
+        fn()
+    return ukur_urutan([fn] * ulang)
+
+
+def ukur_urutan(fn_list):
+    """Setiap fungsi dijalankan sekali berurutan (untuk operasi yang mengubah data, misalnya tambah lalu hapus)."""
+    durasi = []
+    for fn in fn_list:
+        mulai = time.perf_counter()
+        fn()
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    return statistik(durasi)
+
+
+# --- Benchmark DatabaseManager ---
+def bench_database(db_manager, dataset, ulang):
+    hasil = {}
+    pengguna = dataset["pengguna"][len(dataset["pengguna"]) // 2]
+
+    hasil["initialize_database_warm"] = ukur(db_manager.initialize_database, ulang)
+
+    target_versi = db_manager.get_schema_target()[0]
+
+    def init_cold():
+        # Tanpa riwayat Schema_Versi dan baris Schema_Meta, initialize_database menjalankan ulang
+        # seluruh langkah migrasi (idempoten). Schema_Meta saja tidak cukup: riwayat per versi masih cocok.
+        db_manager.execute_query("DELETE FROM Schema_Versi")
+        db_manager.execute_query("DELETE FROM Schema_Meta")
+        db_manager.initialize_database()
+        dijalankan = db_manager.schema_migrasi_dijalankan
+        assert dijalankan == list(range(1, target_versi + 1)), f"Cold init hanya menjalankan migrasi {dijalankan}"
+        store = getattr(db_manager, "store", None) # Backend simulasi: DDL yang akan ditolak server
+        assert store is None or store.ddl_ditolak == 0, f"{store.ddl_ditolak} ADD COLUMN/CREATE INDEX duplikat dikirim"
+    hasil["initialize_database_cold"] = ukur(init_cold, max(1, ulang // 5))
+
+    hasil["get_semua_kegiatan_obj_db"] = ukur(db_manager.get_semua_kegiatan_obj_db, ulang)
+    hasil["get_log_page_db_pertama"] = ukur(lambda: db_manager.get_log_page_db({}, None, 100), ulang)
+    hasil["get_log_page_db_tengah"] = ukur(
+        lambda: db_manager.get_log_page_db({}, max(2, len(dataset["log"]) // 2), 100), ulang)
+    hasil["verify_user_credentials"] = ukur(lambda: db_manager.verify_user_credentials(pengguna[4], pengguna[5]), ulang)
+
+    # Tiga SP kegiatan: tambah N kegiatan baru, ubah semuanya, lalu hapus semuanya (data kembali seperti semula)
+    tanggal = datetime.date(2030, 1, 1)
+    baru_list = [baru.Kegiatan(f"BZ{i:06d}", f"Bench SP {i}", tanggal, "Aula B11", "Seminar", pengguna[0])
+                 for i in range(ulang)]
+    ubah_list = [baru.Kegiatan(k.id_entitas, k.nama_kegiatan + " (ubah)", tanggal, "Kelas1", "Rapat Dosen", pengguna[0])
+                 for k in baru_list]
+    hasil["sp_tambah_kegiatan"] = ukur_urutan([lambda k=k: db_manager.tambah_kegiatan_obj_db(k) for k in baru_list])
+    hasil["sp_update_kegiatan"] = ukur_urutan([lambda k=k: db_manager.update_kegiatan_obj_db(k) for k in ubah_list])
+    hasil["sp_hapus_kegiatan"] = ukur_urutan([lambda k=k: db_manager.hapus_kegiatan_db(k.id_entitas) for k in baru_list])
+
+    hasil["statistik_pool"] = db_manager.get_pool_stats()
+    hasil["statistik_statement"] = db_manager.get_statement_stats()
+    return hasil
+
+
+# --- Benchmark jalur grid tanpa layar ---
+class TreeviewSimulasi:
+    """Pengganti ttk.Treeview untuk operasi yang dipakai cache grid KegiatanApp (tanpa Tk)."""
+
+    def __init__(self):
+        self._anak = []
+        self._nilai = {}
+
+    def get_children(self, item=""):
+        return tuple(self._anak)
+
+    def insert(self, parent, index, iid=None, values=()):
+        if index == "end":
+            self._anak.append(iid)
+        else:
+            self._anak.insert(index, iid)
+        self._nilai[iid] = values
+        return iid
+
+    def delete(self, *items):
+        for iid in items:
+            self._anak.remove(iid)
+            del self._nilai[iid]
+
+    def exists(self, iid):
+        return iid in self._nilai
+
+    def detach(self, *items):
+        for iid in items:
+            self._anak.remove(iid)
+
+    def move(self, iid, parent, index):
+        self._anak.insert(index, iid)
+
+    def item(self, iid, values=None, **kwargs):
+        if values is not None:
+            self._nilai[iid] = values
+        return {"values": self._nilai.get(iid, ())}
+
+    def set_children(self, item, *children):
+        self._anak = list(children)
+
+    def heading(self, *args, **kwargs):
+        pass
+
+
+class _FrameSimulasi:
+    def config(self, **kwargs):
+        pass
+
+
+def buat_app_grid(tree):
+    """KegiatanApp tanpa jendela: hanya state grid dan Treeview yang diberikan."""
+    app = baru.KegiatanApp.__new__(baru.KegiatanApp)
+    app.tree = tree
+    app.tabel_frame = _FrameSimulasi()
+    app._judul_kolom = {}
+    app._init_state_grid()
+    return app
+
+
+def buat_treeview(pakai_tk):
+    if not pakai_tk:
+        return TreeviewSimulasi(), None
+    root = baru.tk.Tk()
+    root.withdraw()
+    tree = baru.ttk.Treeview(root, columns=("id", "nama", "tanggal", "tempat", "jenis", "pj_nama", "pj_id"),
+                             show="headings")
+    return tree, root
+
+
+def bench_grid(dataset, ulang, pakai_tk):
+    hasil = {}
+    rows = dataset["kegiatan"]
+    ubah_tiap = max(1, len(rows) // 100) # 1% baris berubah pada refresh
+
+    def data_awal():
+        return [baru.Kegiatan.dari_baris_view(row) for row in rows]
+
+    def data_berubah():
+        data = data_awal()
+        for i in range(0, len(data), ubah_tiap):
+            k = data[i]
+            data[i] = baru.Kegiatan(k.id_entitas, k.nama_kegiatan + " *", k.tanggal, k.tempat, k.jenis_kegiatan,
+                                    k.id_penanggung_jawab, k.nama_pj)
+        return data
+
+    hasil["konversi_baris_ke_objek"] = ukur(data_awal, ulang)
+
+    durasi_isi, durasi_diff, durasi_urut, durasi_saring = [], [], [], []
+    for _ in range(ulang):
+        tree, root = buat_treeview(pakai_tk)
+        try:
+            app = buat_app_grid(tree)
+            awal, berubah = data_awal(), data_berubah()
+
+            mulai = time.perf_counter()
+            app._terapkan_diff_grid(awal)
+            durasi_isi.append(time.perf_counter() - mulai)
+
+            mulai = time.perf_counter()
+            app._terapkan_diff_grid(berubah)
+            durasi_diff.append(time.perf_counter() - mulai)
+
+            mulai = time.perf_counter()
+            app._sort_state = ("nama", False)
+            app._terapkan_tampilan()
+            durasi_urut.append(time.perf_counter() - mulai)
+
+            mulai = time.perf_counter()
+            app._quick_filter_text = "bench 1"
+            app._terapkan_tampilan()
+            durasi_saring.append(time.perf_counter() - mulai)
+        finally:
+            if root is not None:
+                root.destroy()
+
+    for nama, durasi in (("treeview_isi_awal", durasi_isi), ("treeview_diff_1persen", durasi_diff),
+                         ("treeview_urut_kolom", durasi_urut), ("treeview_saring_cepat", durasi_saring)):
+        hasil[nama] = statistik([d * 1000 for d in durasi])
+    return hasil
+
+
+# --- Hasil dan perbandingan ---
+def commit_saat_ini():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(DIR_BENCH),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bandingkan(lama, baru_hasil):
+    """Mencetak median lama vs baru per benchmark (rasio < 1 berarti lebih cepat)."""
+    for kunci in ("backend", "jumlah", "latensi_ms", "treeview"):
+        if lama.get("meta", {}).get(kunci) != baru_hasil["meta"].get(kunci):
+            print(f"Peringatan: '{kunci}' berbeda ({lama.get('meta', {}).get(kunci)} vs {baru_hasil['meta'].get(kunci)}), "
+                  "perbandingan tidak setara.")
+    print(f"\n{'benchmark':<36} {'lama (ms)':>12} {'baru (ms)':>12} {'rasio':>8}")
+    for bagian in ("database", "grid"):
+        for nama, stat in baru_hasil.get(bagian, {}).items():
+            stat_lama = lama.get(bagian, {}).get(nama)
+            if not isinstance(stat, dict) or "median_ms" not in stat or not stat_lama:
+                continue
+            rasio = stat["median_ms"] / stat_lama["median_ms"] if stat_lama["median_ms"] else float("nan")
+            print(f"{nama:<36} {stat_lama['median_ms']:>12.3f} {stat['median_ms']:>12.3f} {rasio:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark DatabaseManager dan grid Kegiatan.")
+    parser.add_argument("--backend", choices=("simulasi", "mysql"), default="simulasi")
+    parser.add_argument("--pengguna", type=int, default=1000, help="Jumlah pengguna sintetis.")
+    parser.add_argument("--kegiatan", type=int, default=10000, help="Jumlah kegiatan sintetis.")
+    parser.add_argument("--log", type=int, default=50000, help="Jumlah baris log sintetis.")
+    parser.add_argument("--ulang", type=int, default=20, help="Pengulangan per benchmark.")
+    parser.add_argument("--latensi-ms", type=float, default=0.0, help="Latensi simulasi per round trip (backend simulasi).")
+    parser.add_argument("--tk", action="store_true", help="Pakai ttk.Treeview asli (butuh display) untuk benchmark grid.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="ManajemenKegiatanBench")
+    parser.add_argument("--output", help="File JSON hasil (default: benchmarks/hasil/<backend>_<commit>.json).")
+    parser.add_argument("--bandingkan", help="File JSON hasil sebelumnya untuk dibandingkan.")
+    args = parser.parse_args()
+
+    dataset = data_sintetis.buat_dataset(args.pengguna, args.kegiatan, args.log)
+    if args.backend == "mysql":
+        db_manager = baru.DatabaseManager(args.host, args.user, args.password, args.database)
+        db_manager.initialize_database()
+        if data_sintetis.muat_ke_mysql(db_manager, dataset):
+            print(f"Data sintetis dimasukkan ke database '{args.database}'.")
+    else:
+        db_manager = DatabaseManagerSimulasi(PenyimpananSimulasi(dataset, args.latensi_ms / 1000))
+
+    try:
+        hasil_db = bench_database(db_manager, dataset, args.ulang)
+    finally:
+        db_manager.close()
+    hasil_grid = bench_grid(dataset, max(1, args.ulang // 4), args.tk)
+
+    commit = commit_saat_ini()
+    hasil = {
+        "meta": {
+            "commit": commit,
+            "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+            "backend": args.backend,
+            "latensi_ms": args.latensi_ms if args.backend == "simulasi" else None,
+            # initialize_database_cold hanya memvalidasi DDL migrasi dengan backend mysql
+            "ddl": "server" if args.backend == "mysql" else CAKUPAN_DDL,
+            "treeview": "tk" if args.tk else "simulasi",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "jumlah": {"pengguna": args.pengguna, "kegiatan": args.kegiatan, "log": args.log},
+        },
+        "database": hasil_db,
+        "grid": hasil_grid,
+    }
+
+    output = args.output or os.path.join(DIR_HASIL, f"{args.backend}_{commit or 'tanpa-commit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(hasil, f, indent=2, default=str)
+
+    print(f"{'benchmark':<36} {'median (ms)':>12} {'p95 (ms)':>12}")
+    for bagian in (hasil_db, hasil_grid):
+        for nama, stat in bagian.items():
+            if isinstance(stat, dict) and "median_ms" in stat:
+                print(f"{nama:<36} {stat['median_ms']:>12.3f} {stat['p95_ms']:>12.3f}")
+    print(f"Hasil disimpan ke {output}")
+
+    if args.bandingkan:
+        with open(args.bandingkan, encoding="utf-8") as f:
+            bandingkan(json.load(f), hasil)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Generator data sintetis untuk benchmark: pengguna, kegiatan, dan baris log dengan jumlah bebas.
+
+Semua fungsi deterministik (tanpa random) agar hasil antar-commit bisa dibandingkan.
+Bentuk tuple mengikuti urutan kolom yang dibaca aplikasi:
+- pengguna: (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password)
+- kegiatan: baris View_Detail_Kegiatan (ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan,
+  ID_Penanggung_Jawab, Nama_Penanggung_Jawab)
+- log: (ID_Log, Timestamp_Aksi, ID_Kegiatan_Ref, Aksi, Detail_Lama, Detail_Baru)
+"""
+import datetime
+
+ID_PENGGUNA_AWAL = 100000 # Jauh di atas ID data awal aplikasi (101-103)
+PREFIX_USERNAME = "bench_user"
+PREFIX_KEGIATAN = "B" # ID_Kegiatan VARCHAR(10): 'B' + 7 digit
+
+TEMPAT = ["Aula B11", "Auditorium B12", "Labkom1-B11", "Kelas1", "Kelas2"]
+JENIS = ["Seminar", "Praktikum", "Rapat Dosen", "Workshop"]
+AKSI = ["INSERT", "UPDATE", "DELETE"]
+
+
+def buat_pengguna(jumlah):
+    return [(ID_PENGGUNA_AWAL + i, f"Pengguna Bench {i}", i % 3 + 1, f"BN{i:07d}",
+             f"{PREFIX_USERNAME}{i}", f"pass{i}") for i in range(jumlah)]
+
+
+def buat_kegiatan(jumlah, pengguna=None):
+    """Baris view; tanggal menyebar 10 tahun, PJ bergiliran dari daftar pengguna (atau tanpa PJ)."""
+    awal = datetime.date(2020, 1, 1)
+    tanggal = [awal + datetime.timedelta(days=i) for i in range(3650)]
+    pengguna = pengguna or [(None, None)]
+    rows = []
+    for i in range(jumlah):
+        pj = pengguna[i % len(pengguna)]
+        rows.append((f"{PREFIX_KEGIATAN}{i:07d}", f"Kegiatan Bench {i}", tanggal[i % len(tanggal)],
+                     TEMPAT[i % len(TEMPAT)], JENIS[i % len(JENIS)], pj[0], pj[1]))
+    return rows
+
+
+def buat_log(jumlah, kegiatan):
+    """Baris log berurutan ID_Log naik, satu menit per baris, merujuk kegiatan bergiliran."""
+    awal = datetime.datetime(2024, 1, 1)
+    rows = []
+    for i in range(jumlah):
+        id_keg = kegiatan[i % len(kegiatan)][0] if kegiatan else None
+        aksi = AKSI[i % len(AKSI)]
+        detail = f"ID: {id_keg}, Nama: Kegiatan Bench {i}"
+        rows.append((i + 1, awal + datetime.timedelta(minutes=i), id_keg, aksi,
+                     detail if aksi != "INSERT" else None, detail if aksi != "DELETE" else None))
+    return rows
+
+
+def buat_dataset(n_pengguna, n_kegiatan, n_log):
+    pengguna = buat_pengguna(n_pengguna)
+    kegiatan = buat_kegiatan(n_kegiatan, [(p[0], p[1]) for p in pengguna])
+    return {"pengguna": pengguna, "kegiatan": kegiatan, "log": buat_log(n_log, kegiatan)}
+
+
+def muat_ke_mysql(db_manager, dataset, chunk=1000):
+    """Memasukkan dataset ke database MySQL/MariaDB benchmark (skema sudah diinisialisasi).
+
+    Dilewati jika pengguna bench sudah ada, sehingga run berikutnya memakai data yang sama.
+    Log sintetis ditambahkan di atas log yang dibuat trigger saat kegiatan dimasukkan.
+    """
+    from baru import Kegiatan
+
+    sudah = db_manager.execute_query("SELECT COUNT(*) FROM Pengguna WHERE Username LIKE %s",
+                                     (f"{PREFIX_USERNAME}%",), fetch_one=True)
+    if sudah and sudah[0]:
+        return False
+    for i in range(0, len(dataset["pengguna"]), chunk):
+        db_manager.execute_query(
+            "INSERT INTO Pengguna (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password) VALUES (%s, %s, %s, %s, %s, %s)",
+            dataset["pengguna"][i:i + chunk], is_many=True)
+    for i in range(0, len(dataset["kegiatan"]), chunk):
+        db_manager.insert_kegiatan_batch_db([Kegiatan.dari_baris_view(row) for row in dataset["kegiatan"][i:i + chunk]])
+    for i in range(0, len(dataset["log"]), chunk):
+        db_manager.execute_query(
+            "INSERT INTO Log_Perubahan_Kegiatan (Timestamp_Aksi, ID_Kegiatan_Ref, Aksi, Detail_Lama, Detail_Baru) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [row[1:] for row in dataset["log"][i:i + chunk]], is_many=True)
+    return True
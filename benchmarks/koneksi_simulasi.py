@@ -0,0 +1,276 @@
+"""Pengganti koneksi MySQL di memori untuk benchmark tanpa server database.
+
+Hanya query yang dipakai jalur benchmark yang dijawab dengan data; query lain diterima tanpa efek.
+Dari DDL migrasi hanya kolom (ADD COLUMN) dan indeks (CREATE INDEX) yang dimodelkan, lihat CAKUPAN_DDL. Dengan backend ini angka benchmark mengukur biaya sisi klien: pool koneksi,
+registry statement, konversi baris menjadi objek, dan logika aplikasi. Latensi jaringan bisa
+disimulasikan per round trip dengan latensi_detik.
+"""
+import functools
+import re
+import time
+
+import mysql.connector
+
+from baru import DatabaseManager
+
+# Dicatat di meta hasil benchmark: angka cold init simulasi tidak memvalidasi DDL lain terhadap server
+CAKUPAN_DDL = ("simulasi: hanya ADD COLUMN dan CREATE INDEX yang dimodelkan (duplikat ditolak dengan errno "
+               "1060/1061, information_schema COLUMNS/STATISTICS dijawab); DDL lain diterima tanpa validasi")
+
+
+class PenyimpananSimulasi:
+    """Isi 'database' yang dibagi semua koneksi simulasi."""
+
+    def __init__(self, dataset, latensi_detik=0.0):
+        self.latensi_detik = latensi_detik
+        self.roles = [(1, "Mahasiswa"), (2, "Dosen"), (3, "Staff")]
+        self.pengguna = {row[4]: row for row in dataset["pengguna"]} # Username -> baris
+        self.nama_pengguna = {row[0]: row[1] for row in dataset["pengguna"]}
+        self.kegiatan = {row[0]: row for row in dataset["kegiatan"]}
+        self.log = list(dataset["log"]) # Urut ID_Log naik, ID_Log = indeks + 1
+        self.schema_meta = None
+        self.schema_versi = {} # Versi -> checksum
+        self.kolom_tambahan = set() # (tabel, kolom) hasil ALTER TABLE ... ADD COLUMN, huruf kecil
+        self.indeks = set() # (tabel, indeks) hasil CREATE INDEX, huruf kecil
+        self.ddl_ditolak = 0 # ADD COLUMN/CREATE INDEX duplikat; migrasi yang benar tidak pernah mengirimnya
+        self._view_cache = None
+
+    def round_trip(self):
+        if self.latensi_detik:
+            time.sleep(self.latensi_detik)
+
+    def view_kegiatan(self):
+        """Isi View_Detail_Kegiatan dengan ORDER BY Tanggal DESC, ID_Kegiatan DESC (di-cache sampai ada tulisan)."""
+        if self._view_cache is None:
+            self._view_cache = sorted(self.kegiatan.values(), key=lambda row: (row[2] is not None, row[2], row[0]),
+                                      reverse=True)
+        return self._view_cache
+
+    def tulis_kegiatan(self, id_keg, row, aksi):
+        self._view_cache = None
+        lama = self.kegiatan.pop(id_keg, None)
+        if row is not None:
+            self.kegiatan[id_keg] = row
+        # Meniru trigger: satu baris log per perubahan
+        self.log.append((len(self.log) + 1, None, id_keg, aksi, str(lama) if lama else None, str(row) if row else None))
+        return 1 if (lama or row) else 0
+
+
+_POLA_TAMBAH_KOLOM = re.compile(r"ALTER TABLE (\w+) ADD COLUMN (\w+)", re.IGNORECASE)
+_POLA_BUAT_INDEKS = re.compile(r"CREATE (?:UNIQUE |FULLTEXT )?INDEX (\w+) ON (\w+)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _target_ddl(query):
+    """(tabel, nama) huruf kecil dari ADD COLUMN atau CREATE INDEX."""
+    cocok = _POLA_TAMBAH_KOLOM.search(query)
+    if cocok:
+        return cocok.group(1).lower(), cocok.group(2).lower()
+    cocok = _POLA_BUAT_INDEKS.search(query)
+    return cocok.group(2).lower(), cocok.group(1).lower()
+
+
+@functools.lru_cache(maxsize=None)
+def _jenis_query(query):
+    """Mengklasifikasikan teks query sekali (teks query aplikasi jumlahnya terbatas)."""
+    q = " ".join(query.split()).upper()
+    if _POLA_TAMBAH_KOLOM.search(q):
+        return "tambah_kolom"
+    if _POLA_BUAT_INDEKS.search(q):
+        return "buat_indeks"
+    if "FROM INFORMATION_SCHEMA.COLUMNS" in q:
+        return "info_kolom"
+    if "FROM INFORMATION_SCHEMA.STATISTICS" in q:
+        return "info_indeks"
+    # Tulis/hapus dicek lebih dulu: "DELETE FROM SCHEMA_META" juga memuat "FROM SCHEMA_META"
+    if q.startswith("INSERT INTO SCHEMA_META"):
+        return "schema_meta_tulis"
+    if q.startswith("DELETE FROM SCHEMA_META"):
+        return "schema_meta_hapus"
+    if "FROM SCHEMA_META" in q:
+        return "schema_meta"
+    if q.startswith("INSERT INTO SCHEMA_VERSI"):
+        return "schema_versi_tulis"
+    if q.startswith("UPDATE SCHEMA_VERSI SET CHECKSUM"):
+        return "schema_versi_checksum"
+    if q.startswith("DELETE FROM SCHEMA_VERSI"):
+        return "schema_versi_hapus"
+    if q.startswith("SELECT VERSI, CHECKSUM FROM SCHEMA_VERSI"):
+        return "schema_versi"
+    if q.startswith("SELECT COUNT(*) FROM ROLE"):
+        return "jumlah_role"
+    if q.startswith("SELECT COUNT(*) FROM PENGGUNA"):
+        return "jumlah_pengguna"
+    if q.startswith("SELECT COUNT(*) FROM KEGIATAN"):
+        return "jumlah_kegiatan" if "WHERE" not in q else "kosong"
+    if "FROM PENGGUNA WHERE USERNAME = %S AND PASSWORD = %S" in q:
+        return "kredensial"
+    if "FROM VIEW_DETAIL_KEGIATAN" in q and "WHERE" not in q:
+        return "view_kegiatan"
+    if q.startswith("SELECT MIN(ID_LOG), MAX(ID_LOG) FROM LOG_PERUBAHAN_KEGIATAN") and "WHERE" not in q:
+        return "batas_log"
+    if "FROM LOG_PERUBAHAN_KEGIATAN " in q and "ORDER BY ID_LOG DESC" in q:
+        return "halaman_log"
+    return "kosong"
+
+
+class CursorSimulasi:
+    def __init__(self, koneksi):
+        self._koneksi = koneksi
+        self._store = koneksi.store
+        self._rows = []
+        self._hasil_sp = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def execute(self, query, params=None):
+        self._store.round_trip()
+        params = tuple(params or ())
+        jenis = _jenis_query(query)
+        self._rows, self.rowcount = [], 0
+        store = self._store
+        if jenis == "schema_meta":
+            self._rows = [store.schema_meta] if store.schema_meta else []
+        elif jenis == "schema_meta_tulis":
+            store.schema_meta = (params[0], params[1])
+        elif jenis == "schema_meta_hapus":
+            store.schema_meta = None
+        elif jenis == "schema_versi":
+            self._rows = sorted(store.schema_versi.items())
+        elif jenis == "schema_versi_tulis":
+            store.schema_versi[params[0]] = params[2]
+        elif jenis == "schema_versi_checksum":
+            store.schema_versi[params[1]] = params[0]
+        elif jenis == "schema_versi_hapus":
+            store.schema_versi.clear()
+        elif jenis in ("tambah_kolom", "buat_indeks"):
+            # Seperti server: ADD COLUMN dan CREATE INDEX tidak idempoten
+            objek = store.kolom_tambahan if jenis == "tambah_kolom" else store.indeks
+            target = _target_ddl(query)
+            if target in objek:
+                store.ddl_ditolak += 1
+                errno, pesan = (1060, "Duplicate column name") if jenis == "tambah_kolom" else (1061, "Duplicate key name")
+                raise mysql.connector.Error(msg=f"{pesan} '{target[1]}'", errno=errno)
+            objek.add(target)
+        elif jenis in ("info_kolom", "info_indeks"):
+            objek = store.kolom_tambahan if jenis == "info_kolom" else store.indeks
+            if (params[0].lower(), params[1].lower()) in objek:
+                self._rows = [(1,)]
+        elif jenis == "jumlah_role":
+            self._rows = [(len(store.roles),)]
+        elif jenis == "jumlah_pengguna":
+            self._rows = [(len(store.pengguna),)]
+        elif jenis == "jumlah_kegiatan":
+            self._rows = [(len(store.kegiatan),)]
+        elif jenis == "kredensial":
+            row = store.pengguna.get(params[0])
+            if row and row[5] == params[1]:
+                self._rows = [row[:5]]
+        elif jenis == "view_kegiatan":
+            self._rows = list(store.view_kegiatan())
+        elif jenis == "batas_log":
+            self._rows = [(1, len(store.log)) if store.log else (None, None)]
+        elif jenis == "halaman_log":
+            # Hanya keyset tanpa filter lain: params = ([before_id,] limit)
+            limit = params[-1]
+            akhir = params[0] - 1 if len(params) > 1 else len(store.log)
+            awal = max(0, akhir - limit)
+            self._rows = [(row[0], row[1], row[3], row[2]) for row in reversed(store.log[awal:akhir])]
+        self.rowcount = len(self._rows)
+
+    def executemany(self, query, seq_params):
+        self._store.round_trip()
+        self.rowcount = len(seq_params)
+
+    def callproc(self, nama, args=()):
+        self._store.round_trip()
+        store = self._store
+        self._hasil_sp = []
+        if nama == "SP_TambahKegiatan":
+            id_keg, nama_keg, tanggal, tempat, jenis, id_pj = args
+            self.rowcount = store.tulis_kegiatan(
+                id_keg, (id_keg, nama_keg, tanggal, tempat, jenis, id_pj, store.nama_pengguna.get(id_pj)), "INSERT")
+        elif nama == "SP_UpdateKegiatan":
+            id_keg, nama_keg, tanggal, tempat, jenis, id_pj = args
+            self.rowcount = store.tulis_kegiatan(
+                id_keg, (id_keg, nama_keg, tanggal, tempat, jenis, id_pj, store.nama_pengguna.get(id_pj)), "UPDATE")
+        elif nama == "SP_HapusKegiatan":
+            self.rowcount = store.tulis_kegiatan(args[0], None, "DELETE")
+        elif nama == "SP_DaftarPengguna":
+            nama_p, nim_nip, username, password, role_id = args
+            if username in store.pengguna:
+                self._hasil_sp = [("username_ada", None)]
+            else:
+                id_baru = max(store.nama_pengguna, default=0) + 1
+                store.pengguna[username] = (id_baru, nama_p, role_id, nim_nip, username, password)
+                store.nama_pengguna[id_baru] = nama_p
+                self._hasil_sp = [("ok", id_baru)]
+        return args
+
+    def stored_results(self):
+        hasil = self._hasil_sp
+        self._hasil_sp = []
+        return iter([_HasilSP(hasil)] if hasil else [])
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class _HasilSP:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class KoneksiSimulasi:
+    """Antarmuka minimal koneksi mysql.connector yang dipakai ConnectionPool dan DatabaseManager."""
+    in_transaction = False
+
+    def __init__(self, store):
+        self.store = store
+        self._terbuka = True
+
+    def cursor(self, prepared=False, buffered=None):
+        return CursorSimulasi(self)
+
+    def commit(self):
+        self.store.round_trip()
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=False):
+        pass
+
+    def is_connected(self):
+        return self._terbuka
+
+    def close(self):
+        self._terbuka = False
+
+
+class DatabaseManagerSimulasi(DatabaseManager):
+    """DatabaseManager asli (pool, registry statement, konversi baris) di atas KoneksiSimulasi."""
+
+    def __init__(self, store, **pool_kwargs):
+        self.store = store
+        super().__init__("simulasi", "simulasi", "", "simulasi", **pool_kwargs)
+
+    def _create_connection(self):
+        return KoneksiSimulasi(self.store)
@@ -1,14 +1,22 @@
 from tkinter import *
 from tkinter import messagebox
-from tkcalendar import Calendar
-from PIL import Image, ImageTk, ImageFilter
-import mysql.connector
-conn = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="",
-    database="ManajemenKegiatanDTEI"
-)
+from aset_cache import AssetCache
+
+# Koneksi dibuka saat login pertama, bukan saat modul diimpor, agar jendela muncul lebih dulu
+conn = None
+
+
+def get_conn():
+    global conn
+    if conn is None or not conn.is_connected():
+        import mysql.connector # Impor lazy: hanya dibutuhkan saat tombol Login ditekan
+        conn = mysql.connector.connect(
+            host="localhost",
+            user="root",
+            password="",
+            database="ManajemenKegiatanDTEI"
+        )
+    return conn
 
 
 def login_window():
@@ -16,9 +24,9 @@ def login_window():
     window.title("Login")
     window.geometry("1080x720")
     try:
-        bg = Image.open("img/LOGIN.png").filter(ImageFilter.GaussianBlur(10))  # Ganti ke LOGIN.png sesuai file Anda
-        bg = bg.resize((1080, 720))
-        bg = ImageTk.PhotoImage(bg)
+        # Blur + resize hanya dikerjakan sekali; start berikutnya memuat varian PPM dari cache tanpa PIL
+        bg_path = AssetCache().siapkan("img/LOGIN.png", (1080, 720), blur=10)  # Ganti ke LOGIN.png sesuai file Anda
+        bg = PhotoImage(file=bg_path)
         bg_label = Label(window, image=bg)
         bg_label.image = bg  # Prevent garbage collection
         bg_label.place(x=0, y=0, relwidth=1, relheight=1)
@@ -35,9 +43,13 @@ def login_window():
     def login():
         username = username_entry.get()
         password = password_entry.get()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM Pengguna WHERE Username = %s AND Password = %s", (username, password))
-        result = cursor.fetchone()
+        try:
+            cursor = get_conn().cursor()
+            cursor.execute("SELECT * FROM Pengguna WHERE Username = %s AND Password = %s", (username, password))
+            result = cursor.fetchone()
+        except Exception as e:
+            messagebox.showerror("Login", f"Tidak dapat terhubung ke database: {e}")
+            return
         if result:
             messagebox.showinfo("Login", "Login berhasil!")
             window.destroy()
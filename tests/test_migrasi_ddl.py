@@ -0,0 +1,48 @@
+"""Regresi: DDL yang dijalankan ulang pada objek yang sudah ada tidak boleh menghentikan migrasi."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import mysql.connector
+    from baru import DatabaseManager
+except ImportError as e: # mysql-connector-python atau tkinter tidak terpasang
+    raise unittest.SkipTest(f"Dependensi aplikasi tidak tersedia: {e}")
+
+
+class CursorGagal:
+    """Cursor yang selalu gagal dengan errno tertentu, seperti server saat objek DDL sudah ada."""
+
+    def __init__(self, errno, msg):
+        self.errno = errno
+        self.msg = msg
+        self.dieksekusi = []
+
+    def execute(self, query, params=None):
+        self.dieksekusi.append(query)
+        raise mysql.connector.Error(msg=self.msg, errno=self.errno)
+
+
+class TestExecuteDdlBlock(unittest.TestCase):
+    def setUp(self):
+        self.db = DatabaseManager.__new__(DatabaseManager) # Tanpa pool: hanya jalur cursor yang diuji
+
+    def test_objek_sudah_ada_dilewati(self):
+        for errno, msg in ((1050, "Table 'Schema_Versi' already exists"),
+                           (1060, "Duplicate column name 'Checksum'"),
+                           (1061, "Duplicate key name 'IDX_Pengguna_Nama'")):
+            with self.subTest(errno=errno):
+                cursor = CursorGagal(errno, msg)
+                self.db._execute_ddl_block("CREATE TABLE Contoh (ID INT)", cursor)
+                self.assertEqual(len(cursor.dieksekusi), 1)
+
+    def test_error_lain_diteruskan(self):
+        cursor = CursorGagal(1064, "You have an error in your SQL syntax")
+        with self.assertRaises(mysql.connector.Error):
+            self.db._execute_ddl_block("CREATE TABEL Contoh (ID INT)", cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()